@@ -0,0 +1,130 @@
+import argparse
+import runpy
+import sys
+import time
+
+# Subcommand -> (module run as __main__, help). Nothing is imported until a
+# subcommand runs, so `etl --help` and argument errors cost no pandas,
+# psycopg2 or dotenv import.
+COMMANDS = {
+    "extract": ("etl.jobs.extract.extract", "Run the data extraction step"),
+    "transform": ("etl.jobs.transform.transform", "Run the main transformation"),
+    "transform-hotel": (
+        "etl.jobs.transform.transform_dim_hotel",
+        "Transform hotel dimension",
+    ),
+    "transform-country": (
+        "etl.jobs.transform.transform_dim_country",
+        "Transform country dimension",
+    ),
+    "transform-meal": (
+        "etl.jobs.transform.transform_dim_meal",
+        "Transform meal plan dimension",
+    ),
+    "transform-customer": (
+        "etl.jobs.transform.transform_dim_customer",
+        "Transform customer type dimension",
+    ),
+    "transform-guest": (
+        "etl.jobs.transform.transform_dim_guest",
+        "Transform guest dimension",
+    ),
+    "transform-date": (
+        "etl.jobs.transform.transform_dim_date",
+        "Generate the date dimension",
+    ),
+    "transform-fact": (
+        "etl.jobs.transform.transform_fact_bookings",
+        "Transform fact table",
+    ),
+    "transform-cube": (
+        "etl.jobs.transform.transform_kpi_cube",
+        "Build the KPI cube from the fact table",
+    ),
+    "validate": (
+        "etl.jobs.transform.validate",
+        "Run data validation (--sample for the pre-flight check)",
+    ),
+    "load": ("etl.jobs.load.load", "Load staging data into PostgreSQL (--bulk)"),
+    "load-hotel": ("etl.jobs.load.load_dim_hotel", "Load hotel dimension"),
+    "load-country": ("etl.jobs.load.load_dim_country", "Load country dimension"),
+    "load-meal": ("etl.jobs.load.load_dim_meal", "Load meal plan dimension"),
+    "load-customer": (
+        "etl.jobs.load.load_dim_customer",
+        "Load customer type dimension",
+    ),
+    "load-guest": ("etl.jobs.load.load_dim_guest", "Load guest dimension"),
+    "load-date": ("etl.jobs.load.load_dim_date", "Load date dimension"),
+    "load-fact": ("etl.jobs.load.load_fact_bookings", "Load fact table (--bulk)"),
+    "load-kpi": ("etl.jobs.load.load_kpi", "Merge new fact rows into the KPI tables"),
+    "index-fact": (
+        "etl.jobs.load.index_fact",
+        "Create KPI indexes on fact_bookings and benchmark the dashboard queries",
+    ),
+    "reconcile": (
+        "etl.jobs.load.reconcile",
+        "Check fact_bookings against the fact artifact with aggregate checksums",
+    ),
+    "pipeline": (
+        "etl.jobs.pipeline",
+        "Transform and load in one process (--engine, --bulk, --stream)",
+    ),
+    "check-connection": (
+        "etl.tests.test_connection",
+        "Check that PostgreSQL accepts connections",
+    ),
+    "check-db": (
+        "etl.tests.test_utils",
+        "Check the connection helper used by the jobs",
+    ),
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Builds the argument parser: one subcommand per job. Options after the
+    subcommand are left to the job's own parser.
+    """
+    parser = argparse.ArgumentParser(
+        prog="etl", description="Hotel booking ETL jobs."
+    )
+    parser.add_argument(
+        "--timing", action="store_true", help="print the time taken by the job"
+    )
+    subparsers = parser.add_subparsers(dest="command", metavar="command")
+    subparsers.required = True
+    for name, (_, help_text) in COMMANDS.items():
+        # add_help=False: `etl validate --help` reaches the job's parser
+        subparsers.add_parser(name, help=help_text, add_help=False)
+    return parser
+
+
+def run(command: str, args: list):
+    """
+    Runs a job module as `python -m <module> <args>` would, in this process.
+
+    Parameters:
+    command (str): Subcommand name (a key of COMMANDS).
+    args (list): Arguments forwarded to the job.
+    """
+    module = COMMANDS[command][0]
+    sys.argv = [module, *args]
+    runpy.run_module(module, run_name="__main__", alter_sys=True)
+
+
+def main(argv: list = None):
+    """
+    Entry point of `python -m etl`.
+    """
+    args, rest = build_parser().parse_known_args(argv)
+    start = time.perf_counter()
+    try:
+        run(args.command, rest)
+    finally:
+        if args.timing:
+            elapsed = time.perf_counter() - start
+            print(f"⏱️  {args.command} took {elapsed:.2f} seconds.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -13,3 +13,45 @@ DB_CONFIG = {
 }
 
 RAW_DATA = "etl/data/raw/hotel_booking.csv"
+
+# Rows per chunk for the streaming readers
+CHUNK_SIZE = int(os.getenv("ETL_CHUNK_SIZE", "50000"))
+
+# Directory where JSON data profiles are written
+PROFILE_DIR = "etl/data/profiles"
+
+# Store fact_bookings with the compact layout (small ints, numeric month, enums)
+COMPACT_FACT = os.getenv("ETL_COMPACT_FACT", "0") == "1"
+
+# On-disk KPI query cache and the data-version counter bumped by loads
+CACHE_DIR = "etl/data/cache"
+DATA_VERSION_FILE = f"{CACHE_DIR}/data_version"
+
+# JSON file collecting metrics of the current run
+RUN_METRICS = "logs/run_metrics.json"
+
+# Secret keying the PII pseudonyms (unset: pseudonyms are left null) and the
+# number of worker processes hashing them
+PII_KEY = os.getenv("ETL_PII_KEY")
+PII_WORKERS = int(os.getenv("ETL_PII_WORKERS", "1"))
+
+# Memory budget of out-of-core runs, e.g. "2GB" (unset: fully in memory), and
+# the spill-to-disk partitioning: shard directory, initial shard count and
+# worker processes (0: chosen from the budget and the CPU count)
+MEMORY_BUDGET = os.getenv("ETL_MEMORY_BUDGET")
+SPILL_DIR = "etl/data/spill"
+SPILL_PARTITIONS = int(os.getenv("ETL_SPILL_PARTITIONS", "16"))
+SPILL_WORKERS = int(os.getenv("ETL_SPILL_WORKERS", "0"))
+
+# Worker processes formatting the rows of processed, dimension and fact CSVs
+WRITE_WORKERS = int(os.getenv("ETL_WRITE_WORKERS", "1"))
+
+# Share of rows the database may reject during a load before it is aborted
+LOAD_REJECT_RATIO = float(os.getenv("ETL_LOAD_REJECT_RATIO", "0.01"))
+
+# Transform threads of the streaming pipeline (pipeline.py --stream)
+STREAM_WORKERS = int(os.getenv("ETL_STREAM_WORKERS", "2"))
+
+# Estimated violation rate (upper bound) above which `validate --sample`
+# escalates to a full validation
+VALIDATION_THRESHOLD = float(os.getenv("ETL_VALIDATION_THRESHOLD", "0.001"))
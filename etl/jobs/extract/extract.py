@@ -1,19 +1,14 @@
 import pandas as pd
 import logging
 import os
+from etl.jobs.extract.profile import DataProfiler, save_profile
+from etl.jobs.utils.reader import read_csv_chunks
+from etl.jobs.utils.logger import configure_logging
 
 SEPARATOR_LENGTH = 139
 
-# Ensure that the "logs" directory exists
-os.makedirs("logs", exist_ok=True)
-
 # Configure logging to overwrite the log file on each execution
-logging.basicConfig(
-    filename="logs/extract.log",  # Log file name
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",  # Log format
-    filemode="w",  # Specify write mode to overwrite the file
-)
+configure_logging("extract.log")
 
 
 def print_section(title):
@@ -67,30 +62,70 @@ def load_data(file_path):
         raise  # Re-raise the exception to allow higher-level handling
 
 
+def profile_data(file_path):
+    """
+    Streams the CSV file once and builds its data profile, keeping the first
+    rows aside for display.
+
+    Parameters:
+    file_path (str): Path to the CSV file.
+
+    Returns:
+    tuple[pd.DataFrame, dict]: The first 5 rows and the profile.
+    """
+    head = None
+    profiler = DataProfiler()
+    try:
+        for chunk in read_csv_chunks(file_path):
+            if head is None:
+                head = chunk.head()
+            profiler.update(chunk)
+    except (FileNotFoundError, pd.errors.EmptyDataError, pd.errors.ParserError) as e:
+        logging.error(f"Failed to read {file_path}: {e}")
+        raise
+
+    logging.info(f"Data profiled successfully from {file_path}")
+    return head, profiler.result()
+
+
 def main(file_path="etl/data/raw/hotel_booking.csv"):
     """
-    Main function that loads the data, checks for missing data and duplicates,
-    and logs the results.
+    Main function that profiles the data in a single pass, reports missing
+    data and duplicates, and saves the profile as JSON for later stages.
 
     Parameters:
     file_path (str): Path to the CSV file to be loaded. Default is 'etl/data/raw/hotel_booking.csv'.
     """
     try:
-        # Load data
-        df = load_data(file_path)
+        head, profile = profile_data(file_path)
 
         # First 5 rows
         print_section("FIRST 5 ROWS")
-        print(df.head())
+        print(head)
 
         # General information
         print_section("GENERAL INFORMATION")
-        df_info = df.info()
+        summary = pd.DataFrame(
+            {
+                name: {
+                    "dtype": column["dtype"],
+                    "non_null": profile["rows"] - column["nulls"],
+                    "distinct (approx.)": column["distinct_estimate"],
+                    "min": column["min"],
+                    "max": column["max"],
+                }
+                for name, column in profile["columns"].items()
+            }
+        ).T
+        print(f"{profile['rows']} rows, {len(profile['columns'])} columns")
+        print(summary.to_string())
         logging.info("General info retrieved")
 
         # Missing data
         print_section("MISSING DATA")
-        missing_data = df.isnull().sum()
+        missing_data = pd.Series(
+            {name: column["nulls"] for name, column in profile["columns"].items()}
+        )
         print(missing_data)
         if missing_data.any():
             logging.warning("Some columns contain missing data.")
@@ -99,13 +134,16 @@ def main(file_path="etl/data/raw/hotel_booking.csv"):
 
         # Duplicates
         print_section("DUPLICATES")
-        duplicates = df.duplicated().sum()
+        duplicates = profile["duplicate_rows"]
         print(duplicates)
         if duplicates > 0:
             logging.warning(f"Duplicates detected: {duplicates} found.")
         else:
             logging.info("No duplicates detected.")
 
+        profile_path = save_profile(profile, file_path)
+        print(f"Profile saved to {profile_path}")
+
     except Exception as e:
         logging.critical(f"An error occurred: {e}")
         print(f"An error occurred: {e}")
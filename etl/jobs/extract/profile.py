@@ -0,0 +1,241 @@
+import json
+import logging
+import os
+import numpy as np
+import pandas as pd
+from etl.config import config
+from etl.jobs.utils.sketches import HyperLogLog, hash_values
+
+# Number of most frequent values reported per column
+TOP_K = 10
+
+# Candidate values kept per column while streaming (approximate heavy hitters)
+TOP_K_CAPACITY = 256
+
+# Number of equal-width bins for numeric histograms
+HISTOGRAM_BINS = 20
+
+
+def _to_json_value(value):
+    """
+    Converts numpy/pandas scalars into plain JSON-serializable Python values.
+    """
+    if value is None or (np.isscalar(value) and pd.isna(value)):
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    return value
+
+
+def _is_numeric(series: pd.Series) -> bool:
+    return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(
+        series
+    )
+
+
+class DataProfiler:
+    """
+    Builds a data profile in a single streaming pass over DataFrame chunks.
+
+    For each column it keeps null counts, min/max, a HyperLogLog distinct
+    count, approximate top-k values and a histogram. Whole rows are hashed
+    once to count duplicates, which is much cheaper than df.duplicated().
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.columns = {}
+        self.row_hashes = []
+
+    def _column_state(self, name: str, series: pd.Series) -> dict:
+        if name not in self.columns:
+            self.columns[name] = {
+                "dtype": str(series.dtype),
+                "nulls": 0,
+                "min": None,
+                "max": None,
+                "distinct": HyperLogLog(),
+                "top": pd.Series(dtype="int64"),
+                "histogram": None,
+            }
+        return self.columns[name]
+
+    def _update_histogram(self, state: dict, values: np.ndarray):
+        if len(values) == 0:
+            return
+        if state["histogram"] is None:
+            # Bin edges are fixed from the first chunk; later values falling
+            # outside that range are counted as underflow/overflow.
+            low, high = float(values.min()), float(values.max())
+            if low == high:
+                high = low + 1
+            state["histogram"] = {
+                "edges": np.linspace(low, high, HISTOGRAM_BINS + 1),
+                "counts": np.zeros(HISTOGRAM_BINS, dtype=np.int64),
+                "below": 0,
+                "above": 0,
+            }
+        histogram = state["histogram"]
+        edges = histogram["edges"]
+        counts, _ = np.histogram(values, bins=edges)
+        histogram["counts"] += counts
+        histogram["below"] += int(np.count_nonzero(values < edges[0]))
+        histogram["above"] += int(np.count_nonzero(values > edges[-1]))
+
+    def update(self, chunk: pd.DataFrame):
+        """
+        Adds one chunk of data to the profile.
+
+        Parameters:
+        chunk (pd.DataFrame): The next chunk of rows.
+        """
+        self.rows += len(chunk)
+        self.row_hashes.append(hash_values(chunk))
+
+        null_counts = chunk.isnull().sum()
+        for name in chunk.columns:
+            series = chunk[name]
+            state = self._column_state(name, series)
+            state["nulls"] += int(null_counts[name])
+
+            values = series.dropna()
+            if values.empty:
+                continue
+
+            state["distinct"].add_hashes(hash_values(values))
+
+            counts = values.value_counts(sort=False)
+            if isinstance(counts.index, pd.CategoricalIndex):
+                counts = counts[counts > 0]
+                counts.index = counts.index.astype(object)
+            top = state["top"].add(counts, fill_value=0)
+            state["top"] = top.nlargest(TOP_K_CAPACITY)
+
+            if _is_numeric(series):
+                chunk_min, chunk_max = values.min(), values.max()
+                if state["min"] is None or chunk_min < state["min"]:
+                    state["min"] = chunk_min
+                if state["max"] is None or chunk_max > state["max"]:
+                    state["max"] = chunk_max
+                self._update_histogram(state, values.to_numpy(dtype=np.float64))
+
+    def result(self) -> dict:
+        """
+        Returns the profile as a JSON-serializable dictionary.
+        """
+        if self.row_hashes:
+            distinct_rows = len(np.unique(np.concatenate(self.row_hashes)))
+        else:
+            distinct_rows = 0
+
+        columns = {}
+        for name, state in self.columns.items():
+            column = {
+                "dtype": state["dtype"],
+                "nulls": state["nulls"],
+                "distinct_estimate": state["distinct"].estimate(),
+                "min": _to_json_value(state["min"]),
+                "max": _to_json_value(state["max"]),
+                "top_values": [
+                    [_to_json_value(value), int(count)]
+                    for value, count in state["top"].nlargest(TOP_K).items()
+                ],
+            }
+            histogram = state["histogram"]
+            if histogram is not None:
+                column["histogram"] = {
+                    "edges": histogram["edges"].tolist(),
+                    "counts": histogram["counts"].tolist(),
+                    "below": histogram["below"],
+                    "above": histogram["above"],
+                }
+            columns[name] = column
+
+        return {
+            "rows": self.rows,
+            "duplicate_rows": self.rows - distinct_rows,
+            "columns": columns,
+        }
+
+
+def build_profile(chunks) -> dict:
+    """
+    Profiles a DataFrame or an iterable of DataFrame chunks in a single pass.
+
+    Parameters:
+    chunks (pd.DataFrame | Iterable[pd.DataFrame]): The data to profile.
+
+    Returns:
+    dict: The profile (see DataProfiler.result).
+    """
+    if isinstance(chunks, pd.DataFrame):
+        chunks = [chunks]
+
+    profiler = DataProfiler()
+    for chunk in chunks:
+        profiler.update(chunk)
+    return profiler.result()
+
+
+def profile_path_for(data_path: str) -> str:
+    """
+    Returns the JSON profile path used for a given data file.
+    """
+    name = os.path.splitext(os.path.basename(data_path))[0]
+    return os.path.join(config.PROFILE_DIR, f"{name}.json")
+
+
+def save_profile(profile: dict, data_path: str) -> str:
+    """
+    Writes a profile next to the other profiles, stamped with the size and
+    modification time of the data file so stale profiles can be detected.
+
+    Parameters:
+    profile (dict): Profile returned by build_profile().
+    data_path (str): Path of the data file the profile describes.
+
+    Returns:
+    str: Path of the written JSON file.
+    """
+    stat = os.stat(data_path)
+    profile = dict(
+        profile,
+        source=data_path,
+        source_size=stat.st_size,
+        source_mtime_ns=stat.st_mtime_ns,
+    )
+    output_path = profile_path_for(data_path)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w") as f:
+        json.dump(profile, f, indent=2)
+    logging.info(f"Profile for {data_path} saved to {output_path}")
+    return output_path
+
+
+def load_profile(data_path: str):
+    """
+    Loads the profile of a data file if it exists and is still up to date.
+
+    Parameters:
+    data_path (str): Path of the data file.
+
+    Returns:
+    dict | None: The profile, or None if missing or stale.
+    """
+    profile_path = profile_path_for(data_path)
+    if not os.path.exists(profile_path) or not os.path.exists(data_path):
+        return None
+
+    with open(profile_path) as f:
+        profile = json.load(f)
+
+    stat = os.stat(data_path)
+    if (
+        profile.get("source_size") != stat.st_size
+        or profile.get("source_mtime_ns") != stat.st_mtime_ns
+    ):
+        logging.info(f"Profile {profile_path} is stale, ignoring it.")
+        return None
+    return profile
@@ -0,0 +1,162 @@
+import logging
+import pandas as pd
+import psycopg2
+from etl.config import config
+from etl.jobs.load.frame_loader import copy_frame, iter_chunks
+from etl.jobs.transform.quarantine import REASON_COLUMN, save_rejects
+
+# Rows per COPY batch; each batch runs under its own savepoint
+BATCH_SIZE = 10000
+
+LOAD_REJECTS_PATH = "etl/data/rejects/load_rejects.csv"
+
+_SAVEPOINT = "etl_batch"
+
+# SQLSTATE classes a single row can raise (data exception, integrity
+# constraint violation); errors of any other class, such as an undefined
+# column or a lost connection, fail every row and abort the load
+ROW_ERROR_CLASSES = ("22", "23")
+
+
+def _error_reason(error: psycopg2.Error) -> str:
+    """
+    Returns the first line of a database error, used as the reject reason.
+    """
+    message = (error.pgerror or str(error)).strip().splitlines()
+    return "load_error: " + (message[0] if message else type(error).__name__)
+
+
+def _is_row_error(error: psycopg2.Error) -> bool:
+    """
+    Tells whether an error can be caused by some rows of a batch, so
+    bisecting the batch isolates them.
+    """
+    return error.pgcode is None or error.pgcode[:2] in ROW_ERROR_CLASSES
+
+
+def _attempt(cursor, write, batch):
+    """
+    Writes one batch under a savepoint. Returns None on success, or the
+    database error after rolling the batch back.
+    """
+    cursor.execute(f"SAVEPOINT {_SAVEPOINT}")
+    try:
+        write(cursor, batch)
+    except psycopg2.Error as e:
+        # ROLLBACK TO keeps the savepoint open; release it so failed
+        # batches do not nest subtransactions until the lock table fills
+        cursor.execute(f"ROLLBACK TO SAVEPOINT {_SAVEPOINT}")
+        cursor.execute(f"RELEASE SAVEPOINT {_SAVEPOINT}")
+        return e
+    cursor.execute(f"RELEASE SAVEPOINT {_SAVEPOINT}")
+    return None
+
+
+def execute_isolated(
+    cursor,
+    data,
+    write,
+    batch_size: int = BATCH_SIZE,
+    max_reject_ratio: float = config.LOAD_REJECT_RATIO,
+):
+    """
+    Writes rows in large batches, each under a savepoint. A failing batch is
+    rolled back to its savepoint and split in halves until the offending rows
+    are isolated, so the good rows still go in with bulk statements and a bad
+    row costs O(log batch_size) extra statements instead of one per row.
+
+    Errors whose SQLSTATE class no single row can raise (see
+    ROW_ERROR_CLASSES) are raised at once instead of being bisected. Once
+    the rejected rows pass max_reject_ratio of the rows seen, the load is
+    aborted: a systematic error fails the run after a few rejects instead of
+    quarantining the file row by row.
+
+    Parameters:
+    cursor: A psycopg2 cursor object, inside a transaction.
+    data (pd.DataFrame | Iterable[pd.DataFrame]): Rows to write.
+    write (Callable): write(cursor, batch) sends one batch (COPY,
+        execute_values, ...).
+    batch_size (int): Rows per batch.
+    max_reject_ratio (float): Share of rejected rows that aborts the load.
+
+    Returns:
+    tuple[int, pd.DataFrame]: Rows written, and the rejected rows with a
+        'reject_reasons' column holding the database error.
+
+    Raises:
+    RuntimeError: If the rejected rows pass max_reject_ratio.
+    """
+    written = 0
+    seen = 0
+    rejected = []
+    rejected_rows = 0
+
+    for chunk in iter_chunks(data):
+        # Stack of batches to write, next last
+        pending = [
+            chunk.iloc[start : start + batch_size]
+            for start in range(0, len(chunk), batch_size)
+        ][::-1]
+        seen += len(chunk)
+        while pending:
+            batch = pending.pop()
+            error = _attempt(cursor, write, batch)
+            if error is None:
+                written += len(batch)
+                continue
+            if not _is_row_error(error):
+                raise error
+            if len(batch) > 1:
+                middle = len(batch) // 2
+                # Second half pushed first so rows keep their original order
+                pending.append(batch.iloc[middle:])
+                pending.append(batch.iloc[:middle])
+                continue
+            rejected.append(batch.assign(**{REASON_COLUMN: _error_reason(error)}))
+            rejected_rows += 1
+            if rejected_rows > max_reject_ratio * seen:
+                raise RuntimeError(
+                    f"{rejected_rows} of {seen} rows rejected by the "
+                    f"database, over the {max_reject_ratio:.1%} limit; "
+                    f"load aborted ({_error_reason(error)})"
+                )
+
+    rejected = pd.concat(rejected) if rejected else pd.DataFrame()
+    if len(rejected):
+        logging.warning(f"{len(rejected)} rows rejected by the database.")
+    return written, rejected
+
+
+def copy_isolated(
+    cursor,
+    table: str,
+    data,
+    columns: list,
+    int_columns=(),
+    batch_size: int = BATCH_SIZE,
+    rejects_path: str = LOAD_REJECTS_PATH,
+) -> int:
+    """
+    Copies rows into a table with execute_isolated() and appends the rows the
+    database rejected to the load reject artifact.
+
+    Parameters:
+    cursor: A psycopg2 cursor object, inside a transaction.
+    table (str): Target table name.
+    data (pd.DataFrame | Iterable[pd.DataFrame]): Rows to load.
+    columns (list): Target columns, in table order.
+    int_columns (Iterable[str]): Columns stored as integers in the table.
+    batch_size (int): Rows per COPY batch.
+    rejects_path (str): Path of the reject CSV.
+
+    Returns:
+    int: Number of rows loaded.
+    """
+
+    def write(cur, batch):
+        copy_frame(cur, table, batch, columns=columns, int_columns=int_columns)
+
+    written, rejected = execute_isolated(cursor, data, write, batch_size)
+    if len(rejected):
+        save_rejects(rejected.assign(target_table=table), rejects_path, append=True)
+    return written
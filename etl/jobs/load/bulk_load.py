@@ -0,0 +1,123 @@
+import logging
+from contextlib import contextmanager
+
+# Settings applied with SET LOCAL for the duration of a bulk-load transaction.
+# Losing the last commits on a crash is acceptable: the load is re-runnable.
+BULK_SETTINGS = {
+    "synchronous_commit": "off",
+    "maintenance_work_mem": "512MB",
+    "max_parallel_maintenance_workers": "4",
+}
+
+
+def tune_session(cursor, settings: dict = BULK_SETTINGS):
+    """
+    Applies settings to the current transaction only (SET LOCAL), so they
+    are reverted on commit or rollback and never leak to other sessions.
+
+    Parameters:
+    cursor: A psycopg2 cursor object.
+    settings (dict): Setting name -> value.
+    """
+    for name, value in settings.items():
+        cursor.execute(f"SET LOCAL {name} = %s", (value,))
+    logging.info(f"Bulk-load session settings applied: {settings}")
+
+
+def wal_position(cursor) -> str:
+    """
+    Returns the current WAL insert position (an LSN).
+    """
+    cursor.execute("SELECT pg_current_wal_insert_lsn()")
+    return cursor.fetchone()[0]
+
+
+def wal_bytes_since(cursor, lsn: str) -> int:
+    """
+    Returns the WAL volume written since an LSN from wal_position().
+    """
+    cursor.execute("SELECT pg_wal_lsn_diff(pg_current_wal_insert_lsn(), %s)", (lsn,))
+    return int(cursor.fetchone()[0])
+
+
+def drop_indexes(cursor, table: str) -> list:
+    """
+    Drops the primary key, unique constraints and secondary indexes of a table
+    and returns the statements that recreate them.
+
+    Parameters:
+    cursor: A psycopg2 cursor object.
+    table (str): Table name.
+
+    Returns:
+    list[str]: Statements restoring the dropped constraints and indexes.
+    """
+    cursor.execute(
+        """
+        SELECT conname, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE conrelid = %s::regclass AND contype IN ('p', 'u')
+        """,
+        (table,),
+    )
+    constraints = cursor.fetchall()
+
+    # Indexes not backing a constraint
+    cursor.execute(
+        """
+        SELECT i.indexrelid::regclass::text, pg_get_indexdef(i.indexrelid)
+        FROM pg_index i
+        WHERE i.indrelid = %s::regclass
+          AND NOT EXISTS (
+              SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid
+          )
+        """,
+        (table,),
+    )
+    indexes = cursor.fetchall()
+
+    statements = []
+    for name, definition in constraints:
+        cursor.execute(f"ALTER TABLE {table} DROP CONSTRAINT {name}")
+        statements.append(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+    for name, definition in indexes:
+        cursor.execute(f"DROP INDEX {name}")
+        statements.append(definition)
+
+    logging.info(f"Dropped {len(statements)} indexes/constraints on {table}")
+    return statements
+
+
+def rebuild_indexes(cursor, statements: list):
+    """
+    Recreates the indexes and constraints returned by drop_indexes(). Each
+    B-tree build uses up to max_parallel_maintenance_workers workers.
+    """
+    for statement in statements:
+        cursor.execute(statement)
+    logging.info(f"Rebuilt {len(statements)} indexes/constraints")
+
+
+@contextmanager
+def bulk_load(cursor, tables: list):
+    """
+    Wraps a bulk load: tunes the session, drops the indexes and constraints of
+    the target tables, and on exit rebuilds them and runs ANALYZE.
+
+    Must be used inside a transaction, so an error rolls the drops back
+    together with the loaded rows.
+
+    Parameters:
+    cursor: A psycopg2 cursor object.
+    tables (list[str]): Existing tables to be loaded.
+    """
+    tune_session(cursor)
+    start = wal_position(cursor)
+    deferred = {table: drop_indexes(cursor, table) for table in tables}
+
+    yield
+
+    for table, statements in deferred.items():
+        rebuild_indexes(cursor, statements)
+        cursor.execute(f"ANALYZE {table}")
+    logging.info(f"Bulk load wrote {wal_bytes_since(cursor, start)} bytes of WAL")
@@ -0,0 +1,126 @@
+import io
+import logging
+import pandas as pd
+
+INTEGER_TYPES = ("SMALLINT", "INT", "INTEGER", "BIGINT", "SERIAL", "BIGSERIAL")
+
+
+def integer_columns(column_types: dict) -> list:
+    """
+    Returns the columns declared with an integer SQL type in a
+    {column: sql_type} mapping.
+    """
+    return [
+        name
+        for name, sql_type in column_types.items()
+        if sql_type.split()[0].upper() in INTEGER_TYPES
+    ]
+
+
+def add_columns_sql(table: str, column_types: dict) -> str:
+    """
+    Returns the ALTER TABLE statement adding every column of a
+    {column: sql_type} mapping that an existing table lacks, so a table
+    created by an earlier release gets the columns added since. Constraints
+    such as PRIMARY KEY are left to CREATE TABLE.
+    """
+    clauses = ",\n".join(
+        f"    ADD COLUMN IF NOT EXISTS {name} {sql_type.split()[0]}"
+        for name, sql_type in column_types.items()
+    )
+    return f"ALTER TABLE {table}\n{clauses};\n"
+
+
+def iter_chunks(data):
+    """
+    Yields the chunks of a DataFrame or of an iterable of DataFrames.
+    """
+    if isinstance(data, pd.DataFrame):
+        yield data
+    else:
+        yield from data
+
+
+def _prepare(df: pd.DataFrame, columns: list, int_columns=()) -> pd.DataFrame:
+    """
+    Selects the columns to load and turns float columns bound for integer
+    columns (e.g. 'children', float because of NaN) into nullable integers,
+    so they are written as '2' rather than '2.0'.
+    """
+    frame = df[columns]
+    casts = {
+        name: "Int64"
+        for name in int_columns
+        if name in frame.columns and pd.api.types.is_float_dtype(frame[name])
+    }
+    return frame.astype(casts) if casts else frame
+
+
+def encode_csv(df: pd.DataFrame, columns: list, int_columns=()) -> io.StringIO:
+    """
+    Encodes a DataFrame as CSV for COPY. Nulls are written as empty fields
+    during encoding, so the frame never has to be converted to object dtype.
+
+    Parameters:
+    df (pd.DataFrame): Data to encode.
+    columns (list): Columns to write, in table order.
+    int_columns (Iterable[str]): Columns stored as integers in the table.
+
+    Returns:
+    io.StringIO: Buffer positioned at the start of the CSV data.
+    """
+    buffer = io.StringIO()
+    _prepare(df, columns, int_columns).to_csv(
+        buffer, index=False, header=False, na_rep=""
+    )
+    buffer.seek(0)
+    return buffer
+
+
+def copy_frame(cursor, table: str, data, columns: list = None, int_columns=()) -> int:
+    """
+    Loads a DataFrame, or an iterable of DataFrame chunks, into a table with
+    COPY. Chunks are streamed one at a time, so transform output can go
+    straight into the database without an intermediate CSV file.
+
+    Parameters:
+    cursor: A psycopg2 cursor object.
+    table (str): Target table name.
+    data (pd.DataFrame | Iterable[pd.DataFrame]): Rows to load.
+    columns (list, optional): Target columns, defaults to the frame columns.
+    int_columns (Iterable[str]): Columns stored as integers in the table.
+
+    Returns:
+    int: Number of rows copied.
+    """
+    rows_copied = 0
+    for chunk in iter_chunks(data):
+        chunk_columns = columns or list(chunk.columns)
+        query = (
+            f"COPY {table} ({', '.join(chunk_columns)}) "
+            "FROM STDIN WITH (FORMAT csv, NULL '')"
+        )
+        cursor.copy_expert(query, encode_csv(chunk, chunk_columns, int_columns))
+        rows_copied += len(chunk)
+        logging.info(f"Copied {len(chunk)} rows into {table}")
+    return rows_copied
+
+
+def frame_rows(df: pd.DataFrame, columns: list, int_columns=()) -> list:
+    """
+    Converts a DataFrame into a list of parameter tuples for psycopg2, with
+    nulls encoded as None column by column.
+
+    Parameters:
+    df (pd.DataFrame): Data to convert.
+    columns (list): Columns to include, in statement order.
+    int_columns (Iterable[str]): Columns stored as integers in the table.
+
+    Returns:
+    list[tuple]: One tuple per row.
+    """
+    frame = _prepare(df, columns, int_columns)
+    values = [
+        [None if pd.isna(v) else v for v in frame[name].tolist()] for name in columns
+    ]
+    return list(zip(*values))
@@ -0,0 +1,157 @@
+import psycopg2
+from etl.jobs.load.load_fact_bookings import FACT_TABLE
+from etl.jobs.utils.db_connection import get_db_connection
+from etl.jobs.utils.logger import setup_logger
+from etl.jobs.utils.metrics import record_metrics
+
+logger = setup_logger("index_fact", "index_fact.log")
+
+# Secondary indexes serving the dashboard KPIs: name -> definition. The
+# covering columns let the KPI queries run as index-only scans.
+FACT_INDEXES = {
+    "fact_bookings_status_date_brin": "USING brin (reservation_status_date)",
+    "fact_bookings_arrival_date_key": "(arrival_date_key)",
+    "fact_bookings_country_canceled": ("(country_id, is_canceled) INCLUDE (lead_time)"),
+    "fact_bookings_hotel_month": (
+        "(hotel_id, arrival_year, arrival_month) "
+        "INCLUDE (is_canceled, weekend_nights, week_nights, adr)"
+    ),
+}
+
+# The five dashboard queries (docs/kpi/kpi_dashboard.md) run on the fact table
+DASHBOARD_QUERIES = {
+    "bookings_by_country": f"""
+        SELECT country_id, COUNT(*) FROM {FACT_TABLE} GROUP BY country_id
+    """,
+    "adr_revenue_by_hotel": f"""
+        SELECT hotel_id, AVG(adr),
+               SUM(adr * (weekend_nights + week_nights) * (1 - is_canceled))
+        FROM {FACT_TABLE} GROUP BY hotel_id
+    """,
+    "booked_nights_by_hotel_month": f"""
+        SELECT hotel_id, arrival_year, arrival_month,
+               SUM((weekend_nights + week_nights) * (1 - is_canceled))
+        FROM {FACT_TABLE} GROUP BY hotel_id, arrival_year, arrival_month
+    """,
+    "avg_lead_time_by_country": f"""
+        SELECT country_id, AVG(lead_time) FROM {FACT_TABLE} GROUP BY country_id
+    """,
+    "cancellation_rate_by_country": f"""
+        SELECT country_id, AVG(is_canceled::FLOAT) FROM {FACT_TABLE}
+        GROUP BY country_id
+    """,
+}
+
+
+def create_indexes(cursor) -> list:
+    """
+    Creates the missing KPI indexes on the fact table.
+
+    Parameters:
+    cursor: A psycopg2 cursor object.
+
+    Returns:
+    list[str]: Names of the indexes created.
+    """
+    cursor.execute(
+        "SELECT indexname FROM pg_indexes WHERE tablename = %s", (FACT_TABLE,)
+    )
+    existing = {row[0] for row in cursor.fetchall()}
+    created = []
+    for name, definition in FACT_INDEXES.items():
+        if name not in existing:
+            cursor.execute(f"CREATE INDEX {name} ON {FACT_TABLE} {definition}")
+            created.append(name)
+    logger.info(f"Created indexes: {created or 'none'}")
+    return created
+
+
+def vacuum_analyze():
+    """
+    Refreshes planner statistics and the visibility map of the fact table, so
+    the covering indexes can serve index-only scans. VACUUM cannot run in a
+    transaction block, hence the dedicated autocommit connection.
+    """
+    conn = get_db_connection()
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute(f"VACUUM (ANALYZE) {FACT_TABLE}")
+    finally:
+        conn.close()
+
+
+def _scan_nodes(plan: dict) -> list:
+    """
+    Returns the scan node types reading the fact table in a JSON plan.
+    """
+    nodes = []
+    if plan.get("Relation Name") == FACT_TABLE:
+        nodes.append(plan["Node Type"])
+    for child in plan.get("Plans", []):
+        nodes.extend(_scan_nodes(child))
+    return nodes
+
+
+def benchmark(cursor, queries: dict = DASHBOARD_QUERIES, runs: int = 3) -> dict:
+    """
+    Runs each query with EXPLAIN ANALYZE and keeps the fastest of several
+    runs, so cache warm-up does not skew the comparison.
+
+    Parameters:
+    cursor: A psycopg2 cursor object.
+    queries (dict): Query name -> SQL.
+    runs (int): Executions per query.
+
+    Returns:
+    dict: Query name -> {"planning_ms", "execution_ms", "scans"}.
+    """
+    results = {}
+    for name, query in queries.items():
+        best = None
+        for _ in range(runs):
+            cursor.execute(f"EXPLAIN (ANALYZE, FORMAT JSON) {query}")
+            report = cursor.fetchone()[0][0]
+            if best is None or report["Execution Time"] < best["Execution Time"]:
+                best = report
+        results[name] = {
+            "planning_ms": round(best["Planning Time"], 3),
+            "execution_ms": round(best["Execution Time"], 3),
+            "scans": _scan_nodes(best["Plan"]),
+        }
+    return results
+
+
+def main():
+    try:
+        logger.info("Benchmarking KPI queries before indexing...")
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                before = benchmark(cursor)
+                created = create_indexes(cursor)
+        vacuum_analyze()
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                after = benchmark(cursor)
+
+        record_metrics(
+            "index_benchmark", {"created": created, "before": before, "after": after}
+        )
+        for name in DASHBOARD_QUERIES:
+            logger.info(
+                f"{name}: {before[name]['execution_ms']:.2f} ms "
+                f"{before[name]['scans']} -> {after[name]['execution_ms']:.2f} ms "
+                f"{after[name]['scans']}"
+            )
+        print(f"✅ {len(created)} indexes created on {FACT_TABLE}; benchmark saved.")
+
+    except psycopg2.Error as e:
+        logger.critical(f"Database error: {e}")
+        print(f"❌ Database error: {e}")
+    except Exception as e:
+        logger.critical(f"Unexpected error: {e}")
+        print(f"❌ Unexpected error: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,64 @@
 import pandas as pd
 import psycopg2
 import logging
-import os
+import sys
 import time
 from etl.config import config
+from etl.jobs.load.batch_executor import copy_isolated
+from etl.jobs.load.bulk_load import bulk_load
+from etl.jobs.load.frame_loader import add_columns_sql, integer_columns
+from etl.jobs.utils.data_version import bump_data_version
+from etl.jobs.utils.logger import configure_logging
 
 SEPARATOR_LENGTH = 139
 CSV_PATH = "etl/data/processed/processed_data.csv"
-
-# Ensure the logs directory exists
-os.makedirs("logs", exist_ok=True)
+STAGING_TABLE = "staging_hotel_bookings"
+
+# Staging table columns and their SQL types, in table order
+STAGING_COLUMNS = {
+    "hotel": "TEXT",
+    "is_canceled": "INT",
+    "lead_time": "INT",
+    "arrival_year": "INT",
+    "arrival_month": "TEXT",
+    "arrival_week": "INT",
+    "arrival_day": "INT",
+    "weekend_nights": "INT",
+    "week_nights": "INT",
+    "adults": "INT",
+    "children": "INT",
+    "babies": "INT",
+    "meal_plan": "TEXT",
+    "country": "TEXT",
+    "market_segment": "TEXT",
+    "distribution_channel": "TEXT",
+    "repeated_guest": "INT",
+    "prev_cancellations": "INT",
+    "prev_not_canceled": "INT",
+    "reserved_room": "TEXT",
+    "assigned_room": "TEXT",
+    "booking_changes": "INT",
+    "deposit_type": "TEXT",
+    "agent_id": "TEXT",
+    "company_id": "TEXT",
+    "waiting_days": "INT",
+    "customer_type": "TEXT",
+    "adr": "FLOAT",
+    "parking_spaces": "INT",
+    "special_requests": "INT",
+    "reservation_status": "TEXT",
+    "reservation_status_date": "DATE",
+    "arrival_date": "DATE",
+    "arrival_date_key": "INT",
+    "name_token": "TEXT",
+    "email_token": "TEXT",
+    "phone_token": "TEXT",
+    "card_token": "TEXT",
+    "guest_key": "TEXT",
+}
 
 # Configure logging
-logging.basicConfig(
-    filename="logs/load.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    filemode="w",
-)
+configure_logging("load.log")
 
 
 def print_section(title):
@@ -32,85 +73,71 @@ def print_section(title):
     print("=" * SEPARATOR_LENGTH)
 
 
-def create_staging_table(cursor):
+def create_staging_table(cursor, unlogged: bool = False):
     """
-    Creates the staging table in the PostgreSQL database if it doesn't exist.
+    Creates the staging table in the PostgreSQL database if it doesn't exist,
+    and adds the columns a table from an earlier release lacks.
 
     Parameters:
     cursor: A psycopg2 cursor object.
+    unlogged (bool): Create the table as UNLOGGED (no WAL, truncated after a
+        crash), converting an existing logged table.
     """
+    columns = ",\n            ".join(
+        f"{name} {sql_type}" for name, sql_type in STAGING_COLUMNS.items()
+    )
     cursor.execute(
-        """
-        CREATE TABLE IF NOT EXISTS staging_hotel_bookings (
-            hotel TEXT,
-            is_canceled INT,
-            lead_time INT,
-            arrival_year INT,
-            arrival_month TEXT,
-            arrival_week INT,
-            arrival_day INT,
-            weekend_nights INT,
-            week_nights INT,
-            adults INT,
-            children INT,
-            babies INT,
-            meal_plan TEXT,
-            country TEXT,
-            market_segment TEXT,
-            distribution_channel TEXT,
-            repeated_guest INT,
-            prev_cancellations INT,
-            prev_not_canceled INT,
-            reserved_room TEXT,
-            assigned_room TEXT,
-            booking_changes INT,
-            deposit_type TEXT,
-            agent_id TEXT,
-            company_id TEXT,
-            waiting_days INT,
-            customer_type TEXT,
-            adr FLOAT,
-            parking_spaces INT,
-            special_requests INT,
-            reservation_status TEXT,
-            reservation_status_date DATE
+        f"""
+        CREATE {'UNLOGGED ' if unlogged else ''}TABLE IF NOT EXISTS {STAGING_TABLE} (
+            {columns}
         );
     """
     )
+    cursor.execute(add_columns_sql(STAGING_TABLE, STAGING_COLUMNS))
+    if unlogged:
+        cursor.execute(f"ALTER TABLE {STAGING_TABLE} SET UNLOGGED")
     logging.info("Staging table created or confirmed to exist.")
 
 
-def insert_data(df, cursor):
+def insert_data(data, cursor):
     """
-    Inserts DataFrame rows into the staging table.
+    Copies processed rows into the staging table in savepoint-protected
+    batches; rows the database rejects are quarantined, the rest are loaded.
 
     Parameters:
-    df (DataFrame): Processed data to be inserted.
+    data (DataFrame | Iterable[DataFrame]): Processed data, as one frame or
+        as a stream of chunks.
     cursor: A psycopg2 cursor object.
+
+    Returns:
+    int: Number of rows inserted.
     """
-    insert_query = """
-        INSERT INTO staging_hotel_bookings VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-    """
-    rows_inserted = 0
-    for index, row in df.iterrows():
-        try:
-            cursor.execute(insert_query, tuple(row))
-            rows_inserted += 1
-        except Exception as e:
-            logging.warning(f"Row {index} insertion failed: {e}")
-    return rows_inserted
+    return copy_isolated(
+        cursor,
+        STAGING_TABLE,
+        data,
+        columns=list(STAGING_COLUMNS),
+        int_columns=integer_columns(STAGING_COLUMNS),
+    )
 
 
-def main():
+def main(data=None, bulk: bool = False):
     """
     Main ETL load function to load processed hotel data into PostgreSQL staging.
+
+    Parameters:
+    data (DataFrame | Iterable[DataFrame], optional): Processed data handed
+        over in-process by the transform step. When omitted, the processed
+        CSV is read from disk.
+    bulk (bool): Use an UNLOGGED staging table and the bulk-load session
+        (see bulk_load.py).
     """
     print_section("STARTING DATA LOAD")
     try:
         # Load the processed data
-        df = pd.read_csv(CSV_PATH)
-        df = df.where(pd.notnull(df), None)  # Replace NaN with None (for SQL NULL)
-        logging.info(f"{len(df)} rows read from {CSV_PATH}.")
+        if data is None:
+            data = pd.read_csv(CSV_PATH)
+            logging.info(f"{len(data)} rows read from {CSV_PATH}.")
 
         # Start timing
         start_time = time.time()
@@ -118,9 +145,14 @@ def main():
         # Connect to the database using config
         with psycopg2.connect(**config.DB_CONFIG) as conn:
             with conn.cursor() as cursor:
-                create_staging_table(cursor)
-                rows_inserted = insert_data(df, cursor)
-
+                create_staging_table(cursor, unlogged=bulk)
+                if bulk:
+                    with bulk_load(cursor, [STAGING_TABLE]):
+                        rows_inserted = insert_data(data, cursor)
+                else:
+                    rows_inserted = insert_data(data, cursor)
+
+        bump_data_version()
         elapsed = time.time() - start_time
         logging.info(f"Inserted {rows_inserted} rows in {elapsed:.2f} seconds.")
         print_section("LOAD COMPLETE")
@@ -140,4 +172,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    main(bulk="--bulk" in sys.argv[1:])
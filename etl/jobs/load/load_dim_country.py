@@ -1,55 +1,13 @@
 import pandas as pd
 import psycopg2
-import logging
-import os
-from etl.config import config
 from etl.jobs.utils.logger import setup_logger
+from etl.jobs.utils.data_version import bump_data_version
 from etl.jobs.utils.db_connection import get_db_connection
+from etl.jobs.load.load_dimension import DIMENSIONS, load_dimension
 
 logger = setup_logger("load_dim_country", "load_dim_country.log")
-CSV_PATH = "etl/data/dimensions/dim_country.csv"
-
-
-def create_dim_table(cursor):
-    """
-    Creates the dim_country table in the PostgreSQL database if it doesn't exist.
-    """
-    cursor.execute(
-        """
-    CREATE TABLE IF NOT EXISTS dim_country (
-        country_id SERIAL PRIMARY KEY,
-        country_code TEXT NOT NULL UNIQUE,
-        country TEXT NOT NULL
-    );
-    """
-    )
-
-    logger.info("dim_country table created or already exists.")
-
-
-def insert_data(df, cursor):
-    """
-    Inserts DataFrame rows into the dim_country table.
-
-    Parameters:
-    - df (DataFrame): Data to insert
-    - cursor: psycopg2 cursor object
-    """
-    insert_query = """
-    INSERT INTO dim_country (country_id, country_code, country)
-    VALUES (%s, %s, %s)
-    ON CONFLICT (country_code) DO NOTHING
-    """
-    rows_inserted = 0
-    for _, row in df.iterrows():
-        try:
-            cursor.execute(
-                insert_query, (row["country_id"], row["country_code"], row["country"])
-            )
-            rows_inserted += 1
-        except Exception as e:
-            logger.warning(f"Failed to insert row {row.to_dict()}: {e}")
-    return rows_inserted
+TABLE_NAME = "dim_country"
+CSV_PATH = DIMENSIONS[TABLE_NAME]["csv"]
 
 
 def main():
@@ -58,16 +16,15 @@ def main():
 
         # Load dimension CSV
         df = pd.read_csv(CSV_PATH)
-        df = df.where(pd.notnull(df), None)
         logger.info(f"Loaded {len(df)} rows from {CSV_PATH}")
 
         with get_db_connection() as conn:
             with conn.cursor() as cursor:
-                create_dim_table(cursor)
-                inserted = insert_data(df, cursor)
-                logger.info(f"Inserted {inserted} rows into dim_country")
+                key_map = load_dimension(cursor, TABLE_NAME, df)
+                logger.info(f"dim_country holds {len(key_map)} members")
 
-        print(f"✅ Loaded dim_country with {inserted} rows.")
+        bump_data_version()
+        print(f"✅ Loaded dim_country with {len(key_map)} rows.")
 
     except FileNotFoundError:
         logger.critical(f"File not found: {CSV_PATH}")
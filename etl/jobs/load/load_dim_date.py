@@ -0,0 +1,104 @@
+import logging
+import pandas as pd
+import psycopg2
+from psycopg2.extras import execute_values
+from etl.jobs.load.frame_loader import frame_rows
+from etl.jobs.utils.logger import setup_logger
+from etl.jobs.utils.data_version import bump_data_version
+from etl.jobs.utils.db_connection import get_db_connection
+from etl.jobs.transform.transform_dim_date import OUTPUT_PATH
+
+logger = setup_logger("load_dim_date", "load_dim_date.log")
+TABLE_NAME = "dim_date"
+CSV_PATH = OUTPUT_PATH
+
+# dim_date columns and their SQL types; the key is the YYYYMMDD integer the
+# transform derives, so no database-side key mapping is needed.
+DIM_DATE_COLUMNS = {
+    "date_key": "INT PRIMARY KEY",
+    "date": "DATE NOT NULL UNIQUE",
+    "year": "SMALLINT NOT NULL",
+    "quarter": "SMALLINT NOT NULL",
+    "month": "SMALLINT NOT NULL",
+    "month_name": "TEXT NOT NULL",
+    "week": "SMALLINT NOT NULL",
+    "day": "SMALLINT NOT NULL",
+    "day_of_week": "SMALLINT NOT NULL",
+    "is_weekend": "BOOLEAN NOT NULL",
+    "season": "TEXT NOT NULL",
+}
+
+
+def create_dim_date_table(cursor):
+    """
+    Creates the date dimension table if it doesn't exist.
+
+    Parameters:
+    cursor: A psycopg2 cursor object.
+    """
+    columns = ",\n            ".join(
+        f"{name} {sql_type}" for name, sql_type in DIM_DATE_COLUMNS.items()
+    )
+    cursor.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
+            {columns}
+        );
+        """
+    )
+    logging.info(f"{TABLE_NAME} table created or already exists.")
+
+
+def load_dim_date(cursor, df: pd.DataFrame) -> int:
+    """
+    Inserts the days missing from the date dimension with one batched
+    statement; days already present are left untouched.
+
+    Parameters:
+    cursor: A psycopg2 cursor object.
+    df (pd.DataFrame): Output of transform_dim_date.build_dim_date().
+
+    Returns:
+    int: Number of days inserted.
+    """
+    create_dim_date_table(cursor)
+    rows = frame_rows(df, list(DIM_DATE_COLUMNS))
+    if not rows:
+        return 0
+    execute_values(
+        cursor,
+        f"INSERT INTO {TABLE_NAME} ({', '.join(DIM_DATE_COLUMNS)}) VALUES %s "
+        "ON CONFLICT (date_key) DO NOTHING",
+        rows,
+        page_size=len(rows),
+    )
+    logging.info(f"{cursor.rowcount} new days inserted into {TABLE_NAME}")
+    return cursor.rowcount
+
+
+def main():
+    try:
+        logger.info("Starting dim_date load process...")
+
+        df = pd.read_csv(CSV_PATH)
+        logger.info(f"Loaded {len(df)} rows from {CSV_PATH}")
+
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                inserted = load_dim_date(cursor, df)
+        bump_data_version()
+        print(f"✅ Loaded dim_date with {inserted} new days.")
+
+    except FileNotFoundError:
+        logger.critical(f"File not found: {CSV_PATH}")
+        print(f"❌ File not found: {CSV_PATH}")
+    except psycopg2.Error as e:
+        logger.critical(f"Database error: {e}")
+        print(f"❌ Database error: {e}")
+    except Exception as e:
+        logger.critical(f"Unexpected error: {e}")
+        print(f"❌ Unexpected error: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import pandas as pd
+import psycopg2
+from etl.jobs.utils.logger import setup_logger
+from etl.jobs.utils.data_version import bump_data_version
+from etl.jobs.utils.db_connection import get_db_connection
+from etl.jobs.load.load_dimension import DIMENSIONS, load_dimension
+
+logger = setup_logger("load_dim_guest", "load_dim_guest.log")
+TABLE_NAME = "dim_guest"
+CSV_PATH = DIMENSIONS[TABLE_NAME]["csv"]
+
+
+def main():
+    try:
+        logger.info("Starting dim_guest load process...")
+
+        # Load dimension CSV
+        df = pd.read_csv(CSV_PATH)
+        logger.info(f"Loaded {len(df)} rows from {CSV_PATH}")
+
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                key_map = load_dimension(cursor, TABLE_NAME, df)
+                logger.info(f"dim_guest holds {len(key_map)} members")
+
+        bump_data_version()
+        print(f"✅ Loaded dim_guest with {len(key_map)} rows.")
+
+    except FileNotFoundError:
+        logger.critical(f"File not found: {CSV_PATH}")
+        print(f"❌ File not found: {CSV_PATH}")
+    except psycopg2.Error as e:
+        logger.critical(f"Database error: {e}")
+        print(f"❌ Database error: {e}")
+    except Exception as e:
+        logger.critical(f"Unexpected error: {e}")
+        print(f"❌ Unexpected error: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,47 +1,13 @@
 import pandas as pd
 import psycopg2
-import logging
-import os
-from etl.config import config
 from etl.jobs.utils.logger import setup_logger
+from etl.jobs.utils.data_version import bump_data_version
 from etl.jobs.utils.db_connection import get_db_connection
+from etl.jobs.load.load_dimension import DIMENSIONS, load_dimension
 
 logger = setup_logger("load_dim_hotel", "load_dim_hotel.log")
-CSV_PATH = "etl/data/dimensions/dim_hotel.csv"
-
-
-def create_dim_table(cursor):
-    """
-    Creates the dim_hotel table in the PostgreSQL database if it doesn't exist.
-    """
-    cursor.execute(
-        """
-        CREATE TABLE IF NOT EXISTS dim_hotel (
-            hotel_id SERIAL PRIMARY KEY,
-            hotel TEXT NOT NULL UNIQUE
-        );
-        """
-    )
-    logger.info("dim_hotel table created or already exists.")
-
-
-def insert_data(df, cursor):
-    """
-    Inserts DataFrame rows into the dim_hotel table.
-
-    Parameters:
-    - df (DataFrame): Data to insert
-    - cursor: psycopg2 cursor object
-    """
-    insert_query = "INSERT INTO dim_hotel (hotel_id, hotel) VALUES (%s, %s) ON CONFLICT (hotel) DO NOTHING"
-    rows_inserted = 0
-    for _, row in df.iterrows():
-        try:
-            cursor.execute(insert_query, (row["hotel_id"], row["hotel"]))
-            rows_inserted += 1
-        except Exception as e:
-            logger.warning(f"Failed to insert row {row.to_dict()}: {e}")
-    return rows_inserted
+TABLE_NAME = "dim_hotel"
+CSV_PATH = DIMENSIONS[TABLE_NAME]["csv"]
 
 
 def main():
@@ -50,16 +16,15 @@ def main():
 
         # Load dimension CSV
         df = pd.read_csv(CSV_PATH)
-        df = df.where(pd.notnull(df), None)
         logger.info(f"Loaded {len(df)} rows from {CSV_PATH}")
 
         with get_db_connection() as conn:
             with conn.cursor() as cursor:
-                create_dim_table(cursor)
-                inserted = insert_data(df, cursor)
-                logger.info(f"Inserted {inserted} rows into dim_hotel")
+                key_map = load_dimension(cursor, TABLE_NAME, df)
+                logger.info(f"dim_hotel holds {len(key_map)} members")
 
-        print(f"✅ Loaded dim_hotel with {inserted} rows.")
+        bump_data_version()
+        print(f"✅ Loaded dim_hotel with {len(key_map)} rows.")
 
     except FileNotFoundError:
         logger.critical(f"File not found: {CSV_PATH}")
@@ -1,47 +1,13 @@
 import pandas as pd
 import psycopg2
-import logging
-import os
-from etl.config import config
 from etl.jobs.utils.logger import setup_logger
+from etl.jobs.utils.data_version import bump_data_version
 from etl.jobs.utils.db_connection import get_db_connection
+from etl.jobs.load.load_dimension import DIMENSIONS, load_dimension
 
 logger = setup_logger("load_dim_meal", "load_dim_meal.log")
-CSV_PATH = "etl/data/dimensions/dim_meal.csv"
-
-
-def create_dim_table(cursor):
-    """
-    Creates the dim_meal table in the PostgreSQL database if it doesn't exist.
-    """
-    cursor.execute(
-        """
-        CREATE TABLE IF NOT EXISTS dim_meal (
-            meal_id SERIAL PRIMARY KEY,
-            meal_plan TEXT NOT NULL UNIQUE
-        );
-        """
-    )
-    logger.info("dim_meal table created or already exists.")
-
-
-def insert_data(df, cursor):
-    """
-    Inserts DataFrame rows into the dim_meal table.
-
-    Parameters:
-    - df (DataFrame): Data to insert
-    - cursor: psycopg2 cursor object
-    """
-    insert_query = "INSERT INTO dim_meal (meal_id, meal_plan) VALUES (%s, %s) ON CONFLICT (meal_plan) DO NOTHING"
-    rows_inserted = 0
-    for _, row in df.iterrows():
-        try:
-            cursor.execute(insert_query, (row["meal_id"], row["meal_plan"]))
-            rows_inserted += 1
-        except Exception as e:
-            logger.warning(f"Failed to insert row {row.to_dict()}: {e}")
-    return rows_inserted
+TABLE_NAME = "dim_meal"
+CSV_PATH = DIMENSIONS[TABLE_NAME]["csv"]
 
 
 def main():
@@ -50,16 +16,15 @@ def main():
 
         # Load dimension CSV
         df = pd.read_csv(CSV_PATH)
-        df = df.where(pd.notnull(df), None)
         logger.info(f"Loaded {len(df)} rows from {CSV_PATH}")
 
         with get_db_connection() as conn:
             with conn.cursor() as cursor:
-                create_dim_table(cursor)
-                inserted = insert_data(df, cursor)
-                logger.info(f"Inserted {inserted} rows into dim_meal")
+                key_map = load_dimension(cursor, TABLE_NAME, df)
+                logger.info(f"dim_meal holds {len(key_map)} members")
 
-        print(f"✅ Loaded dim_meal with {inserted} rows.")
+        bump_data_version()
+        print(f"✅ Loaded dim_meal with {len(key_map)} rows.")
 
     except FileNotFoundError:
         logger.critical(f"File not found: {CSV_PATH}")
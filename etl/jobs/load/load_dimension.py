@@ -0,0 +1,338 @@
+import logging
+import pandas as pd
+from psycopg2.extras import execute_values
+from etl.jobs.load.frame_loader import frame_rows
+
+DIM_PATH = "etl/data/dimensions"
+
+# Dimension definitions: surrogate key, natural key, the processed column the
+# natural key comes from, descriptive attributes, whether attribute changes
+# are kept as Type 2 history, the CSV artifact written by the transform step
+# and the fact column that references the dimension.
+DIMENSIONS = {
+    "dim_hotel": {
+        "key": "hotel_id",
+        "natural_key": "hotel",
+        "source": "hotel",
+        "attributes": [],
+        "scd2": False,
+        "csv": f"{DIM_PATH}/dim_hotel.csv",
+        "fact_key": "hotel_id",
+    },
+    "dim_country": {
+        "key": "country_id",
+        "natural_key": "country_code",
+        "source": "country",
+        "attributes": ["country"],
+        "scd2": True,
+        "csv": f"{DIM_PATH}/dim_country.csv",
+        "fact_key": "country_id",
+    },
+    "dim_meal": {
+        "key": "meal_id",
+        "natural_key": "meal_plan",
+        "source": "meal_plan",
+        "attributes": [],
+        "scd2": False,
+        "csv": f"{DIM_PATH}/dim_meal.csv",
+        "fact_key": "meal_plan_id",
+    },
+    "dim_customer": {
+        "key": "customer_id",
+        "natural_key": "customer_type",
+        "source": "customer_type",
+        "attributes": [],
+        "scd2": False,
+        "csv": f"{DIM_PATH}/dim_customer.csv",
+        "fact_key": "customer_id",
+    },
+    "dim_guest": {
+        "key": "guest_id",
+        "natural_key": "guest_key",
+        "source": "guest_key",
+        "attributes": [],
+        "scd2": False,
+        "csv": f"{DIM_PATH}/dim_guest.csv",
+        "fact_key": "guest_id",
+    },
+}
+
+# Version-tracking columns of Type 2 dimensions. A member has exactly one
+# current version (valid_to NULL); a change closes it and opens a new one.
+SCD2_COLUMNS = {
+    "attr_hash": "BIGINT NOT NULL",
+    "valid_from": "TIMESTAMPTZ NOT NULL DEFAULT now()",
+    "valid_to": "TIMESTAMPTZ",
+    "is_current": "BOOLEAN NOT NULL DEFAULT TRUE",
+}
+
+# Natural key -> surrogate key maps read back from the database, per table
+_KEY_MAPS = {}
+
+
+def create_dimension_table(cursor, table: str):
+    """
+    Creates a dimension table if it doesn't exist. The surrogate key is a
+    SERIAL assigned by the database; the natural key is unique, or unique
+    among current versions for a Type 2 dimension.
+
+    Parameters:
+    cursor: A psycopg2 cursor object.
+    table (str): Dimension name, a key of DIMENSIONS.
+    """
+    spec = DIMENSIONS[table]
+    columns = [f"{name} TEXT NOT NULL" for name in spec["attributes"]]
+    if spec["scd2"]:
+        columns += [f"{name} {sql_type}" for name, sql_type in SCD2_COLUMNS.items()]
+    unique = "" if spec["scd2"] else " UNIQUE"
+    attributes = "".join(f",\n            {column}" for column in columns)
+    cursor.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            {spec['key']} SERIAL PRIMARY KEY,
+            {spec['natural_key']} TEXT NOT NULL{unique}{attributes}
+        );
+        """
+    )
+    if spec["scd2"]:
+        migrate_scd2(cursor, table)
+        cursor.execute(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {table}_current "
+            f"ON {table} ({spec['natural_key']}) WHERE is_current"
+        )
+    logging.info(f"{table} table created or already exists.")
+
+
+def migrate_scd2(cursor, table: str):
+    """
+    Brings a Type 2 dimension created before it kept history (plain UNIQUE
+    natural key, no version columns) to the current layout; a no-op on an
+    up-to-date table. Existing rows become the current versions, with their
+    attribute hashes backfilled.
+
+    Parameters:
+    cursor: A psycopg2 cursor object.
+    table (str): Dimension name, a key of DIMENSIONS with scd2 enabled.
+    """
+    spec = DIMENSIONS[table]
+    for name, sql_type in SCD2_COLUMNS.items():
+        # attr_hash is filled in below before it becomes NOT NULL
+        if name == "attr_hash":
+            sql_type = sql_type.replace(" NOT NULL", "")
+        cursor.execute(
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {name} {sql_type}"
+        )
+
+    key, attributes = spec["key"], spec["attributes"]
+    cursor.execute(
+        f"SELECT {', '.join([key] + attributes)} FROM {table} WHERE attr_hash IS NULL"
+    )
+    stale = pd.DataFrame(cursor.fetchall(), columns=[key] + attributes)
+    if len(stale):
+        stale["attr_hash"] = attribute_hash(stale, attributes)
+        execute_values(
+            cursor,
+            f"UPDATE {table} AS d SET attr_hash = v.attr_hash "
+            f"FROM (VALUES %s) AS v ({key}, attr_hash) WHERE d.{key} = v.{key}",
+            frame_rows(stale, [key, "attr_hash"]),
+            page_size=len(stale),
+        )
+        logging.info(f"{table}: attribute hashes backfilled for {len(stale)} rows")
+    cursor.execute(f"ALTER TABLE {table} ALTER COLUMN attr_hash SET NOT NULL")
+    # Default name of the UNIQUE constraint the table was created with
+    cursor.execute(
+        f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS "
+        f"{table}_{spec['natural_key']}_key"
+    )
+
+
+def attribute_hash(df: pd.DataFrame, attributes: list) -> pd.Series:
+    """
+    Hashes the descriptive attributes of each member in one vectorized pass.
+    The hash is deterministic across runs, so it can be compared with the
+    one stored on the current version.
+
+    Parameters:
+    df (pd.DataFrame): Dimension members.
+    attributes (list): Attribute columns to hash.
+
+    Returns:
+    pd.Series: Signed 64-bit hash per row, storable as BIGINT.
+    """
+    hashes = pd.util.hash_pandas_object(df[attributes].astype(str), index=False)
+    return pd.Series(hashes.to_numpy().view("int64"), index=df.index)
+
+
+def merge_scd2(cursor, table: str, df: pd.DataFrame) -> int:
+    """
+    Applies a batch of members to a Type 2 dimension. The incoming attribute
+    hashes are compared with the current versions in a single join: changed
+    members get their current version closed and a new one opened, new
+    members get a first version, and unchanged members are not written.
+
+    Parameters:
+    cursor: A psycopg2 cursor object.
+    table (str): Dimension name, a key of DIMENSIONS with scd2 enabled.
+    df (pd.DataFrame): Dimension members (natural key and attributes), in
+        order of first appearance.
+
+    Returns:
+    int: Number of versions inserted (new and changed members).
+    """
+    spec = DIMENSIONS[table]
+    natural_key = spec["natural_key"]
+    columns = [natural_key] + spec["attributes"]
+    members = df.drop_duplicates(subset=natural_key)[columns].reset_index(drop=True)
+    members["attr_hash"] = attribute_hash(members, spec["attributes"])
+    members["position"] = members.index
+    incoming = f"{table}_incoming"
+
+    cursor.execute(
+        f"""
+        CREATE TEMP TABLE IF NOT EXISTS {incoming} (
+            position INT,
+            {', '.join(f'{name} TEXT' for name in columns)},
+            attr_hash BIGINT
+        ) ON COMMIT DROP;
+        TRUNCATE {incoming};
+        """
+    )
+    rows = frame_rows(members, ["position"] + columns + ["attr_hash"])
+    if not rows:
+        return 0
+    execute_values(
+        cursor, f"INSERT INTO {incoming} VALUES %s", rows, page_size=len(rows)
+    )
+
+    cursor.execute(
+        f"""
+        UPDATE {table} AS d SET valid_to = now(), is_current = FALSE
+        FROM {incoming} i
+        WHERE d.{natural_key} = i.{natural_key}
+          AND d.is_current AND d.attr_hash <> i.attr_hash;
+        """
+    )
+    changed = cursor.rowcount
+    cursor.execute(
+        f"""
+        INSERT INTO {table} ({', '.join(columns)}, attr_hash)
+        SELECT {', '.join(f'i.{name}' for name in columns)}, i.attr_hash
+        FROM {incoming} i
+        LEFT JOIN {table} d ON d.{natural_key} = i.{natural_key} AND d.is_current
+        WHERE d.{natural_key} IS NULL
+        ORDER BY i.position;
+        """
+    )
+    inserted = cursor.rowcount
+    logging.info(
+        f"{table}: {inserted - changed} new members, {changed} changed members"
+    )
+    return inserted
+
+
+def fetch_key_map(cursor, table: str, refresh: bool = False) -> dict:
+    """
+    Returns the authoritative natural key -> surrogate key map of a dimension,
+    read from the database in one round trip and cached for later calls.
+    Type 2 dimensions map each member to its current version.
+
+    Parameters:
+    cursor: A psycopg2 cursor object.
+    table (str): Dimension name, a key of DIMENSIONS.
+    refresh (bool): Ignore the cached map and read it again.
+
+    Returns:
+    dict: Natural key -> surrogate key.
+    """
+    if refresh or table not in _KEY_MAPS:
+        spec = DIMENSIONS[table]
+        current = " WHERE is_current" if spec["scd2"] else ""
+        cursor.execute(
+            f"SELECT {spec['natural_key']}, {spec['key']} FROM {table}{current}"
+        )
+        _KEY_MAPS[table] = dict(cursor.fetchall())
+    return _KEY_MAPS[table]
+
+
+def load_dimension(cursor, table: str, df: pd.DataFrame) -> dict:
+    """
+    Loads a whole dimension with a single batched INSERT and reads the
+    resulting key map back, so the load costs a constant number of round
+    trips whatever the dimension size. Type 2 dimensions go through
+    merge_scd2() instead.
+
+    Parameters:
+    cursor: A psycopg2 cursor object.
+    table (str): Dimension name, a key of DIMENSIONS.
+    df (pd.DataFrame): Dimension members (natural key and attributes).
+
+    Returns:
+    dict: Natural key -> surrogate key, for all members in the table.
+    """
+    spec = DIMENSIONS[table]
+    columns = [spec["natural_key"]] + spec["attributes"]
+    rows = frame_rows(df.drop_duplicates(subset=spec["natural_key"]), columns)
+
+    create_dimension_table(cursor, table)
+    if spec["scd2"]:
+        merge_scd2(cursor, table, df)
+    elif rows:
+        execute_values(
+            cursor,
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s "
+            f"ON CONFLICT ({spec['natural_key']}) DO NOTHING",
+            rows,
+            page_size=len(rows),
+        )
+        logging.info(f"{cursor.rowcount} new rows inserted into {table}")
+
+    return fetch_key_map(cursor, table, refresh=True)
+
+
+def fact_key_maps(cursor, dims: dict = None) -> dict:
+    """
+    Builds, for each fact foreign key, the translation from the surrogate keys
+    assigned by the pandas transform (in the dimension CSVs) to the
+    authoritative keys in the database.
+
+    Parameters:
+    cursor: A psycopg2 cursor object.
+    dims (dict, optional): Dimension name -> DataFrame built in-process.
+        Dimensions not given are read from their CSV.
+
+    Returns:
+    dict: Fact column -> pd.Series mapping CSV keys to database keys.
+    """
+    key_maps = {}
+    for table, spec in DIMENSIONS.items():
+        dim = (dims or {}).get(table)
+        if dim is None:
+            dim = pd.read_csv(spec["csv"])
+        key_map = fetch_key_map(cursor, table)
+        key_maps[spec["fact_key"]] = pd.Series(
+            dim[spec["natural_key"]].map(key_map).to_numpy(), index=dim[spec["key"]]
+        )
+    return key_maps
+
+
+def remap_fact_keys(fact: pd.DataFrame, key_maps: dict) -> pd.DataFrame:
+    """
+    Replaces the foreign keys of fact rows using the maps from
+    fact_key_maps(), with one vectorized lookup per column.
+
+    Parameters:
+    fact (pd.DataFrame): Fact rows with foreign keys from the dimension CSVs.
+    key_maps (dict): Output of fact_key_maps().
+
+    Returns:
+    pd.DataFrame: The fact rows with database foreign keys.
+    """
+    fact = fact.copy()
+    for column, csv_to_db in key_maps.items():
+        if column in fact.columns:
+            # Keep nullable integer dtypes the transform chose (compact layout)
+            dtype = fact[column].dtype
+            if not isinstance(dtype, pd.api.extensions.ExtensionDtype):
+                dtype = "Int64"
+            fact[column] = fact[column].map(csv_to_db).astype(dtype)
+    return fact
@@ -1,115 +1,308 @@
+import hashlib
 import pandas as pd
 import psycopg2
 import logging
-import os
+import sys
 import time
+from contextlib import nullcontext
 from etl.config import config
+from etl.jobs.load.batch_executor import copy_isolated
+from etl.jobs.load.bulk_load import bulk_load
+from etl.jobs.load.frame_loader import add_columns_sql, integer_columns, iter_chunks
+from etl.jobs.load.load_dimension import fact_key_maps, remap_fact_keys
+from etl.jobs.transform.rules import MONTH_NAMES, allowed_values
+from etl.jobs.utils.data_version import bump_data_version
+from etl.jobs.utils.logger import configure_logging
 
-os.makedirs("logs", exist_ok=True)
-logging.basicConfig(
-    filename="logs/load_fact_bookings.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    filemode="w",
-)
+configure_logging("load_fact_bookings.log")
 
 CSV_PATH = "etl/data/facts/fact_bookings.csv"
 
-CREATE_QUERY = """
-    CREATE TABLE IF NOT EXISTS fact_bookings (
-        booking_id BIGINT PRIMARY KEY,
-        hotel_id INT,
-        country_id INT,
-        meal_plan_id INT,
-        customer_id INT,
-        arrival_year INT,
-        arrival_month TEXT,
-        arrival_day INT,
-        lead_time BIGINT,
-        weekend_nights BIGINT,
-        week_nights BIGINT,
-        adults BIGINT,
-        children FLOAT,
-        babies BIGINT,
-        is_canceled INT,
-        booking_changes BIGINT,
-        deposit_type TEXT,
-        adr FLOAT,
-        parking_spaces BIGINT,
-        special_requests BIGINT,
-        reservation_status TEXT,
-        reservation_status_date DATE
-    );
-"""
-
-INSERT_QUERY = """
-    INSERT INTO fact_bookings (
-        booking_id, hotel_id, country_id, meal_plan_id, customer_id,
-        arrival_year, arrival_month, arrival_day, lead_time,
-        weekend_nights, week_nights, adults, children, babies,
-        is_canceled, booking_changes, deposit_type, adr,
-        parking_spaces, special_requests, reservation_status,
-        reservation_status_date
-    ) VALUES (
-        %s, %s, %s, %s, %s,
-        %s, %s, %s, %s,
-        %s, %s, %s, %s, %s,
-        %s, %s, %s, %s,
-        %s, %s, %s,
-        %s
-    );
-"""
-
-
-COLUMNS_TO_INSERT = [
-    "booking_id",
-    "hotel_id",
-    "country_id",
-    "meal_plan_id",
-    "customer_id",
-    "arrival_year",
-    "arrival_month",
-    "arrival_day",
-    "lead_time",
-    "weekend_nights",
-    "week_nights",
-    "adults",
-    "children",
-    "babies",
-    "is_canceled",
-    "booking_changes",
-    "deposit_type",
-    "adr",
-    "parking_spaces",
-    "special_requests",
-    "reservation_status",
-    "reservation_status_date",
-]
-
-
-def main():
+FACT_TABLE = "fact_bookings"
+
+# fact_bookings columns and their SQL types, in table order
+STANDARD_FACT_COLUMNS = {
+    "booking_id": "BIGINT PRIMARY KEY",
+    "hotel_id": "INT",
+    "country_id": "INT",
+    "meal_plan_id": "INT",
+    "customer_id": "INT",
+    "guest_id": "INT",
+    "arrival_year": "INT",
+    "arrival_month": "TEXT",
+    "arrival_day": "INT",
+    "arrival_date_key": "INT",
+    "lead_time": "BIGINT",
+    "weekend_nights": "BIGINT",
+    "week_nights": "BIGINT",
+    "adults": "BIGINT",
+    "children": "FLOAT",
+    "babies": "BIGINT",
+    "is_canceled": "INT",
+    "booking_changes": "BIGINT",
+    "deposit_type": "TEXT",
+    "adr": "FLOAT",
+    "parking_spaces": "BIGINT",
+    "special_requests": "BIGINT",
+    "reservation_status": "TEXT",
+    "reservation_status_date": "DATE",
+}
+
+# Compact layout: the narrowest types the validated value ranges allow, the
+# month as its number and enums for low-cardinality text. Columns are ordered
+# widest first so the row needs no alignment padding.
+COMPACT_FACT_COLUMNS = {
+    "adr": "FLOAT",
+    "booking_id": "INT PRIMARY KEY",
+    "arrival_date_key": "INT",
+    "guest_id": "INT",
+    "reservation_status_date": "DATE",
+    "deposit_type": "fact_deposit_type",
+    "reservation_status": "fact_reservation_status",
+    "hotel_id": "SMALLINT",
+    "country_id": "SMALLINT",
+    "meal_plan_id": "SMALLINT",
+    "customer_id": "SMALLINT",
+    "arrival_year": "SMALLINT",
+    "arrival_month": "SMALLINT",
+    "arrival_day": "SMALLINT",
+    "lead_time": "SMALLINT",
+    "weekend_nights": "SMALLINT",
+    "week_nights": "SMALLINT",
+    "adults": "SMALLINT",
+    "children": "SMALLINT",
+    "babies": "SMALLINT",
+    "is_canceled": "SMALLINT",
+    "booking_changes": "SMALLINT",
+    "parking_spaces": "SMALLINT",
+    "special_requests": "SMALLINT",
+}
+
+# Enum types of the compact layout: column -> (type name, labels)
+FACT_ENUMS = {
+    "deposit_type": ("fact_deposit_type", allowed_values("deposit_type")),
+    "reservation_status": (
+        "fact_reservation_status",
+        allowed_values("reservation_status"),
+    ),
+}
+
+FACT_COLUMNS = COMPACT_FACT_COLUMNS if config.COMPACT_FACT else STANDARD_FACT_COLUMNS
+
+
+def _enum_ddl() -> str:
+    """
+    Returns the statements creating the enum types of the compact layout.
+    """
+    statements = []
+    for type_name, labels in FACT_ENUMS.values():
+        values = ", ".join("'" + label.replace("'", "''") + "'" for label in labels)
+        statements.append(
+            "DO $$ BEGIN\n"
+            f"    CREATE TYPE {type_name} AS ENUM ({values});\n"
+            "EXCEPTION WHEN duplicate_object THEN NULL;\n"
+            "END $$;\n"
+        )
+    return "".join(statements)
+
+
+def month_name_sql(column: str) -> str:
+    """
+    Returns a SQL expression giving the month name of an arrival_month
+    column, whichever layout the fact table uses.
+    """
+    if not config.COMPACT_FACT:
+        return column
+    names = ", ".join(f"'{name}'" for name in MONTH_NAMES)
+    return f"(ARRAY[{names}])[{column}]"
+
+
+# Identity numbering the rows in load order across runs (booking_id ranges
+# are handed out per input file). The KPI refresh uses it as its watermark. Added with
+# ALTER TABLE so tables created before it get the column too.
+LOAD_SEQ_COLUMN = "load_seq"
+
+# One row per input file loaded. build_fact() numbers a file's rows from 1,
+# so stored booking_ids are those positions plus the offset the file got on
+# its first load: a rerun of the file maps onto the same ids, while another
+# file gets ids above every id given out so far.
+FACT_LOADS_TABLE = "fact_loads"
+
+CREATE_QUERY = (
+    (_enum_ddl() if config.COMPACT_FACT else "")
+    + f"CREATE TABLE IF NOT EXISTS {FACT_TABLE} (\n"
+    + ",\n".join(f"    {name} {sql_type}" for name, sql_type in FACT_COLUMNS.items())
+    + "\n);\n"
+    + add_columns_sql(FACT_TABLE, FACT_COLUMNS)
+    + f"ALTER TABLE {FACT_TABLE} ADD COLUMN IF NOT EXISTS {LOAD_SEQ_COLUMN} "
+    + "BIGINT GENERATED ALWAYS AS IDENTITY;\n"
+    + f"CREATE INDEX IF NOT EXISTS {FACT_TABLE}_{LOAD_SEQ_COLUMN}_idx "
+    + f"ON {FACT_TABLE} ({LOAD_SEQ_COLUMN});\n"
+    + f"CREATE TABLE IF NOT EXISTS {FACT_LOADS_TABLE} (\n"
+    + "    fingerprint TEXT PRIMARY KEY,\n"
+    + "    id_offset BIGINT NOT NULL,\n"
+    + "    id_span BIGINT NOT NULL DEFAULT 0\n"
+    + ");"
+)
+
+COLUMNS_TO_INSERT = list(FACT_COLUMNS)
+
+
+def file_fingerprint(path: str) -> str:
+    """
+    Returns the SHA-256 of a file's bytes, identifying an input across runs.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(2**20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def booking_id_offset(cursor, fingerprint: str, register: bool = True) -> int:
+    """
+    Returns the booking_id offset of an input file. A file seen for the first
+    time is registered with an offset above every booking_id loaded or
+    reserved by an earlier file.
+
+    Parameters:
+    cursor: A psycopg2 cursor object.
+    fingerprint (str): Output of file_fingerprint().
+    register (bool): Register an unknown file; otherwise return 0 for it.
+
+    Returns:
+    int: The offset to add to the file's row positions.
+    """
+    cursor.execute(
+        f"SELECT id_offset FROM {FACT_LOADS_TABLE} WHERE fingerprint = %s",
+        (fingerprint,),
+    )
+    row = cursor.fetchone()
+    if row is not None or not register:
+        return int(row[0]) if row else 0
+    cursor.execute(
+        f"""
+        INSERT INTO {FACT_LOADS_TABLE} (fingerprint, id_offset)
+        SELECT %s, COALESCE(MAX(id), 0) FROM (
+            SELECT MAX(booking_id) AS id FROM {FACT_TABLE}
+            UNION ALL
+            SELECT MAX(id_offset + id_span) FROM {FACT_LOADS_TABLE}
+        ) ids
+        RETURNING id_offset
+        """,
+        (fingerprint,),
+    )
+    offset = int(cursor.fetchone()[0])
+    logging.info(f"New input {fingerprint[:12]} gets booking_ids above {offset}.")
+    return offset
+
+
+def record_booking_span(cursor, fingerprint: str, span: int):
+    """
+    Records the highest row position of an input file, so the ids of its
+    rows that were not loaded are not handed to the next file either.
+    """
+    cursor.execute(
+        f"UPDATE {FACT_LOADS_TABLE} SET id_span = GREATEST(id_span, %s) "
+        "WHERE fingerprint = %s",
+        (int(span), fingerprint),
+    )
+
+
+def loaded_booking_ids(cursor, offset: int = 0) -> pd.Index:
+    """
+    Returns the booking_ids already in fact_bookings above an input's
+    offset. Read once before a load, while the primary key still exists.
+    """
+    cursor.execute(
+        f"SELECT booking_id FROM {FACT_TABLE} WHERE booking_id > %s", (int(offset),)
+    )
+    return pd.Index([row[0] for row in cursor.fetchall()], dtype="int64")
+
+
+def shift_booking_ids(fact: pd.DataFrame, offset: int) -> pd.DataFrame:
+    """
+    Turns the row positions build_fact() stores in booking_id into the
+    input's stable ids (see booking_id_offset()).
+    """
+    return fact.assign(booking_id=fact["booking_id"].astype("int64") + offset)
+
+
+def drop_loaded_rows(fact: pd.DataFrame, loaded: pd.Index) -> pd.DataFrame:
+    """
+    Drops the fact rows whose booking_id is already loaded, so a rerun of an
+    input adds nothing instead of colliding with the primary key, or with
+    its rebuild after a bulk load. The SQL engine does the same with an
+    anti-join.
+
+    Parameters:
+    fact (pd.DataFrame): Fact rows, after shift_booking_ids().
+    loaded (pd.Index): Output of loaded_booking_ids().
+
+    Returns:
+    pd.DataFrame: The rows not loaded yet.
+    """
+    new = ~fact["booking_id"].isin(loaded)
+    if not new.all():
+        logging.info(f"{(~new).sum()} fact rows already loaded, skipped.")
+    return fact[new]
+
+
+def main(data=None, bulk: bool = False, fingerprint: str = None):
+    """
+    Loads the fact table into PostgreSQL with COPY, in savepoint-protected
+    batches so rows the database rejects are quarantined, not fatal.
+
+    Parameters:
+    data (DataFrame | Iterable[DataFrame], optional): Fact rows handed over
+        in-process. When omitted, the fact CSV is read from disk.
+    bulk (bool): Defer the primary key until the rows are in and tune the
+        session for the load (see bulk_load.py).
+    fingerprint (str, optional): Identity of the input the rows come from;
+        required with data, the fact CSV's file_fingerprint() otherwise.
+    """
     try:
-        df = pd.read_csv(CSV_PATH)
-        df = df.where(pd.notnull(df), None)
-        logging.info(f"Loaded {len(df)} rows from {CSV_PATH}")
+        if data is None:
+            data = pd.read_csv(CSV_PATH)
+            fingerprint = file_fingerprint(CSV_PATH)
+            logging.info(f"Loaded {len(data)} rows from {CSV_PATH}")
+        if fingerprint is None:
+            raise ValueError("In-process fact rows need the fingerprint of their input")
+        span = []
 
         start = time.time()
         with psycopg2.connect(**config.DB_CONFIG) as conn:
             with conn.cursor() as cur:
                 cur.execute(CREATE_QUERY)
 
-                for idx, row in df[COLUMNS_TO_INSERT].iterrows():
-                    try:
-                        cur.execute(INSERT_QUERY, tuple(row))
-                    except Exception as e:
-                        logging.error(f"❌ Failed to insert row {idx}: {e}")
-                        logging.warning(f"Row data: {row.to_dict()}")
+                # Foreign keys come from the dimension CSVs; swap them for the
+                # authoritative keys the database assigned to each member.
+                key_maps = fact_key_maps(cur)
+                offset = booking_id_offset(cur, fingerprint)
+                loaded = loaded_booking_ids(cur, offset)
+
+                def new_rows(chunks):
+                    for chunk in chunks:
+                        span.append(chunk["booking_id"].max() if len(chunk) else 0)
+                        chunk = shift_booking_ids(chunk, offset)
+                        yield remap_fact_keys(drop_loaded_rows(chunk, loaded), key_maps)
+
+                with bulk_load(cur, [FACT_TABLE]) if bulk else nullcontext():
+                    rows = copy_isolated(
+                        cur,
+                        FACT_TABLE,
+                        new_rows(iter_chunks(data)),
+                        columns=COLUMNS_TO_INSERT,
+                        int_columns=integer_columns(FACT_COLUMNS),
+                    )
+                record_booking_span(cur, fingerprint, max(span, default=0))
 
+        bump_data_version()
         elapsed = time.time() - start
         logging.info(
-            f"Inserted {len(df)} rows into fact_bookings in {elapsed:.2f} seconds."
+            f"Inserted {rows} rows into fact_bookings in {elapsed:.2f} seconds."
         )
-        print(f"✅ Loaded {len(df)} rows into fact_bookings in {elapsed:.2f} seconds.")
+        print(f"✅ Loaded {rows} rows into fact_bookings in {elapsed:.2f} seconds.")
 
     except Exception as e:
         logging.critical(f"❌ Load failed: {e}")
@@ -117,4 +310,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    main(bulk="--bulk" in sys.argv[1:])
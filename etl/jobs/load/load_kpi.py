@@ -0,0 +1,238 @@
+import logging
+import psycopg2
+from etl.jobs.load.load_fact_bookings import (
+    CREATE_QUERY,
+    FACT_TABLE,
+    LOAD_SEQ_COLUMN,
+    month_name_sql,
+)
+from etl.jobs.utils.data_version import bump_data_version
+from etl.jobs.utils.db_connection import get_db_connection
+from etl.jobs.utils.logger import setup_logger
+
+logger = setup_logger("load_kpi", "load_kpi.log")
+
+WATERMARK_TABLE = "kpi_watermark"
+
+# Nights of a booking and the revenue it realizes (canceled stays earn nothing)
+NIGHTS = "(f.weekend_nights + f.week_nights)"
+REALIZED = "(1 - f.is_canceled)"
+
+# Summary tables: grouping columns and additive measures (SQL expression over
+# fact_bookings f, SQL type). Grouping columns are read from the fact table
+# unless "keys" gives their expression over the tables added by "join". Only
+# sums and counts are stored, so a run's delta can be merged into the
+# existing totals.
+KPI_AGGREGATES = {
+    "kpi_country": {
+        # Keyed by the natural key, so every SCD2 version of a country adds
+        # to the same total
+        "group_by": {"country_code": "TEXT"},
+        "join": "JOIN dim_country c ON c.country_id = f.country_id",
+        "keys": {"country_code": "c.country_code"},
+        "measures": {
+            "bookings": ("COUNT(*)", "BIGINT"),
+            "canceled": ("SUM(f.is_canceled)", "BIGINT"),
+            "lead_time_sum": ("SUM(f.lead_time)", "BIGINT"),
+        },
+    },
+    "kpi_hotel_month": {
+        "group_by": {"hotel_id": "INT", "arrival_year": "INT", "arrival_month": "TEXT"},
+        "measures": {
+            "bookings": ("COUNT(*)", "BIGINT"),
+            "nights": (f"SUM({NIGHTS} * {REALIZED})", "BIGINT"),
+            "revenue": (f"SUM(f.adr * {NIGHTS} * {REALIZED})", "FLOAT"),
+        },
+    },
+}
+
+# Country totals named after the current version of each country
+CURRENT_COUNTRY = """kpi_country k
+        JOIN dim_country d ON d.country_code = k.country_code AND d.is_current"""
+
+# Dashboard views, one per KPI in docs/kpi/kpi_dashboard.md
+KPI_VIEWS = {
+    "kpi_bookings_by_country": f"""
+        SELECT d.country, k.bookings
+        FROM {CURRENT_COUNTRY}
+    """,
+    "kpi_adr_revenue_by_hotel": """
+        SELECT d.hotel, SUM(k.revenue) AS revenue, SUM(k.nights) AS nights,
+               SUM(k.revenue) / NULLIF(SUM(k.nights), 0) AS adr
+        FROM kpi_hotel_month k JOIN dim_hotel d USING (hotel_id)
+        GROUP BY d.hotel
+    """,
+    "kpi_booked_nights_by_hotel_month": """
+        SELECT d.hotel, k.arrival_year, k.arrival_month, k.nights
+        FROM kpi_hotel_month k JOIN dim_hotel d USING (hotel_id)
+    """,
+    "kpi_lead_time_by_country": f"""
+        SELECT d.country, k.lead_time_sum::FLOAT / k.bookings AS avg_lead_time
+        FROM {CURRENT_COUNTRY}
+    """,
+    "kpi_cancellation_rate_by_country": f"""
+        SELECT d.country, k.bookings, k.canceled,
+               k.canceled::FLOAT / k.bookings AS cancellation_rate
+        FROM {CURRENT_COUNTRY}
+    """,
+}
+
+
+def create_kpi_tables(cursor) -> list:
+    """
+    Creates the summary tables, the watermark table and the dashboard views.
+    A summary table created with other grouping columns is dropped and
+    created again.
+
+    Parameters:
+    cursor: A psycopg2 cursor object.
+
+    Returns:
+    list: The summary tables recreated empty, to be rebuilt up to the
+        watermark.
+    """
+    cursor.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {WATERMARK_TABLE} (
+            source TEXT PRIMARY KEY,
+            last_load_seq BIGINT NOT NULL
+        );
+        DO $$ BEGIN
+            ALTER TABLE {WATERMARK_TABLE}
+                RENAME COLUMN last_booking_id TO last_load_seq;
+        EXCEPTION WHEN undefined_column THEN NULL;
+        END $$;
+        """
+    )
+    rebuilt = []
+    for table, spec in KPI_AGGREGATES.items():
+        cursor.execute(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_name = %s",
+            (table,),
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        if existing and not set(spec["group_by"]) <= existing:
+            cursor.execute(f"DROP TABLE {table} CASCADE")
+            rebuilt.append(table)
+        columns = [f"{name} {sql_type}" for name, sql_type in spec["group_by"].items()]
+        columns += [
+            f"{name} {sql_type} NOT NULL DEFAULT 0"
+            for name, (_, sql_type) in spec["measures"].items()
+        ]
+        columns.append(f"PRIMARY KEY ({', '.join(spec['group_by'])})")
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} (\n    "
+            + ",\n    ".join(columns)
+            + "\n);"
+        )
+    for view, query in KPI_VIEWS.items():
+        cursor.execute(f"CREATE OR REPLACE VIEW {view} AS {query}")
+    logging.info("KPI tables and views created or already exist.")
+    return rebuilt
+
+
+def merge_sql(table: str) -> str:
+    """
+    Generates the statement that aggregates the fact rows in a load_seq
+    range (%(low)s, %(high)s] and adds them to a summary table.
+
+    Parameters:
+    table (str): Summary table name, a key of KPI_AGGREGATES.
+
+    Returns:
+    str: The INSERT ... ON CONFLICT DO UPDATE statement.
+    """
+    spec = KPI_AGGREGATES[table]
+    keys = list(spec["group_by"])
+    measures = spec["measures"]
+    # The month is grouped by name whichever fact layout is in use
+    key_sql = [
+        spec.get("keys", {}).get(key)
+        or (month_name_sql(f"f.{key}") if key == "arrival_month" else f"f.{key}")
+        for key in keys
+    ]
+    select = key_sql + [expr for expr, _ in measures.values()]
+    updates = ", ".join(
+        f"{name} = {table}.{name} + EXCLUDED.{name}" for name in measures
+    )
+    return f"""
+        INSERT INTO {table} ({', '.join(keys + list(measures))})
+        SELECT {', '.join(select)}
+        FROM {FACT_TABLE} f {spec.get("join", "")}
+        WHERE f.{LOAD_SEQ_COLUMN} > %(low)s AND f.{LOAD_SEQ_COLUMN} <= %(high)s
+        GROUP BY {', '.join(key_sql)}
+        ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {updates};
+    """
+
+
+def refresh_kpis(cursor) -> int:
+    """
+    Merges the fact rows loaded since the last refresh into the summary
+    tables and advances the watermark, in the caller's transaction. The
+    watermark is the fact table's load_seq, which keeps increasing across
+    runs, unlike booking_id.
+
+    Parameters:
+    cursor: A psycopg2 cursor object.
+
+    Returns:
+    int: Number of fact rows aggregated.
+    """
+    cursor.execute(CREATE_QUERY)
+    rebuilt = create_kpi_tables(cursor)
+    # Lock the watermark row so concurrent refreshes cannot merge twice
+    cursor.execute(
+        f"""
+        INSERT INTO {WATERMARK_TABLE} (source, last_load_seq) VALUES (%s, 0)
+        ON CONFLICT (source) DO NOTHING;
+        SELECT last_load_seq FROM {WATERMARK_TABLE} WHERE source = %s FOR UPDATE;
+        """,
+        (FACT_TABLE, FACT_TABLE),
+    )
+    low = cursor.fetchone()[0]
+    for table in rebuilt:
+        # Recreated tables catch up with the rows merged by earlier refreshes
+        cursor.execute(merge_sql(table), {"low": 0, "high": low})
+        logging.info(f"{table} rebuilt with {cursor.rowcount} groups")
+    cursor.execute(
+        f"SELECT COUNT(*), MAX({LOAD_SEQ_COLUMN}) FROM {FACT_TABLE} "
+        f"WHERE {LOAD_SEQ_COLUMN} > %s",
+        (low,),
+    )
+    delta, high = cursor.fetchone()
+    if not delta:
+        logging.info("No new fact rows since the last KPI refresh.")
+        return 0
+
+    for table in KPI_AGGREGATES:
+        cursor.execute(merge_sql(table), {"low": low, "high": high})
+        logging.info(f"{cursor.rowcount} groups merged into {table}")
+    cursor.execute(
+        f"UPDATE {WATERMARK_TABLE} SET last_load_seq = %s WHERE source = %s",
+        (high, FACT_TABLE),
+    )
+    logging.info(f"KPI aggregates refreshed with {delta} fact rows.")
+    return delta
+
+
+def main():
+    try:
+        logger.info("Refreshing KPI aggregates...")
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                rows = refresh_kpis(cursor)
+        bump_data_version()
+        logger.info(f"{rows} fact rows merged into the KPI aggregates")
+        print(f"✅ KPI aggregates refreshed with {rows} new fact rows.")
+
+    except psycopg2.Error as e:
+        logger.critical(f"Database error: {e}")
+        print(f"❌ Database error: {e}")
+    except Exception as e:
+        logger.critical(f"Unexpected error: {e}")
+        print(f"❌ Unexpected error: {e}")
+
+
+if __name__ == "__main__":
+    main()
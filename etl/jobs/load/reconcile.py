@@ -0,0 +1,314 @@
+import time
+import numpy as np
+import pandas as pd
+import psycopg2
+from etl.config import config
+from etl.jobs.load.frame_loader import INTEGER_TYPES
+from etl.jobs.load.load_dimension import fact_key_maps, remap_fact_keys
+from etl.jobs.load.load_fact_bookings import (
+    CSV_PATH,
+    FACT_COLUMNS,
+    FACT_TABLE,
+    booking_id_offset,
+    file_fingerprint,
+    shift_booking_ids,
+)
+from etl.jobs.transform.rules import MONTH_NAMES, allowed_values
+from etl.jobs.utils.logger import setup_logger
+from etl.jobs.utils.metrics import record_metrics
+
+logger = setup_logger("reconcile", "reconcile.log")
+
+# Rows are grouped by arrival month (YYYYMM of arrival_date_key)
+PARTITION_COLUMN = "arrival_date_key"
+KEY_COLUMN = "booking_id"
+
+# Row hashes are computed modulo a Mersenne prime, with one multiplier per
+# column: every intermediate product stays below 2**62, so pandas (int64)
+# and PostgreSQL (BIGINT) give the same values.
+MODULUS = 2**31 - 1
+_MIX = 1_000_003
+
+# Labels of the text and enum columns; a label is coded by its position
+LABELS = {
+    "arrival_month": MONTH_NAMES,
+    "deposit_type": allowed_values("deposit_type"),
+    "reservation_status": allowed_values("reservation_status"),
+}
+
+
+def _kind(sql_type: str) -> str:
+    """
+    Returns how a column is coded as an integer, from its SQL type.
+    """
+    base = sql_type.split()[0].upper()
+    if base in INTEGER_TYPES:
+        return "int"
+    if base in ("FLOAT", "REAL", "DOUBLE", "NUMERIC"):
+        return "float"
+    if base == "DATE":
+        return "date"
+    return "label"
+
+
+def _multipliers(columns: list) -> dict:
+    """
+    Returns a fixed multiplier in [1, MODULUS) for each column position.
+    """
+    return {c: (i + 1) * 2654435761 % MODULUS or 1 for i, c in enumerate(columns)}
+
+
+def frame_codes(df: pd.DataFrame, column_types: dict) -> pd.DataFrame:
+    """
+    Codes every column as int64, the way code_sql() does in the database:
+    integers as they are, floats in hundredths, dates as days since
+    1970-01-01 and labels by their 1-based position (0 if unknown). Nulls
+    are coded 0; non-null counts are compared separately.
+
+    Parameters:
+    df (pd.DataFrame): Rows in table layout.
+    column_types (dict): Column -> SQL type.
+
+    Returns:
+    pd.DataFrame: One int64 column per table column.
+    """
+    codes = {}
+    for column, sql_type in column_types.items():
+        values = df[column]
+        kind = _kind(sql_type)
+        if kind == "int":
+            coded = pd.to_numeric(values).fillna(0)
+        elif kind == "float":
+            coded = np.round(pd.to_numeric(values) * 100).fillna(0)
+        elif kind == "date":
+            days = pd.to_datetime(values) - pd.Timestamp("1970-01-01")
+            coded = days.dt.days.fillna(0)
+        else:
+            labels = pd.Categorical(values, categories=LABELS[column])
+            coded = pd.Series(labels.codes + 1, index=df.index)
+        codes[column] = coded.astype("int64")
+    return pd.DataFrame(codes, index=df.index)
+
+
+def code_sql(column: str, sql_type: str) -> str:
+    """
+    Returns the SQL expression coding a column like frame_codes().
+    """
+    kind = _kind(sql_type)
+    if kind == "int":
+        expr = f"{column}::BIGINT"
+    elif kind == "float":
+        expr = f"ROUND({column} * 100)::BIGINT"
+    elif kind == "date":
+        expr = f"({column} - DATE '1970-01-01')"
+    else:
+        labels = ", ".join("'" + v.replace("'", "''") + "'" for v in LABELS[column])
+        expr = f"array_position(ARRAY[{labels}]::TEXT[], {column}::TEXT)"
+    return f"COALESCE({expr}, 0)"
+
+
+def row_hashes(codes: pd.DataFrame) -> np.ndarray:
+    """
+    Hashes each row of frame_codes() output: a weighted sum of the codes
+    modulo MODULUS, then a squaring round so that values swapped between
+    rows change the sum of the hashes.
+    """
+    weights = np.array(list(_multipliers(list(codes.columns)).values()))
+    terms = np.mod(codes.to_numpy(dtype="int64"), MODULUS) * weights % MODULUS
+    h = terms.sum(axis=1) % MODULUS
+    return (h * h % MODULUS * _MIX + h) % MODULUS
+
+
+def _hash_sql(column_types: dict) -> str:
+    """
+    Returns the SQL expression of row_hashes() over the coded columns c_*.
+    """
+    weights = _multipliers(list(column_types))
+    terms = " + ".join(
+        f"((c_{c} % {MODULUS} + {MODULUS}) % {MODULUS}) * {w} % {MODULUS}"
+        for c, w in weights.items()
+    )
+    return f"(({terms}) % {MODULUS})"
+
+
+def _coded_rows_sql(table: str, column_types: dict, where: str = "") -> str:
+    """
+    Returns a query of the partition, the codes c_*, the non-null flags n_*
+    and the row hash h of each row of a table.
+    """
+    coded = ",\n".join(
+        [f"COALESCE({PARTITION_COLUMN} / 100, 0) AS part"]
+        + [f"{code_sql(c, t)} AS c_{c}" for c, t in column_types.items()]
+        + [f"({c} IS NOT NULL)::INT AS n_{c}" for c in column_types]
+    )
+    return (
+        f"SELECT *, (h0 * h0 % {MODULUS} * {_MIX} + h0) % {MODULUS} AS h FROM ("
+        f"SELECT *, {_hash_sql(column_types)} AS h0 FROM ("
+        f"SELECT {coded} FROM {table} {where}"
+        ") coded) hashed"
+    )
+
+
+def summary_sql(table: str, column_types: dict) -> str:
+    """
+    Returns the single query aggregating a whole table per partition: row
+    count, non-null count and code sum of each column, and sum of the row
+    hashes. The columns match frame_summary().
+    """
+    aggregates = ", ".join(
+        ["COUNT(*) AS row_count"]
+        + [f"SUM(n_{c}) AS non_null_{c}" for c in column_types]
+        + [f"SUM(c_{c}) AS sum_{c}" for c in column_types]
+        + ["SUM(h) AS hash_sum"]
+    )
+    return (
+        f"SELECT part, {aggregates} "
+        f"FROM ({_coded_rows_sql(table, column_types)}) r "
+        "GROUP BY part ORDER BY part"
+    )
+
+
+def frame_summary(df: pd.DataFrame, column_types: dict) -> pd.DataFrame:
+    """
+    Aggregates a DataFrame per partition like summary_sql(), vectorized.
+
+    Returns:
+    pd.DataFrame: One row per partition (index 'part'), int64 aggregates.
+    """
+    codes = frame_codes(df, column_types)
+    part = (pd.to_numeric(df[PARTITION_COLUMN]) // 100).fillna(0).astype("int64")
+    stats = pd.concat(
+        [
+            df[list(column_types)].notna().astype("int64").add_prefix("non_null_"),
+            codes.add_prefix("sum_"),
+            pd.Series(row_hashes(codes), index=df.index, name="hash_sum"),
+        ],
+        axis=1,
+    )
+    summary = stats.groupby(part.rename("part")).sum()
+    summary.insert(0, "row_count", part.value_counts().sort_index())
+    return summary
+
+
+def fetch_summary(cursor, table: str, column_types: dict) -> pd.DataFrame:
+    """
+    Runs summary_sql() and returns it in the frame_summary() layout.
+    """
+    cursor.execute(summary_sql(table, column_types))
+    names = [d[0] for d in cursor.description]
+    summary = pd.DataFrame(cursor.fetchall(), columns=names).set_index("part")
+    # SUM() over BIGINT comes back as Decimal
+    return summary.astype("int64")
+
+
+def drill_down(cursor, table: str, df: pd.DataFrame, column_types: dict, part: int):
+    """
+    Compares one partition row by row through the key column and row hash.
+
+    Returns:
+    dict: Keys 'missing' (in the artifact only), 'unexpected' (in the table
+        only) and 'changed' (different values), each a sorted list of keys.
+    """
+    where = f"WHERE COALESCE({PARTITION_COLUMN} / 100, 0) = {int(part)}"
+    rows_sql = _coded_rows_sql(table, column_types, where)
+    cursor.execute(f"SELECT c_{KEY_COLUMN}, h FROM ({rows_sql}) r")
+    table_rows = pd.Series(dict(cursor.fetchall()), dtype="int64")
+
+    in_part = (pd.to_numeric(df[PARTITION_COLUMN]) // 100).fillna(0) == part
+    codes = frame_codes(df[in_part], column_types)
+    frame_rows = pd.Series(row_hashes(codes), index=codes[KEY_COLUMN].to_numpy())
+
+    common = frame_rows.index.intersection(table_rows.index)
+    changed = common[frame_rows[common].to_numpy() != table_rows[common].to_numpy()]
+    return {
+        "missing": sorted(frame_rows.index.difference(table_rows.index).tolist()),
+        "unexpected": sorted(table_rows.index.difference(frame_rows.index).tolist()),
+        "changed": sorted(changed.tolist()),
+    }
+
+
+def reconcile(cursor, df: pd.DataFrame, table: str = FACT_TABLE, column_types=None):
+    """
+    Checks that a table holds exactly the rows of a DataFrame. Both sides
+    are reduced to order-independent aggregates per partition (one query for
+    the table, one vectorized pass for the frame); only the partitions
+    whose aggregates differ are compared row by row.
+
+    Parameters:
+    cursor: A psycopg2 cursor object.
+    df (pd.DataFrame): Expected rows, with the keys used in the table.
+    table (str): Table name.
+    column_types (dict): Column -> SQL type; defaults to the fact layout.
+
+    Returns:
+    dict: 'partitions' checked, 'rows' in the frame and, per mismatching
+        partition, the drill_down() result and the aggregates that differ.
+    """
+    column_types = column_types or FACT_COLUMNS
+    expected = frame_summary(df, column_types)
+    actual = fetch_summary(cursor, table, column_types)
+
+    parts = expected.index.union(actual.index)
+    expected = expected.reindex(parts, fill_value=0)
+    actual = actual.reindex(parts, fill_value=0)[expected.columns]
+    differs = expected.ne(actual)
+
+    mismatches = {}
+    for part in parts[differs.any(axis=1)]:
+        detail = drill_down(cursor, table, df, column_types, part)
+        detail["aggregates"] = list(expected.columns[differs.loc[part]])
+        mismatches[int(part)] = detail
+    return {"partitions": len(parts), "rows": len(df), "mismatches": mismatches}
+
+
+def main():
+    """
+    Reconciles fact_bookings with the fact artifact it was loaded from. The
+    artifact's foreign keys and booking_ids are translated to the database
+    keys first, as the loader does.
+    """
+    try:
+        start = time.time()
+        fact = pd.read_csv(CSV_PATH)
+        fingerprint = file_fingerprint(CSV_PATH)
+        with psycopg2.connect(**config.DB_CONFIG) as conn:
+            with conn.cursor() as cursor:
+                offset = booking_id_offset(cursor, fingerprint, register=False)
+                fact = shift_booking_ids(fact, offset)
+                fact = remap_fact_keys(fact, fact_key_maps(cursor))
+                report = reconcile(cursor, fact)
+        elapsed = time.time() - start
+
+        mismatches = report["mismatches"]
+        record_metrics(
+            "reconcile",
+            {
+                "partitions": report["partitions"],
+                "rows": report["rows"],
+                "mismatched_partitions": len(mismatches),
+                "seconds": round(elapsed, 3),
+            },
+        )
+        for part, detail in mismatches.items():
+            logger.error(
+                f"Partition {part}: {len(detail['missing'])} missing, "
+                f"{len(detail['unexpected'])} unexpected, "
+                f"{len(detail['changed'])} changed rows "
+                f"(differing aggregates: {detail['aggregates']})"
+            )
+        if mismatches:
+            print(f"❌ {len(mismatches)} of {report['partitions']} partitions differ.")
+        else:
+            logger.info(
+                f"{report['rows']} rows in {report['partitions']} partitions "
+                f"reconciled in {elapsed:.2f} seconds."
+            )
+            print(f"✅ {FACT_TABLE} matches {CSV_PATH} ({elapsed:.2f} seconds).")
+
+    except Exception as e:
+        logger.error(f"Reconciliation failed: {e}")
+        print(f"❌ Reconciliation failed: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+import argparse
+import functools
+import os
+import time
+import psycopg2
+from contextlib import nullcontext
+from etl.config import config
+from etl.jobs.load import load
+from etl.jobs.load.batch_executor import copy_isolated
+from etl.jobs.load.bulk_load import bulk_load, tune_session
+from etl.jobs.load.load_dim_date import load_dim_date
+from etl.jobs.load.frame_loader import integer_columns
+from etl.jobs.load.load_dimension import (
+    fact_key_maps,
+    load_dimension,
+    remap_fact_keys,
+)
+from etl.jobs.load.load_fact_bookings import (
+    CREATE_QUERY,
+    FACT_COLUMNS,
+    FACT_TABLE,
+    booking_id_offset,
+    drop_loaded_rows,
+    file_fingerprint,
+    loaded_booking_ids,
+    record_booking_span,
+    shift_booking_ids,
+)
+from etl.jobs.load.load_kpi import refresh_kpis
+from etl.jobs.transform.quarantine import REJECTS_PATH, save_rejects, split_valid_rows
+from etl.jobs.transform.transform import (
+    assign_guest_keys,
+    drop_seen_duplicates,
+    load_data,
+    prepare_chunk,
+    resolve_file_guests,
+    transform_data,
+)
+from etl.jobs.transform.transform_dim_country import extract_unique_countries
+from etl.jobs.transform.transform_dim_customer import extract_unique_customer_types
+from etl.jobs.transform.transform_dim_date import build_dim_date, extract_dim_date
+from etl.jobs.transform.transform_dim_guest import extract_unique_guests
+from etl.jobs.transform.transform_dim_hotel import extract_unique_hotels
+from etl.jobs.transform.transform_dim_meal import extract_unique_meal_plans
+from etl.jobs.transform.transform_fact_bookings import build_fact
+from etl.jobs.transform.transform_sql import run_sql_engine
+from etl.jobs.utils.data_version import bump_data_version
+from etl.jobs.utils.logger import setup_logger
+from etl.jobs.utils.metrics import record_metrics
+from etl.jobs.utils.reader import read_csv_chunks
+from etl.jobs.utils.sketches import SeenHashes
+from etl.jobs.utils.stream import StageClock, map_ordered, read_ahead
+
+logger = setup_logger("pipeline", "pipeline.log")
+
+ENGINES = ("pandas", "sql")
+
+# Builders of each dimension on the pandas path
+DIMENSION_BUILDERS = {
+    "dim_hotel": extract_unique_hotels,
+    "dim_country": extract_unique_countries,
+    "dim_meal": extract_unique_meal_plans,
+    "dim_customer": extract_unique_customer_types,
+    "dim_guest": extract_unique_guests,
+}
+
+
+def run_pandas_engine(cursor, df, fingerprint: str, bulk: bool = False) -> dict:
+    """
+    Builds the dimensions and the fact table in pandas and loads them.
+
+    Parameters:
+    cursor: A psycopg2 cursor object.
+    df (pd.DataFrame): Valid processed rows.
+    fingerprint (str): Identity of the input file the rows come from.
+    bulk (bool): Defer the fact primary key during the copy.
+
+    Returns:
+    dict: Table name -> number of rows loaded.
+    """
+    dims = {table: build(df) for table, build in DIMENSION_BUILDERS.items()}
+    inserted = {}
+    for table, dim in dims.items():
+        load_dimension(cursor, table, dim)
+        inserted[table] = len(dim)
+
+    fact = build_fact(df, *dims.values())
+    cursor.execute(CREATE_QUERY)
+    key_maps = fact_key_maps(cursor, dims)
+    offset = booking_id_offset(cursor, fingerprint)
+    record_booking_span(cursor, fingerprint, len(df))
+    fact = shift_booking_ids(fact, offset)
+    fact = drop_loaded_rows(fact, loaded_booking_ids(cursor, offset))
+    with bulk_load(cursor, [FACT_TABLE]) if bulk else nullcontext():
+        inserted[FACT_TABLE] = copy_isolated(
+            cursor,
+            FACT_TABLE,
+            remap_fact_keys(fact, key_maps),
+            columns=list(FACT_COLUMNS),
+            int_columns=integer_columns(FACT_COLUMNS),
+        )
+    return inserted
+
+
+def transform_chunk(chunk, guest_keys):
+    """
+    Transforms one raw chunk on the streaming path: the row-local steps,
+    then the guest keys resolved over the whole file (resolve_file_guests()).
+    """
+    return assign_guest_keys(prepare_chunk(chunk), guest_keys)
+
+
+def stream_staging(cursor, raw_path: str, workers: int = None) -> tuple:
+    """
+    Streams the raw CSV into staging with overlapping stages: a reader
+    thread parses chunk N+1 while worker threads transform chunk N and the
+    loader COPYs chunk N-1. Queues between the stages are bounded, so only a
+    few chunks are in memory at once. Rows are deduplicated and checked in
+    file order, so duplicates across chunks are dropped as in the batch
+    run. Guests are resolved beforehand in a pass over the identity
+    columns, so dim_guest matches the batch run too.
+
+    Parameters:
+    cursor: A psycopg2 cursor object.
+    raw_path (str): Path to the raw bookings CSV.
+    workers (int): Transform threads; defaults to ETL_STREAM_WORKERS.
+
+    Returns:
+    tuple[int, pd.DataFrame]: Rows staged, and the date dimension covering
+        the staged arrival dates.
+    """
+    workers = workers or config.STREAM_WORKERS
+    clock = StageClock()
+    seen_bookings = SeenHashes()
+    seen_rows = SeenHashes()
+    dates = []
+    if os.path.exists(REJECTS_PATH):
+        os.remove(REJECTS_PATH)
+
+    def checked(chunks):
+        for chunk in chunks:
+            chunk = drop_seen_duplicates(chunk, seen_bookings)
+            valid, rejected = split_valid_rows(chunk, seen_rows=seen_rows)
+            save_rejects(rejected, append=True)
+            arrivals = valid["arrival_date"].dropna()
+            if len(arrivals):
+                dates.extend([arrivals.min(), arrivals.max()])
+            # The loader runs while this generator is suspended
+            start = time.perf_counter()
+            yield valid
+            clock.add("load", time.perf_counter() - start)
+
+    start = time.perf_counter()
+    guest_keys = clock.timed("guests", resolve_file_guests)(raw_path)
+    chunks = read_ahead(read_csv_chunks(raw_path), clock=clock)
+    transform = clock.timed(
+        "transform", functools.partial(transform_chunk, guest_keys=guest_keys)
+    )
+    transformed = map_ordered(transform, chunks, workers=workers)
+    staged = load.insert_data(checked(transformed), cursor)
+    elapsed = time.perf_counter() - start
+
+    stages = clock.result()
+    logger.info(f"{staged} rows streamed into staging in {elapsed:.2f}s: {stages}")
+    record_metrics("stream", {"wall_seconds": round(elapsed, 3), **stages})
+    dim_date = build_dim_date(min(dates, default=None), max(dates, default=None))
+    return staged, dim_date
+
+
+def run(
+    raw_path: str = config.RAW_DATA,
+    engine: str = "pandas",
+    bulk: bool = False,
+    stream: bool = False,
+):
+    """
+    Runs transform, staging load and the dimension/fact build in a single
+    process and transaction: the transformed DataFrame is copied straight
+    into staging instead of being written to processed_data.csv and read back.
+
+    With engine="sql" the dimensions and the fact are built inside PostgreSQL
+    from staging with set-based INSERT ... SELECT statements; with "pandas"
+    they are built in memory and copied in. Both produce the same tables.
+
+    With bulk=True staging is UNLOGGED, the session is tuned for the load and
+    the fact primary key is rebuilt once after the rows are in.
+
+    With stream=True the file is parsed, transformed and copied into
+    staging chunk by chunk with overlapping stages (stream_staging()), and
+    the tables are built by the SQL engine, since the whole frame is never
+    in memory.
+
+    Parameters:
+    raw_path (str): Path to the raw bookings CSV.
+    engine (str): "pandas" or "sql".
+    bulk (bool): Enable the bulk-load mode.
+    stream (bool): Enable the streaming mode (requires engine="sql").
+
+    Raises:
+    ValueError: If the engine is unknown, or is "pandas" in streaming mode.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}', expected one of {ENGINES}")
+    if stream and engine != "sql":
+        raise ValueError("The streaming mode builds the tables with the sql engine")
+
+    logger.info(f"Starting in-process pipeline for {raw_path} ({engine} engine)...")
+    fingerprint = file_fingerprint(raw_path)
+    if not stream:
+        df = transform_data(load_data(raw_path))
+
+        df, rejected = split_valid_rows(df)
+        save_rejects(rejected)
+        logger.info(f"{len(df)} valid rows, {len(rejected)} quarantined.")
+
+    start = time.time()
+    with psycopg2.connect(**config.DB_CONFIG) as conn:
+        with conn.cursor() as cursor:
+            # Staging holds the current batch only, so the SQL engine sees
+            # exactly the rows the pandas engine works on.
+            if bulk:
+                tune_session(cursor)
+            load.create_staging_table(cursor, unlogged=bulk)
+            cursor.execute(f"TRUNCATE {load.STAGING_TABLE}")
+            if stream:
+                staged, dim_date = stream_staging(cursor, raw_path)
+            else:
+                staged = load.insert_data(df, cursor)
+                dim_date = extract_dim_date(df)
+            # The calendar is generated in pandas for both engines
+            load_dim_date(cursor, dim_date)
+
+            if engine == "sql":
+                inserted = run_sql_engine(cursor, fingerprint, bulk=bulk)
+            else:
+                inserted = run_pandas_engine(cursor, df, fingerprint, bulk=bulk)
+            refresh_kpis(cursor)
+
+    bump_data_version()
+    elapsed = time.time() - start
+    logger.info(
+        f"{staged} rows staged, {inserted} inserted in {elapsed:.2f} seconds "
+        f"({engine} engine)."
+    )
+    print(f"✅ Pipeline complete ({engine} engine) in {elapsed:.2f} seconds.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the in-process ETL pipeline.")
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="pandas",
+        help="Build dimensions and facts in pandas or inside PostgreSQL.",
+    )
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="UNLOGGED staging, deferred fact primary key and tuned session.",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Overlap parsing, transform and COPY chunk by chunk (sql engine).",
+    )
+    args = parser.parse_args()
+    run(engine=args.engine, bulk=args.bulk, stream=args.stream)
@@ -0,0 +1,135 @@
+import base64
+import hashlib
+import logging
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from etl.config import config
+
+# PII columns -> pseudonym column replacing them in the processed data
+PII_COLUMNS = {
+    "name": "name_token",
+    "email": "email_token",
+    "phone_number": "phone_token",
+    "credit_card": "card_token",
+}
+
+# Vectorized normalization applied before hashing, so trivially different
+# spellings of the same value (case, spacing, phone punctuation) link up
+NORMALIZERS = {
+    "name": lambda s: s.str.strip().str.lower(),
+    "email": lambda s: s.str.strip().str.lower(),
+    "phone_number": lambda s: s.str.replace(r"\D", "", regex=True),
+    "credit_card": lambda s: s.str.strip(),
+}
+
+_HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype="S1")
+
+
+def derive_hash_key(secret: str) -> str:
+    """
+    Derives the 16-byte SipHash key expected by pandas from a secret of any
+    length.
+
+    Parameters:
+    secret (str): The pseudonymization secret (ETL_PII_KEY).
+
+    Returns:
+    str: A 16-character ASCII key (96 bits of the secret's digest).
+    """
+    digest = hashlib.blake2b(secret.encode("utf8"), digest_size=12).digest()
+    return base64.b64encode(digest).decode("ascii")
+
+
+def to_hex(hashes: np.ndarray) -> np.ndarray:
+    """
+    Formats 64-bit hashes as 16-character hex strings with array operations
+    only.
+
+    Parameters:
+    hashes (np.ndarray): uint64 hashes.
+
+    Returns:
+    np.ndarray: Unicode strings of length 16.
+    """
+    octets = hashes.astype(">u8").view(np.uint8).reshape(-1, 8)
+    nibbles = np.stack([octets >> 4, octets & 0x0F], axis=-1).reshape(-1, 16)
+    return _HEX_DIGITS[nibbles].view("S16").ravel().astype("U16")
+
+
+def hash_column(values: pd.Series, column: str, hash_key: str) -> pd.Series:
+    """
+    Replaces a PII column with keyed hashes (SipHash-2-4 keyed with hash_key)
+    computed over whole arrays. The column is factorized first, so each
+    distinct value is normalized and hashed once however often it repeats.
+    Nulls stay null.
+
+    Parameters:
+    values (pd.Series): Raw values of the column.
+    column (str): PII column name, a key of NORMALIZERS.
+    hash_key (str): Output of derive_hash_key().
+
+    Returns:
+    pd.Series: Hex pseudonyms, aligned with the input.
+    """
+    codes, uniques = pd.factorize(values)
+    normalized = NORMALIZERS[column](pd.Series(uniques, dtype=object).astype(str))
+    hashes = pd.util.hash_pandas_object(normalized, index=False, hash_key=hash_key)
+    # One trailing null slot, picked by the -1 code of missing values
+    lookup = np.append(to_hex(hashes.to_numpy()).astype(object), None)
+    return pd.Series(lookup[codes], index=values.index, dtype=object)
+
+
+def _pseudonyms(frame: pd.DataFrame, hash_key) -> pd.DataFrame:
+    """
+    Computes the pseudonym columns of a block of PII columns. Runs in the
+    worker processes when a pool is used.
+    """
+    tokens = {}
+    for column, token in PII_COLUMNS.items():
+        if column not in frame.columns:
+            continue
+        if hash_key is None:
+            tokens[token] = pd.Series(None, index=frame.index, dtype=object)
+        else:
+            tokens[token] = hash_column(frame[column], column, hash_key)
+    return pd.DataFrame(tokens, index=frame.index)
+
+
+def pseudonymize(
+    df: pd.DataFrame, secret=config.PII_KEY, workers: int = config.PII_WORKERS
+) -> pd.DataFrame:
+    """
+    Replaces the PII columns with keyed pseudonyms, so repeat guests can be
+    counted and bookings linked without keeping names, emails, phones or
+    card numbers. Without a secret the pseudonyms are null: an unkeyed hash
+    of an email can be reversed by hashing candidate emails.
+
+    Parameters:
+    df (pd.DataFrame): DataFrame with some of the PII_COLUMNS.
+    secret (str, optional): Pseudonymization secret (ETL_PII_KEY).
+    workers (int): Worker processes; the rows are split in one block per
+        worker. 1 hashes in-process.
+
+    Returns:
+    pd.DataFrame: The DataFrame with the PII columns replaced by the
+        *_token columns.
+    """
+    pii = [column for column in PII_COLUMNS if column in df.columns]
+    if not pii:
+        return df
+    if secret is None:
+        logging.warning("ETL_PII_KEY is not set; PII pseudonyms are left null.")
+    hash_key = derive_hash_key(secret) if secret is not None else None
+
+    if workers > 1 and len(df) > workers:
+        bounds = np.linspace(0, len(df), workers + 1, dtype=int)
+        blocks = [df[pii].iloc[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:])]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = pool.map(_pseudonyms, blocks, [hash_key] * len(blocks))
+            tokens = pd.concat(list(parts))
+    else:
+        tokens = _pseudonyms(df[pii], hash_key)
+
+    logging.info(f"Pseudonymized {pii} for {len(df)} rows.")
+    return pd.concat([df.drop(columns=pii), tokens], axis=1)
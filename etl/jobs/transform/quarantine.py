@@ -0,0 +1,64 @@
+import logging
+import os
+import pandas as pd
+from etl.jobs.transform.rules import PROCESSED_RULES, missing_columns, rule_masks
+
+REJECTS_PATH = "etl/data/rejects/rejected_rows.csv"
+
+# Column added to rejected rows listing the rules they broke
+REASON_COLUMN = "reject_reasons"
+
+
+def split_valid_rows(df: pd.DataFrame, rules=PROCESSED_RULES, seen_rows=None):
+    """
+    Splits a batch into valid and rejected rows using vectorized rule masks.
+
+    Parameters:
+    df (pd.DataFrame): The batch to check.
+    rules (list): Rule definitions (see rules.PROCESSED_RULES).
+    seen_rows (SeenHashes, optional): Row hashes from earlier batches, so
+        duplicates across batches are rejected too.
+
+    Returns:
+    tuple[pd.DataFrame, pd.DataFrame]: The valid rows, and the rejected rows
+        with a 'reject_reasons' column (rule keys separated by ';').
+
+    Raises:
+    ValueError: If required columns are missing, since no row can be valid.
+    """
+    missing = missing_columns(df, rules)
+    if missing:
+        raise ValueError(f"Missing columns: {missing}")
+
+    masks = rule_masks(df, rules, seen_rows)
+    if not masks:
+        return df, df.iloc[0:0].assign(**{REASON_COLUMN: pd.Series(dtype=object)})
+
+    mask_frame = pd.DataFrame(masks)
+    invalid = mask_frame.any(axis=1)
+
+    rejected = df[invalid].copy()
+    failed = mask_frame[invalid]
+    rejected[REASON_COLUMN] = failed.dot(failed.columns + ";").str.rstrip(";")
+
+    valid = df[~invalid]
+    if len(rejected):
+        logging.warning(f"Quarantined {len(rejected)} of {len(df)} rows.")
+    return valid, rejected
+
+
+def save_rejects(rejected: pd.DataFrame, output_path: str = REJECTS_PATH, append=False):
+    """
+    Writes rejected rows and their reasons to the reject artifact.
+
+    Parameters:
+    rejected (pd.DataFrame): Rows returned by split_valid_rows().
+    output_path (str): Path of the reject CSV.
+    append (bool): Append to an existing artifact instead of replacing it.
+    """
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    write_header = not (append and os.path.exists(output_path))
+    rejected.to_csv(
+        output_path, mode="a" if append else "w", header=write_header, index=False
+    )
+    logging.info(f"{len(rejected)} rejected rows written to {output_path}")
@@ -0,0 +1,316 @@
+import logging
+import numpy as np
+import pandas as pd
+from etl.jobs.utils.sketches import SeenHashes, hash_values
+
+MONTH_NAMES = [
+    "January",
+    "February",
+    "March",
+    "April",
+    "May",
+    "June",
+    "July",
+    "August",
+    "September",
+    "October",
+    "November",
+    "December",
+]
+
+# Logical type of each processed column. Logical types (rather than exact
+# dtypes) survive the CSV round trip: "int" accepts int64 columns as well as
+# text that parses to whole numbers, "datetime" accepts ISO date strings, etc.
+COLUMN_TYPES = {
+    "hotel": "category",
+    "is_canceled": "int",
+    "lead_time": "int",
+    "arrival_year": "int",
+    "arrival_month": "category",
+    "arrival_week": "int",
+    "arrival_day": "int",
+    "weekend_nights": "int",
+    "week_nights": "int",
+    "adults": "int",
+    "children": "float",
+    "babies": "int",
+    "meal_plan": "category",
+    "country": "category",
+    "market_segment": "category",
+    "distribution_channel": "category",
+    "repeated_guest": "int",
+    "prev_cancellations": "int",
+    "prev_not_canceled": "int",
+    "reserved_room": "category",
+    "assigned_room": "category",
+    "booking_changes": "int",
+    "deposit_type": "category",
+    "agent_id": "float",
+    "company_id": "float",
+    "waiting_days": "int",
+    "customer_type": "category",
+    "adr": "float",
+    "parking_spaces": "int",
+    "special_requests": "int",
+    "reservation_status": "category",
+    "reservation_status_date": "datetime",
+    "arrival_date": "datetime",
+    "arrival_date_key": "int",
+}
+
+REQUIRED_COLUMNS = list(COLUMN_TYPES)
+
+# Required columns that may hold nulls: an impossible arrival date (e.g. 31
+# February) gets a null date and key rather than quarantining the booking
+NULLABLE_COLUMNS = ["arrival_date", "arrival_date_key"]
+
+# Declarative validation rules for the processed dataset. Every rule except
+# "columns" is evaluated as a vectorized mask of the violating rows.
+PROCESSED_RULES = [
+    {"name": "required_columns", "check": "columns", "columns": REQUIRED_COLUMNS},
+    {"name": "dtype", "check": "dtype", "types": COLUMN_TYPES},
+    {
+        "name": "not_null",
+        "check": "not_null",
+        "columns": [c for c in REQUIRED_COLUMNS if c not in NULLABLE_COLUMNS],
+    },
+    {"name": "adr_non_negative", "check": "range", "column": "adr", "min": 0},
+    {
+        "name": "adults_bounds",
+        "check": "range",
+        "column": "adults",
+        "min": 0,
+        "max": 55,
+    },
+    {
+        "name": "lead_time_non_negative",
+        "check": "range",
+        "column": "lead_time",
+        "min": 0,
+    },
+    {
+        "name": "arrival_day_bounds",
+        "check": "range",
+        "column": "arrival_day",
+        "min": 1,
+        "max": 31,
+    },
+    {
+        "name": "hotel_allowed",
+        "check": "allowed",
+        "column": "hotel",
+        "values": ["Resort Hotel", "City Hotel"],
+    },
+    {
+        "name": "arrival_month_allowed",
+        "check": "allowed",
+        "column": "arrival_month",
+        "values": MONTH_NAMES,
+    },
+    {
+        "name": "meal_plan_allowed",
+        "check": "allowed",
+        "column": "meal_plan",
+        "values": ["BB", "HB", "FB", "SC", "Undefined"],
+    },
+    {
+        "name": "deposit_type_allowed",
+        "check": "allowed",
+        "column": "deposit_type",
+        "values": ["No Deposit", "Refundable", "Non Refund"],
+    },
+    {
+        "name": "customer_type_allowed",
+        "check": "allowed",
+        "column": "customer_type",
+        "values": ["Transient", "Contract", "Transient-Party", "Group"],
+    },
+    {
+        "name": "reservation_status_allowed",
+        "check": "allowed",
+        "column": "reservation_status",
+        "values": ["Check-Out", "Canceled", "No-Show"],
+    },
+    {
+        "name": "is_canceled_flag",
+        "check": "allowed",
+        "column": "is_canceled",
+        "values": [0, 1],
+    },
+    {
+        "name": "repeated_guest_flag",
+        "check": "allowed",
+        "column": "repeated_guest",
+        "values": [0, 1],
+    },
+    # Booking columns only: rows differing in PII tokens or guest_key alone
+    # are duplicates, as in transform.remove_duplicates()
+    {"name": "unique_rows", "check": "unique", "columns": REQUIRED_COLUMNS},
+]
+
+
+def _type_mask(series: pd.Series, logical_type: str) -> pd.Series:
+    """
+    Flags non-null values that cannot be read as the given logical type.
+    """
+    if logical_type == "int":
+        if pd.api.types.is_integer_dtype(series):
+            return pd.Series(False, index=series.index)
+        values = pd.to_numeric(series, errors="coerce")
+        return series.notna() & (values.isna() | (values % 1 != 0))
+    if logical_type == "float":
+        if pd.api.types.is_numeric_dtype(series):
+            return pd.Series(False, index=series.index)
+        return series.notna() & pd.to_numeric(series, errors="coerce").isna()
+    if logical_type == "datetime":
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return pd.Series(False, index=series.index)
+        values = pd.to_datetime(series, errors="coerce", format="ISO8601")
+        return series.notna() & values.isna()
+    # "category" and free text accept any value
+    return pd.Series(False, index=series.index)
+
+
+def rule_masks(df: pd.DataFrame, rules=PROCESSED_RULES, seen_rows=None) -> dict:
+    """
+    Evaluates all row-level rules as vectorized violation masks.
+
+    Parameters:
+    df (pd.DataFrame): The data to check.
+    rules (list): Rule definitions (see PROCESSED_RULES).
+    seen_rows (SeenHashes, optional): Row hashes from earlier chunks, so the
+        uniqueness rule also catches duplicates across chunks.
+
+    Returns:
+    dict: Maps a violation key ("rule" or "rule:column") to a boolean
+        Series that is True for the rows breaking that rule.
+    """
+    masks = {}
+    for rule in rules:
+        check = rule["check"]
+        if check == "dtype":
+            for column, logical_type in rule["types"].items():
+                if column in df.columns:
+                    masks[f"{rule['name']}:{column}"] = _type_mask(
+                        df[column], logical_type
+                    )
+        elif check == "not_null":
+            for column in rule["columns"]:
+                if column in df.columns:
+                    masks[f"{rule['name']}:{column}"] = df[column].isna()
+        elif check == "range":
+            if rule["column"] in df.columns:
+                values = pd.to_numeric(df[rule["column"]], errors="coerce")
+                mask = pd.Series(False, index=df.index)
+                if "min" in rule:
+                    mask |= values < rule["min"]
+                if "max" in rule:
+                    mask |= values > rule["max"]
+                masks[rule["name"]] = mask
+        elif check == "allowed":
+            if rule["column"] in df.columns:
+                series = df[rule["column"]]
+                masks[rule["name"]] = series.notna() & ~series.isin(rule["values"])
+        elif check == "unique":
+            columns = [c for c in rule.get("columns") or df.columns if c in df]
+            hashes = hash_values(df[columns])
+            if seen_rows is None:
+                repeated = pd.Series(hashes).duplicated().to_numpy()
+            else:
+                repeated = seen_rows.mark_repeated(hashes)
+            masks[rule["name"]] = pd.Series(repeated, index=df.index)
+    return masks
+
+
+def allowed_values(column: str, rules=PROCESSED_RULES) -> list:
+    """
+    Returns the values an "allowed" rule accepts for a column.
+
+    Raises:
+    KeyError: If no rule restricts the column.
+    """
+    for rule in rules:
+        if rule["check"] == "allowed" and rule["column"] == column:
+            return list(rule["values"])
+    raise KeyError(f"No allowed-values rule for column '{column}'")
+
+
+def missing_columns(df: pd.DataFrame, rules=PROCESSED_RULES) -> list:
+    """
+    Returns the columns required by "columns" rules that are absent from df.
+    """
+    missing = []
+    for rule in rules:
+        if rule["check"] == "columns":
+            missing += [col for col in rule["columns"] if col not in df.columns]
+    return missing
+
+
+def new_report() -> dict:
+    """
+    Returns an empty validation report.
+    """
+    return {"rows": 0, "missing_columns": [], "violations": {}, "passed": True}
+
+
+def update_report(report: dict, df: pd.DataFrame, masks: dict, rules=PROCESSED_RULES):
+    """
+    Adds the violation counts of one evaluated chunk to a report.
+    """
+    report["rows"] += len(df)
+    for column in missing_columns(df, rules):
+        if column not in report["missing_columns"]:
+            report["missing_columns"].append(column)
+    for key, mask in masks.items():
+        failed = int(np.count_nonzero(mask.to_numpy()))
+        if failed:
+            report["violations"][key] = report["violations"].get(key, 0) + failed
+    report["passed"] = not report["missing_columns"] and not report["violations"]
+
+
+def validate_frame(df: pd.DataFrame, rules=PROCESSED_RULES) -> dict:
+    """
+    Validates a whole DataFrame, reporting every violation at once.
+
+    Parameters:
+    df (pd.DataFrame): The data to validate.
+    rules (list): Rule definitions (see PROCESSED_RULES).
+
+    Returns:
+    dict: Report with the row count, missing columns, the number of
+        violating rows per rule and an overall "passed" flag.
+    """
+    report = new_report()
+    update_report(report, df, rule_masks(df, rules), rules)
+    return report
+
+
+def validate_chunks(chunks, rules=PROCESSED_RULES) -> dict:
+    """
+    Validates a stream of DataFrame chunks without holding them all in memory.
+    Uniqueness is checked across chunk boundaries.
+
+    Parameters:
+    chunks (Iterable[pd.DataFrame]): The data to validate.
+    rules (list): Rule definitions (see PROCESSED_RULES).
+
+    Returns:
+    dict: Same report as validate_frame().
+    """
+    report = new_report()
+    seen_rows = SeenHashes()
+    for chunk in chunks:
+        update_report(report, chunk, rule_masks(chunk, rules, seen_rows), rules)
+    return report
+
+
+def log_report(report: dict):
+    """
+    Logs every failure found in a validation report.
+    """
+    if report["missing_columns"]:
+        logging.error(f"Missing columns: {report['missing_columns']}")
+    for key, failed in report["violations"].items():
+        logging.error(f"Rule '{key}' failed for {failed} of {report['rows']} rows.")
+    if report["passed"]:
+        logging.info(f"All rules passed for {report['rows']} rows.")
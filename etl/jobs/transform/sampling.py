@@ -0,0 +1,142 @@
+import logging
+import numpy as np
+import pandas as pd
+from etl.config.config import VALIDATION_THRESHOLD
+from etl.jobs.transform.rules import PROCESSED_RULES, missing_columns, rule_masks
+
+# Columns defining the sampling strata
+STRATA_COLUMNS = ["hotel", "arrival_year"]
+
+# Rows kept per stratum
+SAMPLE_PER_STRATUM = 2000
+
+# z-score of the two-sided 95% confidence interval
+Z_SCORE = 1.96
+
+# Estimated violation rate (upper bound) above which a full validation runs
+DEFAULT_THRESHOLD = VALIDATION_THRESHOLD
+
+_KEY_COLUMN = "_sample_key"
+
+
+def stratified_sample(
+    chunks, strata=STRATA_COLUMNS, size=SAMPLE_PER_STRATUM, seed=None
+):
+    """
+    Draws a stratified random sample while the chunks stream past.
+
+    Every row gets a uniform random key and each stratum keeps the rows with
+    the smallest keys (bottom-k reservoir sampling), which yields a uniform
+    sample without replacement per stratum in one pass and bounded memory.
+
+    Parameters:
+    chunks (Iterable[pd.DataFrame]): The data to sample.
+    strata (list): Columns defining the strata.
+    size (int): Maximum rows kept per stratum.
+    seed (int, optional): Seed for reproducible samples.
+
+    Returns:
+    tuple[pd.DataFrame, pd.Series]: The sample, and the population size of
+        each stratum.
+
+    Raises:
+    ValueError: If a chunk misses required or strata columns.
+    """
+    rng = np.random.default_rng(seed)
+    sample = None
+    population = None
+
+    for chunk in chunks:
+        missing = missing_columns(chunk) + [c for c in strata if c not in chunk]
+        if missing:
+            raise ValueError(f"Missing columns: {sorted(set(missing))}")
+
+        counts = chunk.groupby(strata, observed=True, dropna=False).size()
+        population = (
+            counts if population is None else population.add(counts, fill_value=0)
+        )
+
+        keyed = chunk.assign(**{_KEY_COLUMN: rng.random(len(chunk))})
+        candidates = keyed if sample is None else pd.concat([sample, keyed])
+        sample = (
+            candidates.sort_values(_KEY_COLUMN)
+            .groupby(strata, observed=True, dropna=False)
+            .head(size)
+        )
+
+    if sample is None:
+        return pd.DataFrame(), pd.Series(dtype="int64")
+    return sample.drop(columns=_KEY_COLUMN), population.astype("int64")
+
+
+def estimate_violation_rates(
+    sample, population, rules=PROCESSED_RULES, strata=STRATA_COLUMNS
+):
+    """
+    Estimates the violation rate of every row-level rule from a stratified
+    sample, with 95% confidence bounds.
+
+    The rate is the population-weighted mean of the per-stratum rates, with
+    the stratified variance and finite population correction. When a rule has
+    no violation in the sample, the upper bound falls back to the rule of
+    three (3 / sample size).
+
+    Parameters:
+    sample (pd.DataFrame): Sample from stratified_sample().
+    population (pd.Series): Population size per stratum.
+    rules (list): Rule definitions; uniqueness rules are skipped since they
+        cannot be estimated from a sample.
+    strata (list): Columns defining the strata.
+
+    Returns:
+    dict: Maps each violation key to {"rate", "lower", "upper"}.
+    """
+    row_rules = [rule for rule in rules if rule["check"] not in ("columns", "unique")]
+    masks = rule_masks(sample, row_rules)
+    if not masks or sample.empty:
+        return {}
+
+    mask_frame = pd.DataFrame(masks).astype(float)
+    groups = [sample[column] for column in strata]
+    stratum_rates = mask_frame.groupby(groups, observed=True, dropna=False).mean()
+    sample_sizes = mask_frame.groupby(groups, observed=True, dropna=False).size()
+
+    population = population.reindex(stratum_rates.index).astype(float)
+    n = sample_sizes.astype(float)
+    weights = population / population.sum()
+    correction = (1 - n / population).clip(lower=0)
+
+    rates = stratum_rates.mul(weights, axis=0).sum()
+    variances = (
+        (stratum_rates * (1 - stratum_rates))
+        .mul(weights**2 * correction / n, axis=0)
+        .sum()
+    )
+    margins = Z_SCORE * np.sqrt(variances)
+
+    estimates = {}
+    for key in mask_frame.columns:
+        upper = rates[key] + margins[key]
+        if rates[key] == 0:
+            upper = 3 / len(sample)
+        estimates[key] = {
+            "rate": float(rates[key]),
+            "lower": float(max(rates[key] - margins[key], 0.0)),
+            "upper": float(min(upper, 1.0)),
+        }
+    return estimates
+
+
+def needs_full_validation(estimates: dict, threshold=DEFAULT_THRESHOLD) -> list:
+    """
+    Returns the violation keys whose upper confidence bound exceeds the
+    threshold.
+    """
+    flagged = [key for key, e in estimates.items() if e["upper"] > threshold]
+    for key in flagged:
+        e = estimates[key]
+        logging.warning(
+            f"Rule '{key}' estimated violation rate {e['rate']:.4%} "
+            f"(95% CI {e['lower']:.4%} - {e['upper']:.4%}) exceeds {threshold:.4%}."
+        )
+    return flagged
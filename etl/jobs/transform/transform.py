@@ -1,20 +1,23 @@
 import pandas as pd
 import numpy as np
+import itertools
 import logging
 import os
+from etl.jobs.extract.profile import DataProfiler, build_profile, save_profile
+from etl.jobs.transform.pseudonymize import PII_COLUMNS, pseudonymize
+from etl.jobs.transform.transform_dim_guest import BLOCKING_KEYS, resolve_guests
+from etl.jobs.utils.reader import plan_chunks, read_csv_chunks
+from etl.jobs.utils.sketches import SeenHashes, hash_values
+from etl.jobs.utils.spill import external_drop_duplicates, memory_budget
+from etl.jobs.utils.writer import write_csv
+from etl.jobs.transform.quarantine import REJECTS_PATH, save_rejects, split_valid_rows
+from etl.jobs.transform.rules import MONTH_NAMES
+from etl.jobs.utils.logger import configure_logging
 
 # from sklearn.preprocessing import LabelEncoder
 
-# Ensure that the "logs" directory exists
-os.makedirs("logs", exist_ok=True)
-
-# Configure logging to both console and file
-logging.basicConfig(
-    filename="logs/transform.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    filemode="w",  # Specify write mode to overwrite the file
-)
+# Configure logging
+configure_logging("transform.log")
 
 
 def load_data(file_path: str) -> pd.DataFrame:
@@ -39,9 +42,20 @@ def load_data(file_path: str) -> pd.DataFrame:
         raise
 
 
+def dedupe_columns(df: pd.DataFrame) -> list:
+    """
+    Returns the columns that identify a duplicate booking: all columns but
+    the PII tokens and the guest key derived from them. Bookings differing
+    only in guest PII stay duplicates, as when the PII columns were dropped.
+    """
+    excluded = set(PII_COLUMNS.values()) | {"guest_key"}
+    return [column for column in df.columns if column not in excluded]
+
+
 def remove_duplicates(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Removes duplicate rows from the DataFrame.
+    Removes duplicate rows from the DataFrame, compared on dedupe_columns();
+    the first booking is kept with its guest tokens.
 
     Parameters:
     df (pd.DataFrame): The DataFrame to remove duplicates from.
@@ -50,11 +64,31 @@ def remove_duplicates(df: pd.DataFrame) -> pd.DataFrame:
     pd.DataFrame: The DataFrame without duplicate rows.
     """
     logging.info("Removing duplicate rows...")
-    df = df.drop_duplicates(keep="first").reset_index(drop=True)
+    df = df.drop_duplicates(subset=dedupe_columns(df), keep="first")
+    df = df.reset_index(drop=True)
     # df = df.drop_duplicates()
     return df
 
 
+def drop_seen_duplicates(df: pd.DataFrame, seen: SeenHashes) -> pd.DataFrame:
+    """
+    Chunked variant of remove_duplicates(): drops the rows whose
+    dedupe_columns() were already seen earlier in the chunk or in an earlier
+    chunk, so duplicates are removed as in the batch run.
+
+    Parameters:
+    df (pd.DataFrame): One transformed chunk, in file order.
+    seen (SeenHashes): Hashes of the bookings kept so far.
+
+    Returns:
+    pd.DataFrame: The chunk without repeated bookings.
+    """
+    repeated = seen.mark_repeated(hash_values(df[dedupe_columns(df)]))
+    if repeated.any():
+        logging.info(f"Removed {repeated.sum()} duplicate rows.")
+    return df[~repeated]
+
+
 def rename_columns(df: pd.DataFrame) -> pd.DataFrame:
     """
     Renames the columns of the DataFrame to improve clarity.
@@ -147,6 +181,39 @@ def convert_to_categorical(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+def add_arrival_date(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Builds 'arrival_date' and its integer key 'arrival_date_key' (YYYYMMDD)
+    from the year, month name and day columns with vectorized arithmetic:
+    the month name becomes its number through a categorical, so no date
+    string is parsed row by row. Impossible dates (e.g. 30 February) are NaT.
+
+    Parameters:
+    df (pd.DataFrame): DataFrame with arrival_year, arrival_month, arrival_day.
+
+    Returns:
+    pd.DataFrame: The DataFrame with the two new columns.
+    """
+    logging.info("Building arrival dates...")
+    # Widen first: the category codes are int8 and the year may be downcast
+    month = pd.Categorical(df["arrival_month"], categories=MONTH_NAMES).codes
+    month = month.astype("int32") + 1
+    arrival_date = pd.to_datetime(
+        pd.DataFrame(
+            {"year": df["arrival_year"], "month": month, "day": df["arrival_day"]}
+        ),
+        errors="coerce",
+    )
+    date_key = (
+        df["arrival_year"].astype("Int32") * 10000
+        + month * 100
+        + df["arrival_day"].astype("Int32")
+    )
+    df["arrival_date"] = arrival_date
+    df["arrival_date_key"] = date_key.where(arrival_date.notna()).astype("Int32")
+    return df
+
+
 def drop_sensitive_columns(df: pd.DataFrame) -> pd.DataFrame:
     """
     Drops sensitive columns that should not be part of the processed data.
@@ -237,6 +304,9 @@ def transform_data(df: pd.DataFrame) -> pd.DataFrame:
     df = rename_columns(df)
     df = handle_missing_values(df)
     df = convert_to_categorical(df)
+    df = add_arrival_date(df)
+    df = pseudonymize(df)
+    df = resolve_guests(df)
     df = drop_sensitive_columns(df)
     df = remove_duplicates(df)
 
@@ -247,6 +317,116 @@ def transform_data(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+def prepare_chunk(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Applies the row-local steps of transform_data() to one chunk.
+    """
+    df = rename_columns(df)
+    df = handle_missing_values(df)
+    df = convert_to_categorical(df)
+    df = add_arrival_date(df)
+    df = pseudonymize(df)
+    return drop_sensitive_columns(df)
+
+
+def resolve_file_guests(file_path: str) -> pd.Series:
+    """
+    Resolves the guests of a whole raw CSV in a first pass that reads only
+    the columns of the blocking keys, so a chunked run links bookings
+    across chunks exactly as transform_data() does. Only the tokens are
+    kept in memory.
+
+    Parameters:
+    file_path (str): Raw CSV path.
+
+    Returns:
+    pd.Series: 'guest_key' per row, indexed by the row position in the file.
+    """
+    raw_names = {"phone_number": "phone-number"}
+    tokens = {column for columns in BLOCKING_KEYS.values() for column in columns}
+    sources = [c for c, token in PII_COLUMNS.items() if token in tokens] + ["country"]
+    usecols = [raw_names.get(column, column) for column in sources]
+    parts = []
+    for chunk in read_csv_chunks(file_path, usecols=usecols):
+        chunk = rename_columns(chunk)
+        chunk["country"] = chunk["country"].fillna("Unknown")
+        parts.append(pseudonymize(chunk))
+    if not parts:
+        return pd.Series(dtype=object, name="guest_key")
+    return resolve_guests(pd.concat(parts))["guest_key"]
+
+
+def assign_guest_keys(df: pd.DataFrame, guest_keys: pd.Series) -> pd.DataFrame:
+    """
+    Adds the guest keys resolved over the whole file (resolve_file_guests())
+    to a chunk read from it, by row position.
+    """
+    df["guest_key"] = guest_keys.reindex(df.index).to_numpy()
+    return df
+
+
+def transform_chunks(
+    chunks, guest_keys: pd.Series, budget: int = None, workers: int = None
+):
+    """
+    Out-of-core variant of transform_data() for inputs larger than RAM: the
+    row-local steps run chunk by chunk, guests come from a first pass over
+    the file (resolve_file_guests()), and duplicates are removed by spilling
+    hash partitions to disk (spill.external_drop_duplicates).
+
+    Parameters:
+    chunks (Iterable[pd.DataFrame]): Raw data chunks, in file order.
+    guest_keys (pd.Series): Output of resolve_file_guests() for the file.
+    budget (int): Memory budget in bytes; defaults to ETL_MEMORY_BUDGET.
+    workers (int): Processes deduplicating the shards.
+
+    Returns:
+    Iterator[pd.DataFrame]: Transformed chunks, in file order.
+    """
+    prepared = (assign_guest_keys(prepare_chunk(c), guest_keys) for c in chunks)
+    first = next(prepared, None)
+    if first is None:
+        return
+    yield from external_drop_duplicates(
+        itertools.chain([first], prepared),
+        subset=dedupe_columns(first),
+        budget=budget,
+        workers=workers,
+    )
+    logging.info("Out-of-core data transformation complete.")
+
+
+def transform_file_out_of_core(input_path: str, output_path: str):
+    """
+    Transforms a raw CSV chunk by chunk and streams the valid rows to the
+    processed CSV. Rejected rows are quarantined and the profile is built
+    on the way, so the file is never held in memory.
+
+    Parameters:
+    input_path (str): Raw CSV path.
+    output_path (str): Processed CSV path.
+    """
+    profiler = DataProfiler()
+    seen_rows = SeenHashes()
+    for path in (output_path, REJECTS_PATH):
+        if os.path.exists(path):
+            os.remove(path)
+    guest_keys = resolve_file_guests(input_path)
+    plan = plan_chunks(input_path)
+    chunks = read_csv_chunks(input_path, chunksize=plan["chunk_size"])
+
+    def valid_chunks():
+        for chunk in transform_chunks(chunks, guest_keys, workers=plan["workers"]):
+            valid, rejected = split_valid_rows(chunk, seen_rows=seen_rows)
+            save_rejects(rejected, append=True)
+            profiler.update(valid)
+            yield valid
+
+    rows = write_csv(valid_chunks(), output_path)
+    save_profile(profiler.result(), output_path)
+    logging.info(f"{rows} transformed rows streamed to {output_path}")
+
+
 def save_transformed_data(df: pd.DataFrame, output_path: str):
     """
     Saves the transformed DataFrame to a specified path as a CSV file.
@@ -259,7 +439,7 @@ def save_transformed_data(df: pd.DataFrame, output_path: str):
     Exception: If the data cannot be saved due to any issue.
     """
     try:
-        df.to_csv(output_path, index=False)
+        write_csv(df, output_path)
         logging.info(f"Transformed data saved to {output_path}")
     except Exception as e:
         logging.error(f"Failed to save transformed data: {e}")
@@ -269,16 +449,35 @@ def save_transformed_data(df: pd.DataFrame, output_path: str):
 if __name__ == "__main__":
     # Load the dataset
     try:
-        df = load_data("etl/data/raw/hotel_booking.csv")
-
-        # Transform the data
-        transformed_df = transform_data(df)
-
-        # Ensure processed directory exists
-        os.makedirs("etl/data/processed", exist_ok=True)
-
-        # Save the transformed data
-        save_transformed_data(transformed_df, "etl/data/processed/processed_data.csv")
+        if memory_budget():
+            # Larger-than-RAM inputs are streamed through the spill layer
+            os.makedirs("etl/data/processed", exist_ok=True)
+            transform_file_out_of_core(
+                "etl/data/raw/hotel_booking.csv",
+                "etl/data/processed/processed_data.csv",
+            )
+        else:
+            df = load_data("etl/data/raw/hotel_booking.csv")
+
+            # Transform the data
+            transformed_df = transform_data(df)
+
+            # Quarantine invalid rows so they do not fail the whole run
+            transformed_df, rejected_df = split_valid_rows(transformed_df)
+            save_rejects(rejected_df)
+
+            # Ensure processed directory exists
+            os.makedirs("etl/data/processed", exist_ok=True)
+
+            # Save the transformed data
+            save_transformed_data(
+                transformed_df, "etl/data/processed/processed_data.csv"
+            )
+
+            # Profile the in-memory result so validation does not rescan the CSV
+            save_profile(
+                build_profile(transformed_df), "etl/data/processed/processed_data.csv"
+            )
 
     except Exception as e:
         logging.error(f"An error occurred: {e}")
@@ -1,6 +1,8 @@
 import pandas as pd
 import os
 from etl.jobs.utils.logger import setup_logger
+from etl.jobs.utils.reader import read_distinct
+from etl.jobs.utils.writer import write_csv
 
 logger = setup_logger("transform_dim_country", "transform_dim_country.log")
 
@@ -201,13 +203,13 @@ def extract_unique_countries(df: pd.DataFrame) -> pd.DataFrame:
 def main():
     try:
         logger.info("Reading processed data from CSV...")
-        df = pd.read_csv(INPUT_PATH)
+        df = read_distinct(INPUT_PATH, ["country"])
 
         logger.info("Extracting unique countries...")
         dim_country_df = extract_unique_countries(df)
 
         os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
-        dim_country_df.to_csv(OUTPUT_PATH, index=False)
+        write_csv(dim_country_df, OUTPUT_PATH)
 
         logger.info(f"dim_country.csv saved successfully to {OUTPUT_PATH}.")
         print("✅ dim_country.csv created successfully!")
@@ -1,6 +1,8 @@
 import pandas as pd
 import os
 from etl.jobs.utils.logger import setup_logger
+from etl.jobs.utils.reader import read_distinct
+from etl.jobs.utils.writer import write_csv
 
 logger = setup_logger("transform_dim_customer", "transform_dim_customer.log")
 
@@ -29,13 +31,13 @@ def main():
     """
     try:
         logger.info("Reading processed data from CSV...")
-        df = pd.read_csv(INPUT_PATH)
+        df = read_distinct(INPUT_PATH, ["customer_type"])
 
         logger.info("Extracting unique customer types...")
         dim_df = extract_unique_customer_types(df)
 
         os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
-        dim_df.to_csv(OUTPUT_PATH, index=False)
+        write_csv(dim_df, OUTPUT_PATH)
 
         logger.info(f"dim_customer.csv saved successfully to {OUTPUT_PATH}.")
         print("✅ dim_customer.csv created successfully!")
@@ -0,0 +1,104 @@
+import pandas as pd
+import os
+from etl.jobs.utils.logger import setup_logger
+from etl.jobs.utils.writer import write_csv
+
+logger = setup_logger("transform_dim_date", "transform_dim_date.log")
+
+INPUT_PATH = "etl/data/processed/processed_data.csv"
+OUTPUT_PATH = "etl/data/dimensions/dim_date.csv"
+
+# Meteorological seasons (northern hemisphere), by month number
+SEASONS = {
+    12: "Winter",
+    1: "Winter",
+    2: "Winter",
+    3: "Spring",
+    4: "Spring",
+    5: "Spring",
+    6: "Summer",
+    7: "Summer",
+    8: "Summer",
+    9: "Autumn",
+    10: "Autumn",
+    11: "Autumn",
+}
+
+
+def build_dim_date(start, end) -> pd.DataFrame:
+    """
+    Generates one row per calendar day between two dates, keyed by the
+    integer date key YYYYMMDD used by fact_bookings.arrival_date_key.
+
+    Parameters:
+    start, end (date-like): First and last day, inclusive; None for an
+        empty dimension.
+
+    Returns:
+    pd.DataFrame: Columns date_key, date, year, quarter, month, month_name,
+        week (ISO), day, day_of_week (1 = Monday), is_weekend and season.
+    """
+    if start is None:
+        dates = pd.DatetimeIndex([])
+    else:
+        dates = pd.date_range(start, end, freq="D")
+    return pd.DataFrame(
+        {
+            "date_key": dates.year * 10000 + dates.month * 100 + dates.day,
+            "date": dates.date,
+            "year": dates.year,
+            "quarter": dates.quarter,
+            "month": dates.month,
+            "month_name": dates.month_name(),
+            "week": dates.isocalendar().week.to_numpy(),
+            "day": dates.day,
+            "day_of_week": dates.dayofweek + 1,
+            "is_weekend": dates.dayofweek >= 5,
+            "season": dates.month.map(SEASONS),
+        }
+    )
+
+
+def extract_dim_date(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Builds the date dimension covering every arrival date in the DataFrame.
+
+    Parameters:
+    df (pd.DataFrame): Processed DataFrame with an 'arrival_date' column.
+
+    Returns:
+    pd.DataFrame: The date dimension (empty if there is no valid date).
+    """
+    dates = pd.to_datetime(df["arrival_date"], errors="coerce").dropna()
+    if dates.empty:
+        return build_dim_date(None, None)
+    return build_dim_date(dates.min(), dates.max())
+
+
+def main():
+    """
+    Main ETL function to build the date dimension:
+    - Reads the processed dataset
+    - Generates the calendar spanning its arrival dates
+    - Saves the result to dim_date.csv
+    """
+    try:
+        logger.info("Reading processed data from CSV...")
+        df = pd.read_csv(INPUT_PATH, usecols=["arrival_date"])
+
+        logger.info("Generating date dimension...")
+        dim_date = extract_dim_date(df)
+
+        os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
+        write_csv(dim_date, OUTPUT_PATH)
+
+        logger.info(f"dim_date.csv saved with {len(dim_date)} days.")
+        print("✅ dim_date.csv created successfully!")
+
+    except Exception as e:
+        logger.error(f"An error occurred during dim_date transformation: {e}")
+        print(f"❌ Error: {e}")
+
+
+if __name__ == "__main__":
+    main()
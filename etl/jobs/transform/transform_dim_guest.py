@@ -0,0 +1,169 @@
+import numpy as np
+import pandas as pd
+import os
+from etl.jobs.utils.logger import setup_logger
+from etl.jobs.utils.reader import read_distinct
+from etl.jobs.utils.writer import write_csv
+
+logger = setup_logger("transform_dim_guest", "transform_dim_guest.log")
+
+INPUT_PATH = "etl/data/processed/processed_data.csv"
+OUTPUT_PATH = "etl/data/dimensions/dim_guest.csv"
+
+# Blocking keys: bookings sharing any of them belong to the same guest. The
+# prefix becomes part of guest_key, so keys of different kinds never collide.
+BLOCKING_KEYS = {
+    "e": ["email_token"],
+    "p": ["phone_token"],
+    "n": ["name_token", "country"],
+}
+
+
+def blocking_codes(df: pd.DataFrame, columns: list) -> np.ndarray:
+    """
+    Encodes a blocking key as integer codes by combining the factorized
+    codes of its columns (hash-based, no sorting). A row with a null part
+    gets -1 and is not blocked.
+
+    Parameters:
+    df (pd.DataFrame): Processed DataFrame.
+    columns (list): Columns of the blocking key.
+
+    Returns:
+    np.ndarray: int64 code per row.
+    """
+    codes = np.zeros(len(df), dtype=np.int64)
+    for column in columns:
+        column_codes, uniques = pd.factorize(df[column])
+        codes = np.where(
+            (codes < 0) | (column_codes < 0), -1, codes * len(uniques) + column_codes
+        )
+    # Compact the combined codes back to 0..k-1
+    valid = codes >= 0
+    codes[valid] = pd.factorize(codes[valid])[0]
+    return codes
+
+
+def block_edges(codes: np.ndarray) -> tuple:
+    """
+    Links every row of a block to the first row of that block, so a block of
+    k rows yields k edges instead of k * (k - 1) / 2 pairs.
+
+    Parameters:
+    codes (np.ndarray): Blocking code per row, -1 for unblocked rows.
+
+    Returns:
+    tuple[np.ndarray, np.ndarray]: Row positions of the edge ends.
+    """
+    rows = np.flatnonzero(codes >= 0)
+    block = codes[rows]
+    first = np.empty(block.max() + 1 if len(block) else 0, dtype=np.int64)
+    # Reversed assignment keeps the first occurrence of each block
+    first[block[::-1]] = rows[::-1]
+    return rows, first[block]
+
+
+def connected_components(n: int, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """
+    Vectorized union-find: hooks the larger root of every unmerged edge onto
+    the smaller one, then compresses paths by pointer jumping, until all
+    edges are inside one component. Each round is a few array passes and the
+    edge list shrinks as components merge.
+
+    Parameters:
+    n (int): Number of nodes.
+    left, right (np.ndarray): Edge ends.
+
+    Returns:
+    np.ndarray: Component label per node (the smallest node in it).
+    """
+    parent = np.arange(n)
+    while True:
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+        root_left, root_right = parent[left], parent[right]
+        unmerged = root_left != root_right
+        if not unmerged.any():
+            return parent
+        left, right = left[unmerged], right[unmerged]
+        low = np.minimum(root_left[unmerged], root_right[unmerged])
+        high = np.maximum(root_left[unmerged], root_right[unmerged])
+        np.minimum.at(parent, high, low)
+
+
+def resolve_guests(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Adds 'guest_key', grouping the bookings that share an email token, a
+    phone token or a name token in the same country. The key is the
+    smallest blocking key of the group, by priority of BLOCKING_KEYS, so it
+    does not depend on row order. Bookings without any blocking key get no
+    guest. Only the bookings of the DataFrame are linked together.
+
+    Parameters:
+    df (pd.DataFrame): Processed DataFrame with the pseudonym columns.
+
+    Returns:
+    pd.DataFrame: The DataFrame with a 'guest_key' column.
+    """
+    keys = {
+        prefix: (columns, blocking_codes(df, columns))
+        for prefix, columns in BLOCKING_KEYS.items()
+        if all(column in df.columns for column in columns)
+    }
+    edges = [block_edges(codes) for _, codes in keys.values()]
+    left = np.concatenate([e[0] for e in edges] or [np.empty(0, dtype=np.int64)])
+    right = np.concatenate([e[1] for e in edges] or [np.empty(0, dtype=np.int64)])
+    labels = connected_components(len(df), left, right)
+
+    component_key = np.full(len(df), None, dtype=object)
+    resolved = np.zeros(len(df), dtype=bool)
+    for prefix, (columns, codes) in keys.items():
+        rows = np.flatnonzero((codes >= 0) & ~resolved[labels])
+        # One row holding the smallest key hash of each component
+        hashes = pd.Series(
+            pd.util.hash_pandas_object(df[columns].iloc[rows], index=False).to_numpy()
+        )
+        smallest = hashes.groupby(labels[rows]).transform("min").to_numpy()
+        rows = rows[hashes.to_numpy() == smallest]
+        rows = rows[~pd.Series(labels[rows]).duplicated().to_numpy()]
+        key = prefix + ":" + df[columns[0]].iloc[rows].astype(str)
+        for column in columns[1:]:
+            key = key + "|" + df[column].iloc[rows].astype(str)
+        component_key[labels[rows]] = key.to_numpy()
+        resolved[labels[rows]] = True
+
+    df["guest_key"] = component_key[labels]
+    logger.info(f"Resolved {len(df)} bookings into {df['guest_key'].nunique()} guests.")
+    return df
+
+
+def extract_unique_guests(df: pd.DataFrame) -> pd.DataFrame:
+    unique_guests = df[["guest_key"]].dropna().drop_duplicates().reset_index(drop=True)
+    unique_guests.insert(0, "guest_id", range(1, len(unique_guests) + 1))
+    return unique_guests
+
+
+def main():
+    try:
+        logger.info("Reading processed data from CSV...")
+        df = read_distinct(INPUT_PATH, ["guest_key"])
+
+        logger.info("Extracting unique guests...")
+        dim_guest_df = extract_unique_guests(df)
+
+        os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
+        write_csv(dim_guest_df, OUTPUT_PATH)
+
+        logger.info(f"dim_guest.csv saved with {len(dim_guest_df)} guests.")
+        print("✅ dim_guest.csv created successfully!")
+
+    except Exception as e:
+        logger.error(f"An error occurred during dim_guest transformation: {e}")
+        print(f"❌ Error: {e}")
+
+
+if __name__ == "__main__":
+    main()
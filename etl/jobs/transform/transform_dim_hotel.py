@@ -1,6 +1,8 @@
 import pandas as pd
 import os
 from etl.jobs.utils.logger import setup_logger
+from etl.jobs.utils.reader import read_distinct
+from etl.jobs.utils.writer import write_csv
 
 logger = setup_logger("transform_dim_hotel", "transform_dim_hotel.log")
 
@@ -33,13 +35,13 @@ def main():
     """
     try:
         logger.info("Reading processed data from CSV...")
-        df = pd.read_csv(INPUT_PATH)
+        df = read_distinct(INPUT_PATH, ["hotel"])
 
         logger.info("Extracting unique hotels...")
         dim_hotel_df = extract_unique_hotels(df)
 
         os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
-        dim_hotel_df.to_csv(OUTPUT_PATH, index=False)
+        write_csv(dim_hotel_df, OUTPUT_PATH)
 
         logger.info(f"dim_hotel.csv saved successfully to {OUTPUT_PATH}.")
         print("✅ dim_hotel.csv created successfully!")
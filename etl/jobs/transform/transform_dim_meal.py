@@ -1,6 +1,8 @@
 import pandas as pd
 import os
 from etl.jobs.utils.logger import setup_logger
+from etl.jobs.utils.reader import read_distinct
+from etl.jobs.utils.writer import write_csv
 
 logger = setup_logger("transform_dim_meal", "transform_dim_meal.log")
 
@@ -33,13 +35,13 @@ def main():
     """
     try:
         logger.info("Reading processed data from CSV...")
-        df = pd.read_csv(INPUT_PATH)
+        df = read_distinct(INPUT_PATH, ["meal_plan"])
 
         logger.info("Extracting unique meal plans...")
         dim_meal_df = extract_unique_meal_plans(df)
 
         os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
-        dim_meal_df.to_csv(OUTPUT_PATH, index=False)
+        write_csv(dim_meal_df, OUTPUT_PATH)
 
         logger.info(f"dim_meal.csv saved successfully to {OUTPUT_PATH}.")
         print("✅ dim_meal.csv created successfully!")
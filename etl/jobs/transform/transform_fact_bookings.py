@@ -1,6 +1,13 @@
+import numpy as np
 import pandas as pd
 import os
+from etl.config import config
+from etl.jobs.transform.quarantine import REASON_COLUMN, save_rejects
+from etl.jobs.transform.rules import MONTH_NAMES, allowed_values
 from etl.jobs.utils.logger import setup_logger
+from etl.jobs.utils.reader import read_csv_chunks
+from etl.jobs.utils.spill import external_merge, memory_budget
+from etl.jobs.utils.writer import write_csv
 
 logger = setup_logger("transform_fact_bookings", "transform_fact_bookings.log")
 
@@ -8,74 +15,290 @@ INPUT_PATH = "etl/data/processed/processed_data.csv"
 DIM_PATH = "etl/data/dimensions"
 OUTPUT_PATH = "etl/data/facts/fact_bookings.csv"
 
+# Fact rows the compact layout cannot hold, with the reason
+FACT_REJECTS_PATH = "etl/data/rejects/fact_rejects.csv"
+
+
+FACT_COLUMNS = [
+    "hotel_id",
+    "country_id",
+    "meal_plan_id",
+    "customer_id",
+    "guest_id",
+    "arrival_year",
+    "arrival_month",
+    "arrival_day",
+    "arrival_date_key",
+    "lead_time",
+    "weekend_nights",
+    "week_nights",
+    "adults",
+    "children",
+    "babies",
+    "is_canceled",
+    "booking_changes",
+    "deposit_type",
+    "adr",
+    "parking_spaces",
+    "special_requests",
+    "reservation_status",
+    "reservation_status_date",
+]
+
+# pandas dtypes matching load_fact_bookings.COMPACT_FACT_COLUMNS; foreign keys
+# and children are nullable since a failed lookup or a missing count is NaN
+COMPACT_DTYPES = {
+    "booking_id": "int32",
+    "hotel_id": "Int16",
+    "country_id": "Int16",
+    "meal_plan_id": "Int16",
+    "customer_id": "Int16",
+    "guest_id": "Int32",
+    "arrival_year": "int16",
+    "arrival_month": "int16",
+    "arrival_day": "int16",
+    "arrival_date_key": "Int32",
+    "lead_time": "int16",
+    "weekend_nights": "int16",
+    "week_nights": "int16",
+    "adults": "int16",
+    "children": "Int16",
+    "babies": "int16",
+    "is_canceled": "int16",
+    "booking_changes": "int16",
+    "parking_spaces": "int16",
+    "special_requests": "int16",
+    "adr": "float64",
+}
+
+# Low-cardinality text columns stored as enums in the compact layout
+COMPACT_ENUM_COLUMNS = ["deposit_type", "reservation_status"]
+
+
+def compact_ranges() -> dict:
+    """
+    Returns the (min, max) range of each integer column of the compact
+    layout, in COMPACT_DTYPES order. The month is checked by name instead.
+    """
+    ranges = {}
+    for column, dtype in COMPACT_DTYPES.items():
+        if column == "arrival_month" or not dtype.lower().startswith("int"):
+            continue
+        info = np.iinfo(dtype.lower())
+        ranges[column] = (int(info.min), int(info.max))
+    return ranges
+
+
+def compact_rejects(fact: pd.DataFrame, months: pd.Categorical) -> pd.Series:
+    """
+    Returns, per fact row, the reasons it cannot be stored in the compact
+    layout ('' if it can): an unknown or missing month name, or an integer
+    outside the range of its compact dtype, which astype() would silently
+    wrap around.
+    """
+    masks = {"arrival_month_unknown": pd.Series(months.codes < 0, index=fact.index)}
+    for column, (low, high) in compact_ranges().items():
+        values = pd.to_numeric(fact[column])
+        masks[f"{column}_out_of_range"] = (values < low) | (values > high)
+    mask_frame = pd.DataFrame(masks)
+    return mask_frame.dot(mask_frame.columns + ";").str.rstrip(";")
+
+
+def compact_fact(
+    fact: pd.DataFrame, rejects_path: str = FACT_REJECTS_PATH, append: bool = False
+):
+    """
+    Converts fact rows to the compact layout: small integer dtypes, the
+    arrival month as its number (1-12) and enum columns as categoricals whose
+    categories are the enum labels.
+
+    Rows the layout cannot hold (see compact_rejects()) are quarantined to
+    rejects_path instead of being stored with wrapped or zeroed values.
+
+    Parameters:
+    fact (pd.DataFrame): Output of build_fact().
+    rejects_path (str): Path of the fact reject CSV.
+    append (bool): Append to the reject CSV, for chunks after the first.
+
+    Returns:
+    pd.DataFrame: The fact rows with compact dtypes.
+    """
+    months = pd.Categorical(fact["arrival_month"], categories=MONTH_NAMES)
+    reasons = compact_rejects(fact, months)
+    invalid = reasons != ""
+    rejected = fact[invalid].assign(**{REASON_COLUMN: reasons[invalid]})
+    save_rejects(rejected, rejects_path, append=append)
+    if invalid.any():
+        logger.warning(
+            f"Quarantined {invalid.sum()} fact rows the compact layout cannot hold."
+        )
+
+    fact = fact[~invalid].assign(arrival_month=months.codes[~invalid.to_numpy()] + 1)
+    for column in COMPACT_ENUM_COLUMNS:
+        fact[column] = pd.Categorical(fact[column], categories=allowed_values(column))
+    return fact.astype(COMPACT_DTYPES)
+
+
+def join_dimensions(
+    df, dim_hotel, dim_country, dim_meal, dim_customer, dim_guest=None
+) -> pd.DataFrame:
+    """
+    Joins the processed data with the dimensions and keeps the fact columns.
+    dim_guest may be None when 'guest_id' was already joined.
+
+    Raises:
+    ValueError: If a foreign key column is missing after the merges.
+    """
+    df = df.merge(dim_hotel, on="hotel", how="left")
+    df = df.merge(
+        dim_country[["country_code", "country_id"]],
+        how="left",
+        left_on="country",
+        right_on="country_code",
+    )
+    df.drop(columns=["country", "country_code"], inplace=True)
+    df = df.merge(
+        dim_meal.rename(columns={"meal_id": "meal_plan_id"}),
+        on="meal_plan",
+        how="left",
+    )
+
+    df = df.merge(dim_customer, on="customer_type", how="left")
+    if dim_guest is not None:
+        df = df.merge(dim_guest, on="guest_key", how="left")
+
+    # Verificação de colunas obrigatórias
+    required_columns = [
+        "hotel_id",
+        "country_id",
+        "meal_plan_id",
+        "customer_id",
+        "guest_id",
+    ]
+    missing = [col for col in required_columns if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns after merge: {missing}")
+
+    return df[FACT_COLUMNS].copy()
+
+
+def build_fact(
+    df,
+    dim_hotel,
+    dim_country,
+    dim_meal,
+    dim_customer,
+    dim_guest,
+    compact=config.COMPACT_FACT,
+):
+    """
+    Joins the processed data with the dimensions and builds the fact table.
+
+    Parameters:
+    df (pd.DataFrame): Processed booking data.
+    dim_hotel, dim_country, dim_meal, dim_customer, dim_guest (pd.DataFrame):
+        Dimensions.
+    compact (bool): Return the compact layout (see compact_fact()).
+
+    Returns:
+    pd.DataFrame: Fact rows with a surrogate 'booking_id' in row order.
+
+    Raises:
+    ValueError: If a foreign key column is missing after the merges.
+    """
+    fact = join_dimensions(
+        df, dim_hotel, dim_country, dim_meal, dim_customer, dim_guest
+    )
+
+    fact.reset_index(drop=True, inplace=True)
+    fact.insert(0, "booking_id", fact.index + 1)
+    return compact_fact(fact) if compact else fact
+
+
+def build_fact_chunks(
+    chunks,
+    dim_hotel,
+    dim_country,
+    dim_meal,
+    dim_customer,
+    dim_guest,
+    compact=config.COMPACT_FACT,
+    **spill_options,
+):
+    """
+    Out-of-core variant of build_fact() for processed data larger than RAM.
+    dim_guest grows with the bookings, so it is joined through on-disk
+    shards (spill.external_merge); the other dimensions are small and are
+    joined chunk by chunk. booking_id continues across chunks, so the rows
+    match build_fact() on the whole file.
+
+    Parameters:
+    chunks (Iterable[pd.DataFrame]): Processed booking data, in file order.
+    dim_hotel, dim_country, dim_meal, dim_customer, dim_guest (pd.DataFrame):
+        Dimensions.
+    compact (bool): Return the compact layout (see compact_fact()).
+    **spill_options: Forwarded to external_merge() (budget, workers, ...).
+
+    Returns:
+    Iterator[pd.DataFrame]: Fact chunks, in file order.
+
+    Raises:
+    ValueError: If a foreign key column is missing after the merges.
+    """
+    # A chunk without guests reads guest_key as float; keep the key dtype of
+    # dim_guest so a shard holding only such rows can still be joined
+    chunks = (chunk.astype({"guest_key": object}) for chunk in chunks)
+    joined = external_merge(chunks, dim_guest, on=["guest_key"], **spill_options)
+    offset = 0
+    for chunk in joined:
+        fact = join_dimensions(chunk, dim_hotel, dim_country, dim_meal, dim_customer)
+        fact.insert(0, "booking_id", np.arange(offset + 1, offset + len(fact) + 1))
+        fact = compact_fact(fact, append=offset > 0) if compact else fact
+        offset += len(chunk)
+        yield fact
+
 
 def main():
     try:
-        logger.info("Reading processed data and dimension tables...")
-        df = pd.read_csv(INPUT_PATH)
+        logger.info("Reading dimension tables...")
         dim_hotel = pd.read_csv(f"{DIM_PATH}/dim_hotel.csv")
         dim_country = pd.read_csv("etl/data/dimensions/dim_country.csv")
         dim_meal = pd.read_csv(f"{DIM_PATH}/dim_meal.csv")
         dim_customer = pd.read_csv(f"{DIM_PATH}/dim_customer.csv")
+        dim_guest = pd.read_csv(f"{DIM_PATH}/dim_guest.csv")
 
-        logger.info("Merging dimension tables with processed data...")
-        df = df.merge(dim_hotel, on="hotel", how="left")
-        df = df.merge(dim_country[["country_code", "country_id"]], how="left", left_on="country", right_on="country_code")
-        df.drop(columns=["country", "country_code"], inplace=True)
-        df = df.merge(
-            dim_meal.rename(columns={"meal_id": "meal_plan_id"}),
-            on="meal_plan",
-            how="left",
-        )
+        dims = (dim_hotel, dim_country, dim_meal, dim_customer, dim_guest)
+        os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
 
-        df = df.merge(dim_customer, on="customer_type", how="left")
-
-        # Verificação de colunas obrigatórias
-        required_columns = [
-            "hotel_id",
-            "country_id",
-            "meal_plan_id",
-            "customer_id",
-        ]
-        missing = [col for col in required_columns if col not in df.columns]
-        if missing:
-            logger.error(f"Missing columns after merge: {missing}")
-            print(f"❌ Error: Missing columns after merge: {missing}")
+        if memory_budget():
+            # Larger-than-RAM inputs are joined chunk by chunk
+            logger.info("Streaming processed data through the dimension joins...")
+            if os.path.exists(OUTPUT_PATH):
+                os.remove(OUTPUT_PATH)
+            try:
+                chunks = build_fact_chunks(read_csv_chunks(INPUT_PATH), *dims)
+                rows = write_csv(chunks, OUTPUT_PATH)
+            except ValueError as e:
+                logger.error(str(e))
+                print(f"❌ Error: {e}")
+                return
+            logger.info(f"{rows} fact rows streamed to {OUTPUT_PATH}.")
+            print("✅ fact_bookings.csv created successfully!")
             return
 
-        logger.info("Selecting and renaming fact columns...")
-        fact = df[
-            [
-                "hotel_id",
-                "country_id",
-                "meal_plan_id",
-                "customer_id",
-                "arrival_year",
-                "arrival_month",
-                "arrival_day",
-                "lead_time",
-                "weekend_nights",
-                "week_nights",
-                "adults",
-                "children",
-                "babies",
-                "is_canceled",
-                "booking_changes",
-                "deposit_type",
-                "adr",
-                "parking_spaces",
-                "special_requests",
-                "reservation_status",
-                "reservation_status_date",
-            ]
-        ].copy()
-
-        fact.reset_index(drop=True, inplace=True)
-        fact.insert(0, "booking_id", fact.index + 1)
+        logger.info("Reading processed data...")
+        df = pd.read_csv(INPUT_PATH)
+
+        logger.info("Merging dimension tables with processed data...")
+        try:
+            fact = build_fact(df, *dims)
+        except ValueError as e:
+            logger.error(str(e))
+            print(f"❌ Error: {e}")
+            return
 
         logger.info("Saving fact_bookings to CSV...")
-        os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
-        fact.to_csv(OUTPUT_PATH, index=False)
+        write_csv(fact, OUTPUT_PATH)
 
         logger.info("fact_bookings.csv saved successfully.")
         print("✅ fact_bookings.csv created successfully!")
@@ -0,0 +1,173 @@
+import numpy as np
+import pandas as pd
+import os
+from etl.jobs.transform.rules import MONTH_NAMES
+from etl.jobs.utils.logger import setup_logger
+
+logger = setup_logger("transform_kpi_cube", "transform_kpi_cube.log")
+
+INPUT_PATH = "etl/data/facts/fact_bookings.csv"
+OUTPUT_PATH = "etl/data/facts/kpi_cube.npz"
+
+# Cube dimensions: integer keys of the fact table (month as its number 1-12)
+CUBE_KEYS = ["hotel_id", "country_id", "arrival_year", "arrival_month"]
+
+# Additive measures; nights and revenue count non-canceled bookings only,
+# like the database aggregates in load_kpi.py
+MEASURES = [
+    "bookings",
+    "canceled",
+    "nights",
+    "revenue",
+    "adr_sum",
+    "lead_time_sum",
+]
+
+# Ratios derived after a rollup: name -> (numerator, denominator)
+DERIVED = {
+    "cancellation_rate": ("canceled", "bookings"),
+    "avg_adr": ("adr_sum", "bookings"),
+    "avg_lead_time": ("lead_time_sum", "bookings"),
+    "adr": ("revenue", "nights"),
+}
+
+# Dashboard KPIs (docs/kpi/kpi_dashboard.md): grouping keys and columns. The
+# names are those of etl/kpi/queries.py and the columns those of the kpi_*
+# views (load_kpi.py), with ids in place of the dimension names.
+KPIS = {
+    "bookings_by_country": (["country_id"], ["bookings"]),
+    "adr_revenue_by_hotel": (["hotel_id"], ["revenue", "nights", "adr"]),
+    "booked_nights_by_hotel_month": (
+        ["hotel_id", "arrival_year", "arrival_month"],
+        ["nights"],
+    ),
+    "avg_lead_time_by_country": (["country_id"], ["avg_lead_time"]),
+    "cancellation_rate_by_country": (
+        ["country_id"],
+        ["bookings", "canceled", "cancellation_rate"],
+    ),
+}
+
+
+def build_cube(fact: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aggregates fact rows into the KPI cube with one vectorized groupby. Rows
+    whose dimension lookup failed keep a NaN key and form their own cells,
+    so the cube totals count every fact row, as the SQL aggregates do.
+
+    Parameters:
+    fact (pd.DataFrame): Fact rows (see transform_fact_bookings.build_fact).
+
+    Returns:
+    pd.DataFrame: One row per (hotel, country, year, month) with the
+        additive measures in MEASURES.
+    """
+    month = fact["arrival_month"]
+    if not pd.api.types.is_numeric_dtype(month):
+        # Standard layout stores month names, the compact one their numbers
+        month = pd.Categorical(month, categories=MONTH_NAMES).codes + 1
+    nights = fact["weekend_nights"] + fact["week_nights"]
+    realized = 1 - fact["is_canceled"]
+    frame = pd.DataFrame(
+        {
+            "hotel_id": fact["hotel_id"],
+            "country_id": fact["country_id"],
+            "arrival_year": fact["arrival_year"],
+            "arrival_month": month,
+            "bookings": 1,
+            "canceled": fact["is_canceled"],
+            "nights": nights * realized,
+            "revenue": fact["adr"] * nights * realized,
+            "adr_sum": fact["adr"],
+            "lead_time_sum": fact["lead_time"],
+        }
+    )
+    cells = frame.groupby(CUBE_KEYS, as_index=False, sort=True, dropna=False)
+    return cells[MEASURES].sum()
+
+
+def save_cube(cube: pd.DataFrame, output_path: str = OUTPUT_PATH):
+    """
+    Writes the cube as a compressed columnar .npz file, one array per column,
+    with integer columns downcast to the smallest type that fits.
+
+    Parameters:
+    cube (pd.DataFrame): Output of build_cube().
+    output_path (str): Destination path.
+    """
+    arrays = {}
+    for name in cube.columns:
+        column = cube[name]
+        if pd.api.types.is_integer_dtype(column):
+            column = pd.to_numeric(column, downcast="integer")
+        arrays[name] = column.to_numpy()
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    np.savez_compressed(output_path, **arrays)
+
+
+def load_cube(input_path: str = OUTPUT_PATH) -> pd.DataFrame:
+    """
+    Reads a cube written by save_cube().
+    """
+    with np.load(input_path) as arrays:
+        return pd.DataFrame({name: arrays[name] for name in arrays.files})
+
+
+def rollup(cube: pd.DataFrame, by: list, columns: list = None) -> pd.DataFrame:
+    """
+    Rolls the cube up to the given keys, summing the measures and computing
+    the derived ratios from the summed totals.
+
+    Parameters:
+    cube (pd.DataFrame): The cube.
+    by (list): Keys of CUBE_KEYS to keep; an empty list gives grand totals.
+    columns (list, optional): Measures and ratios to return, default all.
+
+    Returns:
+    pd.DataFrame: One row per key combination.
+    """
+    if by:
+        groups = cube.groupby(by, as_index=False, sort=True, dropna=False)
+        totals = groups[MEASURES].sum()
+    else:
+        totals = cube[MEASURES].sum().to_frame().T
+    for name, (numerator, denominator) in DERIVED.items():
+        totals[name] = totals[numerator] / totals[denominator].replace(0, np.nan)
+    return totals[list(by) + (columns or MEASURES + list(DERIVED))]
+
+
+def query_cube(name: str, cube: pd.DataFrame = None) -> pd.DataFrame:
+    """
+    Returns a dashboard KPI computed from the cube, without a database (the
+    cached database queries are etl.kpi.queries.query_kpi()).
+
+    Parameters:
+    name (str): KPI name, a key of KPIS.
+    cube (pd.DataFrame, optional): The cube, read from OUTPUT_PATH if omitted.
+
+    Returns:
+    pd.DataFrame: The KPI table.
+    """
+    by, columns = KPIS[name]
+    return rollup(load_cube() if cube is None else cube, by, columns)
+
+
+def main():
+    try:
+        logger.info("Reading fact_bookings...")
+        fact = pd.read_csv(INPUT_PATH)
+
+        logger.info("Building KPI cube...")
+        cube = build_cube(fact)
+        save_cube(cube)
+
+        logger.info(f"KPI cube with {len(cube)} cells saved to {OUTPUT_PATH}.")
+        print(f"✅ kpi_cube.npz created with {len(cube)} cells!")
+
+    except Exception as e:
+        logger.error(f"An error occurred during KPI cube build: {e}")
+        print(f"❌ Error: {e}")
+
+
+if __name__ == "__main__":
+    main()
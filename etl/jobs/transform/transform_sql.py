@@ -0,0 +1,297 @@
+import logging
+import pandas as pd
+from contextlib import nullcontext
+from etl.jobs.load.bulk_load import bulk_load
+from etl.jobs.load.load import STAGING_TABLE
+from etl.jobs.load.load_dimension import (
+    DIMENSIONS,
+    create_dimension_table,
+    merge_scd2,
+)
+from etl.config import config
+from etl.jobs.load.load_fact_bookings import (
+    CREATE_QUERY,
+    FACT_ENUMS,
+    FACT_TABLE,
+    STANDARD_FACT_COLUMNS,
+    booking_id_offset,
+    record_booking_span,
+)
+from etl.jobs.transform.quarantine import REASON_COLUMN
+from etl.jobs.transform.transform_dim_country import COUNTRY_CODE_MAP
+from etl.jobs.transform.rules import MONTH_NAMES
+from etl.jobs.transform.transform_fact_bookings import FACT_COLUMNS, compact_ranges
+
+# Alias of the staging table in the generated statements
+STAGING_ALIAS = "s"
+
+# Alias of the fact rows built from staging, before the compact conversion
+NEW_ROWS_ALIAS = "new_rows"
+
+# Fact rows the compact layout cannot hold, kept with their standard-layout
+# values and reasons, like fact_rejects.csv on the pandas engine
+FACT_REJECTS_TABLE = "fact_rejects"
+
+CREATE_REJECTS_QUERY = (
+    f"CREATE TABLE IF NOT EXISTS {FACT_REJECTS_TABLE} (\n"
+    + ",\n".join(
+        f"    {name} {sql_type}" for name, sql_type in STANDARD_FACT_COLUMNS.items()
+    )
+    + f",\n    {REASON_COLUMN} TEXT NOT NULL\n);\n"
+)
+
+
+def _literal(value: str) -> str:
+    """
+    Quotes a string as a SQL literal.
+    """
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _country_names() -> str:
+    """
+    Returns COUNTRY_CODE_MAP as an inline VALUES table (country_code, country).
+    """
+    rows = ",\n            ".join(
+        f"({_literal(code)}, {_literal(name)})"
+        for code, name in COUNTRY_CODE_MAP.items()
+    )
+    return f"(VALUES\n            {rows}\n        ) AS names (country_code, country)"
+
+
+def _attribute_sql(table: str) -> tuple:
+    """
+    Returns the joins and select expressions that derive the descriptive
+    attributes of a dimension, mirroring the pandas extract_unique_* functions.
+
+    Returns:
+    tuple[str, list]: Join clause and one expression per attribute.
+    """
+    if table == "dim_country":
+        source = f"{STAGING_ALIAS}.{DIMENSIONS[table]['source']}"
+        join = f"LEFT JOIN {_country_names()} ON names.country_code = {source}"
+        expression = f"COALESCE(names.country, 'Unknown (' || {source} || ')')"
+        return join, [expression]
+    return "", []
+
+
+def dimension_members_sql(table: str) -> str:
+    """
+    Generates the SELECT of the distinct members of a dimension in staging,
+    in order of first appearance, so the SERIAL keys match the ids the pandas
+    path assigns with drop_duplicates().
+
+    Parameters:
+    table (str): Dimension name, a key of DIMENSIONS.
+
+    Returns:
+    str: The SELECT statement (natural key, then attributes).
+    """
+    spec = DIMENSIONS[table]
+    source = f"{STAGING_ALIAS}.{spec['source']}"
+    join, attributes = _attribute_sql(table)
+    group_by = [source] + (["names.country"] if attributes else [])
+    return f"""
+        SELECT {', '.join([source] + attributes)}
+        FROM {STAGING_TABLE} {STAGING_ALIAS}
+        {join}
+        WHERE {source} IS NOT NULL
+        GROUP BY {', '.join(group_by)}
+        ORDER BY MIN({STAGING_ALIAS}.ctid)
+    """
+
+
+def dimension_insert_sql(table: str) -> str:
+    """
+    Generates the set-based INSERT that fills a dimension from staging.
+
+    Parameters:
+    table (str): Dimension name, a key of DIMENSIONS.
+
+    Returns:
+    str: The INSERT ... SELECT statement.
+    """
+    spec = DIMENSIONS[table]
+    columns = [spec["natural_key"]] + spec["attributes"]
+    return f"""
+        INSERT INTO {table} ({', '.join(columns)})
+        {dimension_members_sql(table)}
+        ON CONFLICT ({spec['natural_key']}) DO NOTHING;
+    """
+
+
+def _fact_value_sql(column: str) -> str:
+    """
+    Returns the expression reading a built fact column, converted to the
+    compact layout when it is enabled.
+    """
+    source = f"{NEW_ROWS_ALIAS}.{column}"
+    if not config.COMPACT_FACT:
+        return source
+    if column == "arrival_month":
+        names = ", ".join(_literal(name) for name in MONTH_NAMES)
+        return f"array_position(ARRAY[{names}], {source})"
+    if column in FACT_ENUMS:
+        return f"{source}::{FACT_ENUMS[column][0]}"
+    return source
+
+
+def compact_reasons_sql() -> str:
+    """
+    Returns the expression listing, per built fact row, the reasons the
+    compact layout cannot hold it ('' if it can), in the order and with the
+    names of transform_fact_bookings.compact_rejects().
+    """
+    checks = [
+        f"CASE WHEN {_fact_value_sql('arrival_month')} IS NULL "
+        "THEN 'arrival_month_unknown' END"
+    ] + [
+        f"CASE WHEN {NEW_ROWS_ALIAS}.{column} NOT BETWEEN {low} AND {high} "
+        f"THEN '{column}_out_of_range' END"
+        for column, (low, high) in compact_ranges().items()
+    ]
+    return f"CONCAT_WS(';', {', '.join(checks)})"
+
+
+def _new_rows_sql(offset: int) -> str:
+    """
+    Generates the SELECT of the fact rows built by joining staging with the
+    dimensions on their natural keys, with the standard-layout values.
+    """
+    foreign_keys = {
+        spec["fact_key"]: f"{table}.{spec['key']}" for table, spec in DIMENSIONS.items()
+    }
+    expressions = [
+        f"ROW_NUMBER() OVER (ORDER BY {STAGING_ALIAS}.ctid) + {int(offset)} "
+        "AS booking_id"
+    ] + [
+        f"{foreign_keys.get(column, f'{STAGING_ALIAS}.{column}')} AS {column}"
+        for column in FACT_COLUMNS
+    ]
+    joins = "\n            ".join(
+        f"LEFT JOIN {table} ON {table}.{spec['natural_key']} = "
+        f"{STAGING_ALIAS}.{spec['source']}"
+        + (f" AND {table}.is_current" if spec["scd2"] else "")
+        for table, spec in DIMENSIONS.items()
+    )
+    select = ",\n                ".join(expressions)
+    return f"""
+            SELECT
+                {select}
+            FROM {STAGING_TABLE} {STAGING_ALIAS}
+            {joins}
+    """
+
+
+def fact_insert_sql(on_conflict: bool = True, offset: int = 0) -> str:
+    """
+    Generates the INSERT that builds the fact table by joining staging with
+    the dimensions on their natural keys. With the compact layout, rows it
+    cannot hold are left out (see fact_rejects_sql()).
+
+    booking_id is the staging row position, like the row index used by
+    transform_fact_bookings.build_fact(), plus the input's offset (see
+    load_fact_bookings.booking_id_offset()). Rows whose booking_id is
+    already loaded are skipped with an anti-join, so a rerun of the same
+    input inserts nothing even while the primary key is dropped for a bulk
+    load.
+
+    Parameters:
+    on_conflict (bool): Also add ON CONFLICT DO NOTHING, for rows a
+        concurrent load commits first. Must be off while the primary key is
+        deferred, since there is no index to arbitrate.
+    offset (int): booking_id offset of the input.
+
+    Returns:
+    str: The INSERT ... SELECT statement.
+    """
+    values = [f"{NEW_ROWS_ALIAS}.booking_id"] + [
+        _fact_value_sql(column) for column in FACT_COLUMNS
+    ]
+    compact = f"AND {compact_reasons_sql()} = ''" if config.COMPACT_FACT else ""
+    conflict = "ON CONFLICT (booking_id) DO NOTHING" if on_conflict else ""
+    return f"""
+        INSERT INTO {FACT_TABLE} (booking_id, {', '.join(FACT_COLUMNS)})
+        SELECT {', '.join(values)}
+        FROM ({_new_rows_sql(offset)}) {NEW_ROWS_ALIAS}
+        WHERE NOT EXISTS (
+            SELECT 1 FROM {FACT_TABLE} f
+            WHERE f.booking_id = {NEW_ROWS_ALIAS}.booking_id
+        )
+        {compact}
+        {conflict};
+    """
+
+
+def fact_rejects_sql(offset: int = 0) -> str:
+    """
+    Generates the INSERT that quarantines the fact rows the compact layout
+    cannot hold into FACT_REJECTS_TABLE, with their reasons, as
+    transform_fact_bookings.compact_fact() does on the pandas engine. A
+    rerun of the same input adds nothing.
+
+    Parameters:
+    offset (int): booking_id offset of the input.
+
+    Returns:
+    str: The INSERT ... SELECT statement.
+    """
+    return f"""
+        INSERT INTO {FACT_REJECTS_TABLE}
+            (booking_id, {', '.join(FACT_COLUMNS)}, {REASON_COLUMN})
+        SELECT * FROM (
+            SELECT {NEW_ROWS_ALIAS}.*, {compact_reasons_sql()} AS {REASON_COLUMN}
+            FROM ({_new_rows_sql(offset)}) {NEW_ROWS_ALIAS}
+        ) rejected
+        WHERE {REASON_COLUMN} <> ''
+        ON CONFLICT (booking_id) DO NOTHING;
+    """
+
+
+def run_sql_engine(cursor, fingerprint: str, bulk: bool = False) -> dict:
+    """
+    Builds the dimensions and the fact table inside PostgreSQL from the rows
+    already copied into staging.
+
+    Parameters:
+    cursor: A psycopg2 cursor object.
+    fingerprint (str): Identity of the input file in staging.
+    bulk (bool): Defer the fact primary key during the insert.
+
+    Returns:
+    dict: Table name -> number of rows inserted.
+    """
+    inserted = {}
+    for table, spec in DIMENSIONS.items():
+        create_dimension_table(cursor, table)
+        if spec["scd2"]:
+            # Members are few: they are hashed in pandas, like on the pandas
+            # path, so both engines keep comparable version hashes.
+            cursor.execute(dimension_members_sql(table))
+            members = pd.DataFrame(
+                cursor.fetchall(), columns=[spec["natural_key"]] + spec["attributes"]
+            )
+            inserted[table] = merge_scd2(cursor, table, members)
+            continue
+        cursor.execute(dimension_insert_sql(table))
+        inserted[table] = cursor.rowcount
+        logging.info(f"{cursor.rowcount} new rows inserted into {table}")
+
+    cursor.execute(CREATE_QUERY)
+    offset = booking_id_offset(cursor, fingerprint)
+    cursor.execute(f"SELECT COUNT(*) FROM {STAGING_TABLE}")
+    record_booking_span(cursor, fingerprint, cursor.fetchone()[0])
+    if config.COMPACT_FACT:
+        cursor.execute(CREATE_REJECTS_QUERY)
+        cursor.execute(fact_rejects_sql(offset))
+        inserted[FACT_REJECTS_TABLE] = cursor.rowcount
+        if cursor.rowcount:
+            logging.warning(
+                f"Quarantined {cursor.rowcount} fact rows the compact layout "
+                f"cannot hold into {FACT_REJECTS_TABLE}."
+            )
+    with bulk_load(cursor, [FACT_TABLE]) if bulk else nullcontext():
+        cursor.execute(fact_insert_sql(on_conflict=not bulk, offset=offset))
+        inserted[FACT_TABLE] = cursor.rowcount
+        logging.info(f"{cursor.rowcount} rows inserted into {FACT_TABLE}")
+    return inserted
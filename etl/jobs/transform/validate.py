@@ -1,207 +1,163 @@
-import pandas as pd
+import argparse
 import logging
-import os
+from etl.config.config import VALIDATION_THRESHOLD
+from etl.jobs.utils.logger import configure_logging
 
-# Ensure that the "logs" directory exists
-os.makedirs("logs", exist_ok=True)
+# The rule, sampling and reader helpers import pandas; they are imported in
+# the functions that use them so that `etl validate --help` and argument
+# errors answer without loading it.
+
+PROCESSED_PATH = "etl/data/processed/processed_data.csv"
 
 # Logging configuration
-logging.basicConfig(
-    filename="logs/validate.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    filemode="w",  # Specify write mode to overwrite the file
-)
+configure_logging("validate.log")
 
 
-def validate_columns(df, required_columns):
+def _rules_for(profile):
     """
-    Validates if the required columns are present in the DataFrame.
-
-    Parameters:
-    df (pd.DataFrame): The DataFrame to be validated.
-    required_columns (list): List of required columns.
-
-    Returns:
-    bool: True if all required columns are present, False otherwise.
+    Returns the rules to evaluate. When an up-to-date profile is available,
+    its duplicate count replaces the (expensive) row uniqueness rule.
     """
-    missing_columns = [col for col in required_columns if col not in df.columns]
+    from etl.jobs.transform.rules import PROCESSED_RULES
 
-    if missing_columns:
-        logging.error(f"Missing columns: {missing_columns}")
-        return False
-    logging.info("All required columns are present.")
-    return True
+    if profile is None:
+        return PROCESSED_RULES
+    return [rule for rule in PROCESSED_RULES if rule["check"] != "unique"]
 
 
-def validate_data_types(df, column_types):
+def _apply_profile(report, profile):
     """
-    Validates the data types of columns in the DataFrame.
+    Adds the duplicate count of an up-to-date profile to a report.
+    """
+    if profile is not None and profile["duplicate_rows"] > 0:
+        report["violations"]["unique_rows"] = profile["duplicate_rows"]
+        report["passed"] = False
+    return report
 
-    Parameters:
-    df (pd.DataFrame): The DataFrame to be validated.
-    column_types (dict): A dictionary where the key is the column name and the value is the expected type.
 
-    Returns:
-    bool: True if all data types are correct, False otherwise.
-    """
-    for column, expected_type in column_types.items():
-        if column in df.columns and not pd.api.types.is_dtype_equal(
-            df[column].dtype, expected_type
-        ):
-            logging.error(
-                f"Incorrect data type for column '{column}'. Expected {expected_type}, but found {df[column].dtype}."
-            )
-            return False
-    logging.info("All data types are correct.")
-    return True
-
-
-def validate_missing_values(df):
+def run_validations(df, profile=None):
     """
-    Checks if there are missing values in the DataFrame.
+    Runs all validation rules on the DataFrame in a single vectorized pass and
+    logs every failure, instead of stopping at the first one.
 
     Parameters:
     df (pd.DataFrame): The DataFrame to be validated.
+    profile (dict, optional): Up-to-date data profile of the same data.
 
     Returns:
-    bool: True if no missing values are found, False otherwise.
+    bool: True if all validations pass, False otherwise.
     """
-    missing_values = df.isnull().sum()
+    from etl.jobs.transform.rules import log_report, validate_frame
 
-    if missing_values.any():
-        logging.warning(f"Missing values found: {missing_values[missing_values > 0]}")
-        return False
-    logging.info("No missing values found.")
-    return True
+    report = _apply_profile(validate_frame(df, _rules_for(profile)), profile)
+    log_report(report)
+    return report["passed"]
 
 
-def validate_duplicates(df):
+def validate_file(file_path, profile=None):
     """
-    Checks if there are duplicate rows in the DataFrame.
+    Validates a CSV file chunk by chunk, so it never has to fit in memory.
 
     Parameters:
-    df (pd.DataFrame): The DataFrame to be validated.
+    file_path (str): Path to the CSV file.
+    profile (dict, optional): Up-to-date data profile of the same file.
 
     Returns:
-    bool: True if no duplicates are found, False otherwise.
+    dict: The validation report (see rules.validate_frame).
     """
-    duplicates = df.duplicated().sum()
+    from etl.jobs.transform.rules import log_report, validate_chunks
+    from etl.jobs.utils.reader import read_csv_chunks
 
-    if duplicates > 0:
-        logging.warning(f"Duplicate rows found: {duplicates} records.")
-        return False
-    logging.info("No duplicate rows found.")
-    return True
+    report = validate_chunks(read_csv_chunks(file_path), _rules_for(profile))
+    report = _apply_profile(report, profile)
+    log_report(report)
+    return report
 
 
-def run_validations(df):
+def validate_sample(file_path, threshold=VALIDATION_THRESHOLD):
     """
-    Runs all necessary validations on the DataFrame.
+    Fast pre-flight check: estimates the violation rate of every rule from a
+    stratified sample (by hotel and arrival year) drawn while the file streams
+    past, and escalates to a full validation only when an estimate's upper
+    confidence bound crosses the threshold.
 
     Parameters:
-    df (pd.DataFrame): The DataFrame to be validated.
+    file_path (str): Path to the CSV file.
+    threshold (float): Maximum acceptable violation rate.
 
     Returns:
-    bool: True if all validations pass, False otherwise.
+    bool: True if the data passes, False otherwise.
     """
-    required_columns = [
-        "hotel",
-        "is_canceled",
-        "lead_time",
-        "arrival_year",
-        "arrival_month",
-        "arrival_week",
-        "arrival_day",
-        "weekend_nights",
-        "week_nights",
-        "adults",
-        "children",
-        "babies",
-        "meal_plan",
-        "country",
-        "market_segment",
-        "distribution_channel",
-        "repeated_guest",
-        "prev_cancellations",
-        "prev_not_canceled",
-        "reserved_room",
-        "assigned_room",
-        "booking_changes",
-        "deposit_type",
-        "agent_id",
-        "company_id",
-        "waiting_days",
-        "customer_type",
-        "adr",
-        "parking_spaces",
-        "special_requests",
-        "reservation_status",
-        "reservation_status_date",
-    ]
-
-    column_types = {
-        "hotel": "category",
-        "is_canceled": "int64",
-        "lead_time": "int64",
-        "arrival_year": "int64",
-        "arrival_month": "category",
-        "arrival_week": "int64",
-        "arrival_day": "int64",
-        "weekend_nights": "int64",
-        "week_nights": "int64",
-        "adults": "int64",
-        "children": "float64",
-        "babies": "int64",
-        "meal_plan": "category",
-        "country": "category",
-        "market_segment": "category",
-        "distribution_channel": "category",
-        "repeated_guest": "int64",
-        "prev_cancellations": "int64",
-        "prev_not_canceled": "int64",
-        "reserved_room": "category",
-        "assigned_room": "category",
-        "booking_changes": "int64",
-        "deposit_type": "category",
-        "agent_id": "float64",
-        "company_id": "float64",
-        "waiting_days": "int64",
-        "customer_type": "category",
-        "adr": "float64",
-        "parking_spaces": "int64",
-        "special_requests": "int64",
-        "reservation_status": "category",
-        "reservation_status_date": "datetime64[ns]",
-    }
-
-    # Validate columns
-    if not validate_columns(df, required_columns):
-        return False
-
-    # # Validate data types
-    # if not validate_data_types(df, column_types):
-    #     return False
-
-    # Validate missing values
-    if not validate_missing_values(df):
-        return False
+    from etl.jobs.extract.profile import load_profile
+    from etl.jobs.transform.sampling import (
+        estimate_violation_rates,
+        needs_full_validation,
+        stratified_sample,
+    )
+    from etl.jobs.utils.reader import read_csv_chunks
+
+    sample, population = stratified_sample(read_csv_chunks(file_path))
+    estimates = estimate_violation_rates(sample, population)
+    logging.info(
+        f"Sampled {len(sample)} of {int(population.sum())} rows "
+        f"across {len(population)} strata."
+    )
+
+    flagged = needs_full_validation(estimates, threshold)
+    if not flagged:
+        logging.info(f"All estimated violation rates are below {threshold:.4%}.")
+        return True
+
+    logging.warning(f"Escalating to full validation for rules: {flagged}")
+    return validate_file(file_path, load_profile(file_path))["passed"]
+
+
+def main(df=None, sample=False, threshold=VALIDATION_THRESHOLD):
+    """
+    Validates the processed data. An in-memory DataFrame can be passed to
+    skip reading the processed CSV back from disk.
 
-    # Validate duplicates
-    if not validate_duplicates(df):
-        return False
+    Parameters:
+    df (pd.DataFrame, optional): Processed data already in memory.
+    sample (bool): Run the sampling-based pre-flight check instead.
+    threshold (float): Violation rate that escalates a sampled check.
 
-    logging.info("All validations were successful!")
-    return True
+    Returns:
+    bool: True if all validations pass, False otherwise.
+    """
+    try:
+        if df is not None:
+            passed = run_validations(df)
+        elif sample:
+            passed = validate_sample(PROCESSED_PATH, threshold)
+        else:
+            from etl.jobs.extract.profile import load_profile
 
+            profile = load_profile(PROCESSED_PATH)
+            passed = validate_file(PROCESSED_PATH, profile)["passed"]
 
-# Example usage
-if __name__ == "__main__":
-    try:
-        df = pd.read_csv("etl/data/processed/processed_data.csv")
-        if run_validations(df):
+        if passed:
             logging.info("Validation completed successfully!")
         else:
             logging.error("Data validation failed.")
+        return passed
     except Exception as e:
         logging.error(f"Error loading data: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate the processed data.")
+    parser.add_argument(
+        "--sample",
+        action="store_true",
+        help="estimate violation rates from a stratified sample first",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=VALIDATION_THRESHOLD,
+        help="violation rate that escalates --sample to a full validation",
+    )
+    args = parser.parse_args()
+    main(sample=args.sample, threshold=args.threshold)
@@ -0,0 +1,32 @@
+import logging
+import os
+from etl.config import config
+
+
+def read_data_version(path: str = config.DATA_VERSION_FILE) -> int:
+    """
+    Returns the current data version, 0 before the first load.
+    """
+    try:
+        with open(path) as f:
+            return int(f.read().strip() or 0)
+    except FileNotFoundError:
+        return 0
+
+
+def bump_data_version(path: str = config.DATA_VERSION_FILE) -> int:
+    """
+    Increments the data version. Load stages call it after committing, which
+    invalidates every cached KPI result computed from older data.
+
+    Returns:
+    int: The new data version.
+    """
+    version = read_data_version(path) + 1
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(str(version))
+    os.replace(tmp_path, path)
+    logging.info(f"Data version bumped to {version}")
+    return version
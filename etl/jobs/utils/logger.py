@@ -1,11 +1,197 @@
+import atexit
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import threading
+import time
+
+# Records allowed per call site in each interval before the rest are
+# counted instead of logged
+RATE_LIMIT_BURST = 10
+RATE_LIMIT_INTERVAL = 60.0
+
+# Attributes every LogRecord has; anything else was passed with extra=
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listeners = []
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats records as one JSON object per line: time, level, logger,
+    message, source location, the fields passed with extra= and, for
+    rate-limited call sites, the number of records suppressed.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "line": record.lineno,
+        }
+        entry.update(
+            (key, value)
+            for key, value in vars(record).items()
+            if key not in _RECORD_ATTRIBUTES
+        )
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets through at most `burst` records per call site (file and line) and
+    level in each interval. Records over the limit are dropped before they
+    are formatted or queued, and counted; the count is attached as
+    'suppressed' to the next record let through from the same call site, or
+    logged on flush(). A per-row warning in a loop therefore costs a dict
+    lookup, not a formatted line.
+    """
+
+    def __init__(
+        self, burst: int = RATE_LIMIT_BURST, interval: float = RATE_LIMIT_INTERVAL
+    ):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.sites = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (record.pathname, record.lineno, record.levelno)
+        now = time.monotonic()
+        with self._lock:
+            site = self.sites.get(key)
+            if site is None or now - site["start"] >= self.interval:
+                suppressed = site["suppressed"] if site else 0
+                site = self.sites[key] = {"start": now, "count": 0, "suppressed": 0}
+                if suppressed:
+                    record.suppressed = suppressed
+            site["count"] += 1
+            if site["count"] > self.burst:
+                site["suppressed"] += 1
+                return False
+        return True
+
+    def flush(self, handler: logging.Handler):
+        """
+        Emits one summary record per call site with suppressed records.
+        """
+        with self._lock:
+            pending = [(key, s["suppressed"]) for key, s in self.sites.items()]
+            self.sites.clear()
+        for (pathname, lineno, levelno), suppressed in pending:
+            if not suppressed:
+                continue
+            record = logging.LogRecord(
+                "etl.ratelimit",
+                levelno,
+                pathname,
+                lineno,
+                f"{suppressed} similar records suppressed",
+                None,
+                None,
+            )
+            record.suppressed = suppressed
+            handler.handle(record)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler whose rate limiter is flushed before the listener stops.
+    """
+
+    def __init__(self, log_queue, rate_limit: RateLimitFilter):
+        super().__init__(log_queue)
+        self.rate_limit = rate_limit
+        self.addFilter(rate_limit)
+
+    def close(self):
+        self.rate_limit.flush(self)
+        super().close()
+
+
+def _queue_handler(*handlers: logging.Handler) -> logging.Handler:
+    """
+    Returns a QueueHandler feeding the given handlers from a background
+    QueueListener thread, so file and console I/O never run on the caller's
+    thread. The listener is stopped, and the queue drained, at exit.
+    """
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    listener.start()
+    handler = _QueueHandler(log_queue, RateLimitFilter())
+    _listeners.append((handler, listener))
+    return handler
+
+
+@atexit.register
+def stop_listeners():
+    """
+    Flushes the rate limiters and stops the listener threads, writing out
+    every queued record.
+    """
+    while _listeners:
+        _stop(*_listeners.pop())
+
+
+def stop_listener(handler: logging.Handler):
+    """
+    Stops the listener thread behind one queue handler, writing out its
+    queued records; the other loggers keep logging.
+    """
+    for entry in [entry for entry in _listeners if entry[0] is handler]:
+        _listeners.remove(entry)
+        _stop(*entry)
+
+
+def _stop(handler: logging.Handler, listener: logging.handlers.QueueListener):
+    handler.close()
+    listener.stop()
+    for target in listener.handlers:
+        target.close()
+
+
+def _file_handler(log_file: str) -> logging.Handler:
+    os.makedirs("logs", exist_ok=True)
+    handler = logging.FileHandler(f"logs/{log_file}", mode="w")
+    handler.setFormatter(JsonFormatter())
+    return handler
+
+
+def configure_logging(log_file: str, level: int = logging.INFO):
+    """
+    Sends the root logger to logs/<log_file> through the non-blocking queue
+    handler, as JSON lines. Like logging.basicConfig(), it does nothing if
+    the root logger is already configured.
+
+    Parameters:
+    log_file (str): File name (relative to logs/), overwritten on each run.
+    level (int): Root logger level.
+    """
+    root = logging.getLogger()
+    if root.handlers:
+        return
+    root.setLevel(level)
+    root.addHandler(_queue_handler(_file_handler(log_file)))
 
 
 def setup_logger(name: str, log_file: str) -> logging.Logger:
     """
     Sets up a logger that outputs to both console and a log file.
 
+    Records are queued by the caller and written by a background listener
+    thread: JSON lines to the file, plain text to the console. Repeated
+    records from one call site are rate-limited (see RateLimitFilter).
+
     Parameters:
     - name (str): Name of the logger.
     - log_file (str): File path (relative to /logs/) where logs will be saved.
@@ -13,22 +199,15 @@ def setup_logger(name: str, log_file: str) -> logging.Logger:
     Returns:
     - logging.Logger: Configured logger instance.
     """
-    os.makedirs("logs", exist_ok=True)
-
     logger = logging.getLogger(name)
     logger.setLevel(logging.INFO)
 
     if not logger.handlers:
-        # File handler
-        file_handler = logging.FileHandler(f"logs/{log_file}", mode="w")
-        file_formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-        file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
-
         # Console handler
         console_handler = logging.StreamHandler()
         console_formatter = logging.Formatter("%(levelname)s - %(message)s")
         console_handler.setFormatter(console_formatter)
-        logger.addHandler(console_handler)
+
+        logger.addHandler(_queue_handler(_file_handler(log_file), console_handler))
 
     return logger
@@ -0,0 +1,33 @@
+import json
+import os
+from etl.config import config
+
+
+def read_metrics(path: str = config.RUN_METRICS) -> dict:
+    """
+    Returns the run metrics collected so far, or an empty dict.
+    """
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def record_metrics(section: str, values: dict, path: str = config.RUN_METRICS):
+    """
+    Merges values into one section of the run metrics JSON file. The file is
+    replaced atomically so concurrent readers never see a partial write.
+
+    Parameters:
+    section (str): Section name, e.g. "kpi_cache".
+    values (dict): Metric name -> JSON-serializable value.
+    path (str): Metrics file path.
+    """
+    metrics = read_metrics(path)
+    metrics.setdefault(section, {}).update(values)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(metrics, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
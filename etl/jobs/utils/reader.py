@@ -0,0 +1,125 @@
+import os
+import logging
+import pandas as pd
+from etl.config import config
+from etl.jobs.utils.metrics import record_metrics
+from etl.jobs.utils.spill import external_drop_duplicates, memory_budget
+
+# Rows read to estimate the in-memory size of a row
+SAMPLE_ROWS = 1000
+
+# Copies of a chunk alive at once while it is transformed (renamed,
+# converted, pseudonymized and hashed), relative to the chunk as read
+WORKING_SET_FACTOR = 4
+
+# Smallest chunk worth processing; below it per-chunk overhead dominates
+MIN_CHUNK_ROWS = 1000
+
+
+def estimate_row_bytes(file_path: str, sample_rows: int = SAMPLE_ROWS, **kwargs):
+    """
+    Estimates the in-memory size of one row of a CSV file from a sample
+    read with the same pd.read_csv options (deep memory usage, so strings
+    are counted).
+
+    Parameters:
+    file_path (str): Path to the CSV file.
+    sample_rows (int): Rows to sample from the top of the file.
+    **kwargs: Extra arguments forwarded to pd.read_csv.
+
+    Returns:
+    float: Bytes per row (0 for an empty file).
+    """
+    sample = pd.read_csv(file_path, nrows=sample_rows, **kwargs)
+    if sample.empty:
+        return 0.0
+    return sample.memory_usage(index=True, deep=True).sum() / len(sample)
+
+
+def plan_chunks(file_path: str, budget: int = None, workers: int = None, **kwargs):
+    """
+    Chooses the chunk size and the number of worker processes so that
+    every worker can hold its chunk, with the transform's working copies,
+    within the memory budget. Workers are dropped before chunks shrink
+    below MIN_CHUNK_ROWS.
+
+    Parameters:
+    file_path (str): Path to the CSV file.
+    budget (int): Memory budget in bytes; defaults to ETL_MEMORY_BUDGET.
+    workers (int): Workers wanted; defaults to ETL_SPILL_WORKERS, or the
+        CPU count when it is unset.
+    **kwargs: Extra arguments forwarded to pd.read_csv.
+
+    Returns:
+    dict: 'chunk_size', 'workers' and the estimated 'row_bytes'. A budgeted
+        plan is also logged and recorded in the run metrics.
+    """
+    budget = budget or memory_budget()
+    workers = workers or config.SPILL_WORKERS or os.cpu_count() or 1
+    row_bytes = estimate_row_bytes(file_path, **kwargs)
+    if not budget or not row_bytes:
+        return {"chunk_size": config.CHUNK_SIZE, "workers": 1, "row_bytes": row_bytes}
+
+    rows_in_budget = int(budget // (row_bytes * WORKING_SET_FACTOR))
+    workers = max(1, min(workers, rows_in_budget // MIN_CHUNK_ROWS))
+    chunk_size = max(MIN_CHUNK_ROWS, rows_in_budget // workers)
+    if chunk_size * workers > rows_in_budget:
+        logging.warning(
+            f"A memory budget of {budget} bytes cannot hold {MIN_CHUNK_ROWS} rows; "
+            f"using the minimum chunk size."
+        )
+    plan = {"chunk_size": chunk_size, "workers": workers, "row_bytes": row_bytes}
+    logging.info(
+        f"Memory budget {budget / 2**20:.1f} MB: ~{row_bytes:.0f} bytes/row, "
+        f"chunks of {chunk_size} rows, {workers} workers"
+    )
+    record_metrics("chunk_plan", {"budget_bytes": budget, **plan})
+    return plan
+
+
+def read_csv_chunks(file_path: str, chunksize: int = None, **kwargs):
+    """
+    Streams a CSV file as a sequence of DataFrame chunks.
+
+    Parameters:
+    file_path (str): Path to the CSV file.
+    chunksize (int): Rows per chunk. Defaults to the size planned from
+        ETL_MEMORY_BUDGET (plan_chunks()) when it is set, else
+        config.CHUNK_SIZE.
+    **kwargs: Extra arguments forwarded to pd.read_csv.
+
+    Returns:
+    Iterator[pd.DataFrame]: The chunks of the file, in order.
+
+    Raises:
+    FileNotFoundError: If the file does not exist.
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File not found at path: {file_path}")
+
+    if not chunksize and memory_budget():
+        chunksize = plan_chunks(file_path, **kwargs)["chunk_size"]
+    chunksize = chunksize or config.CHUNK_SIZE
+    logging.info(f"Streaming {file_path} in chunks of {chunksize} rows")
+    with pd.read_csv(file_path, chunksize=chunksize, **kwargs) as reader:
+        yield from reader
+
+
+def read_distinct(file_path: str, columns: list) -> pd.DataFrame:
+    """
+    Reads the distinct rows of some columns of a CSV file, in order of first
+    appearance. When ETL_MEMORY_BUDGET is set the file is streamed and
+    deduplicated through the spill layer, so it is never held in memory.
+
+    Parameters:
+    file_path (str): Path to the CSV file.
+    columns (list): Columns to read.
+
+    Returns:
+    pd.DataFrame: The distinct rows.
+    """
+    if not memory_budget():
+        return pd.read_csv(file_path, usecols=columns).drop_duplicates()
+    chunks = read_csv_chunks(file_path, usecols=columns)
+    distinct = list(external_drop_duplicates(chunks))
+    return pd.concat(distinct) if distinct else pd.DataFrame(columns=columns)
@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+
+# Number of index bits used by default; 2**12 registers give ~1.6% standard error
+DEFAULT_PRECISION = 12
+
+
+def hash_values(values) -> np.ndarray:
+    """
+    Hashes a Series (or DataFrame, row-wise) into 64-bit unsigned integers.
+
+    Equal values always produce equal hashes, regardless of whether the column
+    is stored as object, string or category dtype.
+
+    Parameters:
+    values (pd.Series | pd.DataFrame): Data to hash.
+
+    Returns:
+    np.ndarray: A uint64 array with one hash per element (or row).
+    """
+    return pd.util.hash_pandas_object(values, index=False).to_numpy(dtype=np.uint64)
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """
+    Vectorized bit length of uint64 values.
+
+    The value is split in two 32-bit halves so the float conversion done by
+    np.frexp stays exact.
+    """
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    return np.where(high > 0, np.frexp(high)[1] + 32, np.frexp(low)[1])
+
+
+class SeenHashes:
+    """
+    Exact set of 64-bit hashes seen so far, used to find repeated rows across
+    chunks.
+
+    Hashes are kept in sorted levels whose sizes roughly double (like a
+    log-structured merge tree), so lookups are binary searches and inserting
+    a chunk never re-sorts everything seen before.
+    """
+
+    def __init__(self):
+        self.levels = []
+
+    def __len__(self):
+        return sum(len(level) for level in self.levels)
+
+    def contains(self, hashes: np.ndarray) -> np.ndarray:
+        """
+        Returns a boolean mask of the hashes that were already added.
+        """
+        found = np.zeros(len(hashes), dtype=bool)
+        for level in self.levels:
+            position = np.searchsorted(level, hashes)
+            position[position == len(level)] = 0
+            found |= level[position] == hashes
+        return found
+
+    def add(self, hashes: np.ndarray):
+        """
+        Adds hashes to the set.
+        """
+        level = np.unique(hashes)
+        if len(level) == 0:
+            return
+        while self.levels and len(self.levels[-1]) <= 2 * len(level):
+            level = np.union1d(self.levels.pop(), level)
+        self.levels.append(level)
+
+    def mark_repeated(self, hashes: np.ndarray) -> np.ndarray:
+        """
+        Returns a mask of hashes already seen (in earlier calls or earlier in
+        this array) and adds the new ones, mirroring duplicated(keep="first").
+        """
+        repeated = pd.Series(hashes).duplicated().to_numpy()
+        if self.levels:
+            repeated |= self.contains(hashes)
+        self.add(hashes[~repeated])
+        return repeated
+
+
+class HyperLogLog:
+    """
+    Mergeable approximate distinct counter (HyperLogLog).
+
+    Memory is fixed at 2**precision one-byte registers, whatever the number of
+    values added, so it can be fed chunk by chunk.
+    """
+
+    def __init__(self, precision: int = DEFAULT_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_hashes(self, hashes: np.ndarray):
+        """
+        Adds pre-computed 64-bit hashes to the sketch.
+
+        Parameters:
+        hashes (np.ndarray): uint64 hashes, e.g. from hash_values().
+        """
+        if len(hashes) == 0:
+            return
+        p = np.uint64(self.precision)
+        index = (hashes >> (np.uint64(64) - p)).astype(np.intp)
+        remainder = hashes & np.uint64((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - _bit_length(remainder) + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def add(self, values):
+        """
+        Hashes and adds a Series of values, ignoring nulls.
+        """
+        self.add_hashes(hash_values(values.dropna()))
+
+    def merge(self, other: "HyperLogLog"):
+        """
+        Merges another sketch with the same precision into this one.
+        """
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        """
+        Returns the estimated number of distinct values added so far.
+        """
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int32)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Small range correction (linear counting)
+            raw = m * np.log(m / zeros)
+        return int(round(raw))
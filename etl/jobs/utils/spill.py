@@ -0,0 +1,396 @@
+import logging
+import os
+import pickle
+import re
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from etl.config import config
+
+# Column carrying the input position of each row through the shards, so the
+# results can be merged back in input order
+ROW_COLUMN = "_spill_row"
+
+# In-memory size of a shard relative to its pickle on disk (object columns
+# are much larger in memory than serialized)
+EXPANSION = 3
+
+# Recursion limit when re-partitioning shards that exceed the budget; a
+# shard made of one huge key cannot be split by hashing
+MAX_DEPTH = 3
+
+_UNITS = {"": 1, "B": 1, "KB": 2**10, "MB": 2**20, "GB": 2**30, "TB": 2**40}
+
+
+def parse_size(text) -> int:
+    """
+    Parses a memory size such as "2GB", "512 MB" or "1000000" into bytes.
+
+    Parameters:
+    text (str | int): The size.
+
+    Returns:
+    int: Number of bytes.
+
+    Raises:
+    ValueError: If the size cannot be parsed.
+    """
+    if isinstance(text, (int, np.integer)):
+        return int(text)
+    match = re.fullmatch(r"\s*([\d.]+)\s*([KMGT]?B?)\s*", str(text).upper())
+    if not match:
+        raise ValueError(f"Invalid memory size: {text!r}")
+    return int(float(match.group(1)) * _UNITS[match.group(2)])
+
+
+def memory_budget() -> int:
+    """
+    Returns the configured memory budget (ETL_MEMORY_BUDGET) in bytes, or
+    None when the pipeline runs fully in memory.
+    """
+    return parse_size(config.MEMORY_BUDGET) if config.MEMORY_BUDGET else None
+
+
+def _hash_key(level: int) -> str:
+    """
+    Returns the 16-character hash key of a partitioning level, so a shard
+    re-partitioned at the next level is split by an independent hash.
+    """
+    return f"etl-spill-{level:06d}"
+
+
+def _partition_of(frame: pd.DataFrame, keys, partitions: int, level: int):
+    hashes = pd.util.hash_pandas_object(
+        frame[keys], index=False, hash_key=_hash_key(level)
+    ).to_numpy()
+    return hashes % np.uint64(partitions)
+
+
+def hash_partition(
+    chunks, keys, partitions: int, directory: str, level: int = 0, prefix="p"
+) -> list:
+    """
+    Hash-partitions a stream of chunks into on-disk shards, so all rows with
+    equal keys land in the same shard. Each chunk is split with one
+    vectorized hash and appended to the shard files as pickles.
+
+    Parameters:
+    chunks (Iterable[pd.DataFrame]): Rows to partition; they must carry
+        ROW_COLUMN.
+    keys (list): Columns to hash.
+    partitions (int): Number of shards.
+    directory (str): Where the shard files are written.
+    level (int): Partitioning level, selecting the hash key.
+    prefix (str): Shard file name prefix.
+
+    Returns:
+    list[str]: Shard paths, one per partition (possibly empty files).
+    """
+    paths = [os.path.join(directory, f"{prefix}{i:04d}.pkl") for i in range(partitions)]
+    files = [open(path, "wb") for path in paths]
+    try:
+        for chunk in chunks:
+            if chunk.empty:
+                continue
+            partition = _partition_of(chunk, keys, partitions, level)
+            for shard, rows in chunk.groupby(partition, sort=False):
+                pickle.dump(rows, files[shard], protocol=pickle.HIGHEST_PROTOCOL)
+    finally:
+        for file in files:
+            file.close()
+    return paths
+
+
+def iter_shard(path: str):
+    """
+    Yields the pieces appended to a shard file.
+    """
+    with open(path, "rb") as file:
+        while True:
+            try:
+                yield pickle.load(file)
+            except EOFError:
+                return
+
+
+def read_shard(path: str) -> pd.DataFrame:
+    """
+    Reads a whole shard into memory (None if it is empty).
+    """
+    pieces = list(iter_shard(path))
+    return pd.concat(pieces) if pieces else None
+
+
+def block_bytes(budget: int, shards: int) -> int:
+    """
+    Returns the bytes one result block may take so merge_ordered() stays
+    within the budget: one block per shard, plus the merged rows in flight.
+    """
+    return max(1, budget // (shards + 1))
+
+
+def _write_result(frame: pd.DataFrame, path: str, max_bytes: int):
+    """
+    Writes a processed shard sorted by ROW_COLUMN, in pieces of at most
+    max_bytes in memory so the merge can read it back one piece at a time.
+    Each piece is stored with a flag telling whether it is the last one.
+    """
+    with open(path, "wb") as file:
+        if frame is None or frame.empty:
+            return
+        frame = frame.sort_values(ROW_COLUMN, kind="stable")
+        row_bytes = frame.memory_usage(index=True, deep=True).sum() / len(frame)
+        rows = max(1, int(max_bytes // row_bytes))
+        starts = range(0, len(frame), rows)
+        for start in starts:
+            piece = frame.iloc[start : start + rows]
+            last = start == starts[-1]
+            pickle.dump((piece, last), file, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _dedupe_shard(path: str, out_path: str, subset: list, max_bytes: int):
+    frame = read_shard(path)
+    if frame is not None:
+        # Rows were appended in input order, so keep="first" is global
+        frame = frame.sort_values(ROW_COLUMN, kind="stable")
+        frame = frame[~frame.duplicated(subset=subset, keep="first")]
+    _write_result(frame, out_path, max_bytes)
+
+
+def _merge_shard(
+    path: str,
+    out_path: str,
+    right_path: str,
+    on,
+    how: str,
+    right_columns: list,
+    max_bytes: int,
+):
+    frame = read_shard(path)
+    right = read_shard(right_path)
+    if frame is not None:
+        if right is None:
+            right = pd.DataFrame(columns=right_columns)
+        frame = frame.merge(right, on=on, how=how)
+    _write_result(frame, out_path, max_bytes)
+
+
+def _run_shards(task, jobs: list, workers: int):
+    """
+    Runs task(*job) for every shard, in a process pool when workers > 1.
+    """
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for future in [pool.submit(task, *job) for job in jobs]:
+                future.result()
+    else:
+        for job in jobs:
+            task(*job)
+
+
+def _fit_shards(paths: list, keys, budget: int, directory: str, level: int) -> list:
+    """
+    Re-partitions, with the next level's hash, every shard whose estimated
+    in-memory size exceeds the budget (grace hash partitioning).
+    """
+    fitted = []
+    for path in paths:
+        size = os.path.getsize(path) * EXPANSION
+        if size <= budget or level >= MAX_DEPTH:
+            if size > budget:
+                logging.warning(f"Shard {path} still exceeds the memory budget.")
+            fitted.append(path)
+            continue
+        partitions = int(np.ceil(size / budget)) + 1
+        prefix = os.path.splitext(os.path.basename(path))[0] + "_"
+        children = hash_partition(
+            iter_shard(path), keys, partitions, directory, level + 1, prefix
+        )
+        os.remove(path)
+        fitted.extend(_fit_shards(children, keys, budget, directory, level + 1))
+    return fitted
+
+
+def merge_ordered(paths: list):
+    """
+    Merges shard results, each sorted by ROW_COLUMN, back into input order
+    with a block-wise k-way merge: only one block per shard is in memory,
+    and blocks are written sized by block_bytes() so together they fit the
+    memory budget.
+
+    Parameters:
+    paths (list[str]): Result shard paths.
+
+    Returns:
+    Iterator[pd.DataFrame]: The rows in input order, without ROW_COLUMN, in
+        chunks of up to CHUNK_SIZE rows.
+    """
+    readers = [iter_shard(path) for path in paths]
+    buffers = {i: next(reader, None) for i, reader in enumerate(readers)}
+    buffers = {i: piece for i, piece in buffers.items() if piece is not None}
+
+    carry = None
+    while buffers:
+        # Rows up to the smallest end of a block with more pieces to come can
+        # no longer be preceded; the last block of a shard does not bound it
+        ends = [
+            block[ROW_COLUMN].iat[-1] for block, last in buffers.values() if not last
+        ]
+        bound = min(ends) if ends else np.iinfo(np.int64).max
+        ready = []
+        for i in list(buffers):
+            block, last = buffers[i]
+            rows = block[ROW_COLUMN].to_numpy()
+            if rows[0] > bound:
+                continue
+            cut = np.searchsorted(rows, bound, side="right")
+            ready.append(block.iloc[:cut])
+            if cut < len(block):
+                buffers[i] = (block.iloc[cut:], last)
+            elif last:
+                del buffers[i]
+            else:
+                buffers[i] = next(readers[i])
+        # Rows of short rounds are carried over, so chunks stay full-sized
+        merged = pd.concat([carry, *ready]).sort_values(ROW_COLUMN, kind="stable")
+        full = len(merged) - len(merged) % config.CHUNK_SIZE
+        for start in range(0, full, config.CHUNK_SIZE):
+            yield _without_row(merged.iloc[start : start + config.CHUNK_SIZE])
+        carry = merged.iloc[full:]
+    if carry is not None and not carry.empty:
+        yield _without_row(carry)
+
+
+def _without_row(frame: pd.DataFrame) -> pd.DataFrame:
+    return frame.drop(columns=ROW_COLUMN).reset_index(drop=True)
+
+
+def _numbered(chunks):
+    """
+    Adds ROW_COLUMN, the running input position, to each chunk.
+    """
+    offset = 0
+    for chunk in chunks:
+        chunk = chunk.reset_index(drop=True)
+        chunk[ROW_COLUMN] = np.arange(offset, offset + len(chunk), dtype=np.int64)
+        offset += len(chunk)
+        yield chunk
+
+
+def external_drop_duplicates(
+    chunks,
+    subset: list = None,
+    budget: int = None,
+    partitions: int = None,
+    workers: int = None,
+    directory: str = None,
+):
+    """
+    drop_duplicates(keep="first") over a stream of chunks larger than RAM:
+    rows are hash-partitioned to disk by the dedupe key, each shard is
+    deduplicated on its own and the survivors are merged back in input order.
+
+    Parameters:
+    chunks (Iterable[pd.DataFrame]): Rows to deduplicate, in order.
+    subset (list): Key columns; all columns by default.
+    budget (int): Bytes one shard may take in memory; defaults to the
+        configured budget divided among the workers.
+    partitions (int): Initial number of shards.
+    workers (int): Processes deduplicating shards in parallel.
+    directory (str): Parent directory of the spill files.
+
+    Returns:
+    Iterator[pd.DataFrame]: The distinct rows, in input order.
+    """
+    workers = workers or config.SPILL_WORKERS or 1
+    budget = budget or (memory_budget() or 2**30) // workers
+    spill_dir = _spill_dir(directory)
+    try:
+        chunks = _numbered(chunks)
+        first = next(chunks, None)
+        if first is None:
+            return
+        keys = subset or [column for column in first.columns if column != ROW_COLUMN]
+        shards = hash_partition(
+            _chain(first, chunks),
+            keys,
+            partitions or config.SPILL_PARTITIONS,
+            spill_dir,
+        )
+        shards = _fit_shards(shards, keys, budget, spill_dir, 0)
+        logging.info(f"Deduplicating {len(shards)} shards with {workers} workers")
+        results = [f"{path}.out" for path in shards]
+        max_bytes = block_bytes(budget * workers, len(results))
+        _run_shards(
+            _dedupe_shard,
+            [(s, r, keys, max_bytes) for s, r in zip(shards, results)],
+            workers,
+        )
+        for path in shards:
+            os.remove(path)
+        yield from merge_ordered(results)
+    finally:
+        shutil.rmtree(spill_dir, ignore_errors=True)
+
+
+def external_merge(
+    left,
+    right,
+    on: list,
+    how: str = "left",
+    budget: int = None,
+    partitions: int = None,
+    workers: int = None,
+    directory: str = None,
+):
+    """
+    DataFrame.merge for inputs larger than RAM: both sides are
+    hash-partitioned by the join key into matching shards, shard i of the
+    left side is joined with shard i of the right side, and the joined rows
+    are merged back in the order of the left side.
+
+    Parameters:
+    left (Iterable[pd.DataFrame]): Left rows, in order.
+    right (pd.DataFrame | Iterable[pd.DataFrame]): Right rows.
+    on (list): Join columns.
+    how (str): "left" or "inner".
+    budget, partitions, workers, directory: See external_drop_duplicates().
+
+    Returns:
+    Iterator[pd.DataFrame]: The joined rows, in left order.
+    """
+    workers = workers or config.SPILL_WORKERS or 1
+    budget = budget or (memory_budget() or 2**30) // workers
+    partitions = partitions or config.SPILL_PARTITIONS
+    right = iter([right] if isinstance(right, pd.DataFrame) else right)
+    first = next(right, None)
+    right = [] if first is None else _chain(first, right)
+    right_columns = list(on) if first is None else list(first.columns)
+    spill_dir = _spill_dir(directory)
+    try:
+        left_shards = hash_partition(_numbered(left), on, partitions, spill_dir)
+        right_shards = hash_partition(right, on, partitions, spill_dir, prefix="r")
+        results = [f"{path}.out" for path in left_shards]
+        max_bytes = block_bytes(budget * workers, len(results))
+        jobs = [
+            (s, r, rs, on, how, right_columns, max_bytes)
+            for s, r, rs in zip(left_shards, results, right_shards)
+        ]
+        logging.info(f"Joining {len(jobs)} shard pairs with {workers} workers")
+        _run_shards(_merge_shard, jobs, workers)
+        yield from merge_ordered(results)
+    finally:
+        shutil.rmtree(spill_dir, ignore_errors=True)
+
+
+def _chain(first, rest):
+    yield first
+    yield from rest
+
+
+def _spill_dir(directory: str = None) -> str:
+    parent = directory or config.SPILL_DIR
+    os.makedirs(parent, exist_ok=True)
+    return tempfile.mkdtemp(prefix="spill-", dir=parent)
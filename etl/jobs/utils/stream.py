@@ -0,0 +1,130 @@
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Chunks a stage may hold ready ahead of its consumer
+QUEUE_DEPTH = 2
+
+_DONE = object()
+
+
+class StageClock:
+    """
+    Accumulates the busy time of each pipeline stage. With overlapping
+    stages the wall time approaches the slowest stage instead of their sum.
+    """
+
+    def __init__(self):
+        self.busy = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float):
+        with self._lock:
+            self.busy[stage] = self.busy.get(stage, 0.0) + seconds
+
+    def timed(self, stage: str, func):
+        """
+        Wraps func so that its running time is added to the stage.
+        """
+
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add(stage, time.perf_counter() - start)
+
+        return wrapper
+
+    def result(self) -> dict:
+        return {f"{stage}_seconds": round(t, 3) for stage, t in self.busy.items()}
+
+
+def read_ahead(items, depth: int = QUEUE_DEPTH, clock: StageClock = None):
+    """
+    Iterates items in a background thread, keeping at most `depth` of them
+    ready in a bounded queue. The producer blocks when the queue is full, so
+    memory stays bounded, and an error in the producer is raised in the
+    consumer.
+
+    Parameters:
+    items (Iterable): Items to produce, e.g. pd.read_csv chunks.
+    depth (int): Queue size.
+    clock (StageClock, optional): Records the producer time as "read".
+
+    Returns:
+    Iterator: The items, in order.
+    """
+    ready = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        # Gives up when the consumer has stopped, instead of blocking forever
+        while not stop.is_set():
+            try:
+                ready.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        iterator = iter(items)
+        try:
+            while True:
+                start = time.perf_counter()
+                item = next(iterator, _DONE)
+                if clock:
+                    clock.add("read", time.perf_counter() - start)
+                if not put(item) or item is _DONE:
+                    return
+        except BaseException as e:
+            put(e)
+
+    thread = threading.Thread(target=produce, name="etl-read-ahead", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = ready.get()
+            if item is _DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+def map_ordered(func, items, workers: int = 1, depth: int = QUEUE_DEPTH):
+    """
+    Applies func to the items in a pool of worker threads and yields the
+    results in input order. At most workers + depth items are in flight,
+    so a slow consumer holds back the workers and the producer.
+
+    pandas and psycopg2 release the GIL in their C parsing, hashing and I/O
+    loops, which is where the pipeline stages spend their time.
+
+    Parameters:
+    func (Callable): Function applied to each item.
+    items (Iterable): Input items.
+    workers (int): Worker threads.
+    depth (int): Results that may wait for the consumer.
+
+    Returns:
+    Iterator: func(item) for each item, in order.
+    """
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="etl") as pool:
+        pending = deque()
+        try:
+            for item in items:
+                pending.append(pool.submit(func, item))
+                if len(pending) >= workers + depth:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,239 @@
+import logging
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from etl.config import config
+
+# Characters that make the csv module quote a field (csv.QUOTE_MINIMAL with
+# the default dialect used by DataFrame.to_csv)
+_NEEDS_QUOTES = r'[,"\r\n]'
+
+# Datetime "unit" of the columns left to pandas' formatting (sub-second)
+PANDAS_FORMAT = "pandas"
+
+# Marks the columns write_csv() already turned into CSV fields
+FORMATTED = "formatted"
+
+
+def _quote(values: pd.Series) -> pd.Series:
+    """
+    Quotes the strings that contain a separator, a quote or a line break,
+    doubling the inner quotes, as the csv module does.
+    """
+    needs_quotes = values.str.contains(_NEEDS_QUOTES, regex=True)
+    if not needs_quotes.any():
+        return values
+    quoted = '"' + values[needs_quotes].str.replace('"', '""', regex=False) + '"'
+    return values.mask(needs_quotes, quoted)
+
+
+def date_units(df: pd.DataFrame) -> dict:
+    """
+    Chooses how each naive datetime column is written, over the whole
+    column as to_csv() does: 'D' (dates only) when every value is at
+    midnight, 's' when all are whole seconds, PANDAS_FORMAT for sub-second
+    values.
+
+    Returns:
+    dict: Column name -> unit, for the datetime columns only.
+    """
+    units = {}
+    for column in df.columns:
+        if not pd.api.types.is_datetime64_dtype(df[column].dtype):
+            continue
+        stamps = df[column].dropna().to_numpy()
+        times = stamps - stamps.astype("datetime64[D]")
+        if (times % np.timedelta64(1, "s")).any():
+            units[column] = PANDAS_FORMAT
+        else:
+            units[column] = "s" if times.any() else "D"
+    return units
+
+
+def _is_vectorized(values: pd.Series, unit: str = None) -> bool:
+    """
+    Tells whether format_column() has a vectorized path for the column.
+    """
+    dtype = values.dtype
+    if pd.api.types.is_datetime64_dtype(dtype):
+        return unit != PANDAS_FORMAT
+    return (
+        isinstance(dtype, pd.CategoricalDtype)
+        or pd.api.types.is_bool_dtype(dtype)
+        or pd.api.types.is_numeric_dtype(dtype)
+        or pd.api.types.is_object_dtype(dtype)
+        or pd.api.types.is_string_dtype(dtype)
+    )
+
+
+def _factorize(values: pd.Series):
+    """
+    Splits a column into integer codes (-1 for missing) and its distinct
+    values. Floats are factorized on their bits so that -0.0 stays apart
+    from 0.0.
+    """
+    if values.dtype.kind == "f":
+        numbers = values.to_numpy()
+        bits = numbers.view(f"i{numbers.itemsize}")
+        codes, uniques = pd.factorize(bits)
+        codes[np.isnan(numbers)] = -1
+        return codes, pd.Series(uniques.view(numbers.dtype))
+    codes, uniques = pd.factorize(values)
+    return codes, pd.Series(uniques)
+
+
+def _format_uniques(uniques: pd.Series, unit: str = None) -> np.ndarray:
+    """
+    Formats distinct, non-missing values with whole-array conversions.
+    """
+    dtype = uniques.dtype
+    if uniques.empty:
+        return np.array([], dtype=object)
+    if pd.api.types.is_datetime64_dtype(dtype):
+        text = np.datetime_as_string(uniques.to_numpy(), unit=unit)
+        return np.char.replace(text, "T", " ")
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_numeric_dtype(dtype):
+        if isinstance(dtype, pd.api.extensions.ExtensionDtype):
+            # Nullable Int/Float/boolean: no NA is left after factorizing
+            return uniques.to_numpy(dtype=dtype.numpy_dtype).astype(str)
+        return uniques.to_numpy().astype(str)
+    # to_csv writes str() of non-string objects
+    uniques = uniques.astype(object)
+    if pd.api.types.infer_dtype(uniques, skipna=True) != "string":
+        uniques = uniques.map(str)
+    return _quote(uniques).to_numpy()
+
+
+def format_column(values: pd.Series, unit: str = None) -> np.ndarray:
+    """
+    Formats one column as the strings DataFrame.to_csv(index=False) writes.
+    Each distinct value is formatted once, with whole-array conversions
+    (numpy's shortest round-trip formatting for numbers,
+    np.datetime_as_string for dates), and the result is gathered by code,
+    as for a categorical. Missing values become empty strings.
+
+    Parameters:
+    values (pd.Series): The column.
+    unit (str): For datetime columns, the unit chosen by date_units();
+        FORMATTED for a column that already holds CSV fields.
+
+    Returns:
+    np.ndarray: Object array of formatted fields.
+    """
+    if unit == FORMATTED:
+        return values.to_numpy(dtype=object)
+    if pd.api.types.is_datetime64_dtype(values.dtype):
+        unit = unit or date_units(values.to_frame())[values.name]
+    if not _is_vectorized(values, unit):
+        return _fallback(values)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()
+        uniques = format_column(pd.Series(values.dtype.categories))
+    else:
+        codes, uniques = _factorize(values)
+        uniques = _format_uniques(uniques, unit)
+    return np.append(uniques.astype(object), "")[codes]
+
+
+def _fallback(values: pd.Series) -> np.ndarray:
+    """
+    Formats a column pandas' own way, for the rare types without a
+    vectorized path (tz-aware or sub-second timestamps, timedeltas...).
+    """
+    lines = values.to_frame().to_csv(index=False, header=False).split("\n")[:-1]
+    return np.array(lines, dtype=object)
+
+
+def format_rows(df: pd.DataFrame, units: dict = None) -> bytes:
+    """
+    Formats the rows of a DataFrame (without header) as UTF-8 CSV bytes.
+    Runs in the worker processes when write_csv() uses a pool.
+
+    Parameters:
+    df (pd.DataFrame): The rows to format.
+    units (dict): Datetime units from date_units(), computed on the whole
+        frame so that every block formats its dates the same way.
+
+    Returns:
+    bytes: One line per row.
+    """
+    if df.empty:
+        return b""
+    units = date_units(df) if units is None else units
+    columns = [format_column(df[column], units.get(column)) for column in df.columns]
+    if len(columns) == 1:
+        # The csv module writes '""' for a lone empty field
+        columns[0] = np.where(columns[0] == "", '""', columns[0])
+    lines = map(",".join, zip(*columns))
+    return ("\n".join(lines) + "\n").encode("utf8")
+
+
+def _format_frame(df: pd.DataFrame, pool=None):
+    """
+    Yields the CSV bytes of a DataFrame's rows in blocks of CHUNK_SIZE rows,
+    formatted in the pool's worker processes when one is given.
+    """
+    units = date_units(df)
+    # Columns pandas formats from the whole column are formatted up front
+    fallbacks = [c for c in df.columns if not _is_vectorized(df[c], units.get(c))]
+    if fallbacks:
+        df = df.assign(**{c: _fallback(df[c]) for c in fallbacks})
+        units.update(dict.fromkeys(fallbacks, FORMATTED))
+    blocks = [
+        df.iloc[start : start + config.CHUNK_SIZE]
+        for start in range(0, len(df), config.CHUNK_SIZE)
+    ]
+    if pool is not None and len(blocks) > 1:
+        yield from pool.map(format_rows, blocks, [units] * len(blocks))
+    else:
+        for block in blocks:
+            yield format_rows(block, units)
+
+
+def write_csv(data, output_path: str, workers: int = None) -> int:
+    """
+    Writes a DataFrame to CSV with the same bytes as
+    df.to_csv(output_path, index=False), formatting column by column. Row
+    blocks are formatted in parallel worker processes and written in order
+    to a temporary file, which then atomically replaces the output, so the
+    loaders never read a partial artifact.
+
+    A stream of chunks is written the way appending each chunk with
+    to_csv(mode="a") would: the header once, then each chunk as it arrives.
+    The output is still replaced only once the last chunk is written.
+
+    Parameters:
+    data (pd.DataFrame | Iterable[pd.DataFrame]): The rows to write, as one
+        frame or as chunks with the same columns.
+    output_path (str): Destination CSV path.
+    workers (int): Worker processes; defaults to ETL_WRITE_WORKERS.
+
+    Returns:
+    int: Number of rows written.
+    """
+    workers = workers or config.WRITE_WORKERS
+    chunks = [data] if isinstance(data, pd.DataFrame) else data
+    rows = 0
+    header = True
+    tmp_path = f"{output_path}.tmp"
+    try:
+        with open(tmp_path, "wb") as file, (
+            ProcessPoolExecutor(max_workers=workers) if workers > 1 else nullcontext()
+        ) as pool:
+            for chunk in chunks:
+                if header:
+                    names = pd.DataFrame([list(map(str, chunk.columns))])
+                    file.write(format_rows(names, units={}))
+                    header = False
+                for block in _format_frame(chunk, pool):
+                    file.write(block)
+                rows += len(chunk)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    logging.info(f"{rows} rows written to {output_path}")
+    return rows
@@ -0,0 +1,88 @@
+import atexit
+import hashlib
+import json
+import os
+import shutil
+import pandas as pd
+from etl.config import config
+from etl.jobs.utils.metrics import record_metrics
+
+# Hit and miss counters of this process, written to the run metrics once, at
+# exit, so lookups never touch the metrics file
+_STATS = {"hits": 0, "misses": 0}
+
+
+def cache_key(name: str, params: dict) -> str:
+    """
+    Returns a stable key for a query name and its parameters.
+    """
+    payload = json.dumps([name, params], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _version_dir(version: int, cache_dir: str) -> str:
+    return os.path.join(cache_dir, f"v{version}")
+
+
+def get_cached(name: str, params: dict, version: int, cache_dir=config.CACHE_DIR):
+    """
+    Returns the cached result of a query for a data version, or None.
+
+    Parameters:
+    name (str): Query name.
+    params (dict): Query parameters.
+    version (int): Current data version.
+    cache_dir (str): Cache directory.
+
+    Returns:
+    pd.DataFrame | None: The cached result.
+    """
+    path = os.path.join(_version_dir(version, cache_dir), cache_key(name, params))
+    try:
+        result = pd.read_pickle(f"{path}.pkl")
+    except FileNotFoundError:
+        _record("misses")
+        return None
+    _record("hits")
+    return result
+
+
+def put_cached(
+    name: str, params: dict, version: int, result, cache_dir=config.CACHE_DIR
+):
+    """
+    Stores a query result for a data version and removes the entries of
+    older versions, which can never be read again.
+    """
+    directory = _version_dir(version, cache_dir)
+    os.makedirs(directory, exist_ok=True)
+    for entry in os.listdir(cache_dir):
+        stale = os.path.join(cache_dir, entry)
+        if entry.startswith("v") and os.path.isdir(stale) and stale != directory:
+            shutil.rmtree(stale, ignore_errors=True)
+
+    path = os.path.join(directory, cache_key(name, params))
+    result.to_pickle(f"{path}.tmp")
+    os.replace(f"{path}.tmp", f"{path}.pkl")
+
+
+def cache_stats() -> dict:
+    """
+    Returns the hit and miss counts and the hit ratio of this process.
+    """
+    lookups = _STATS["hits"] + _STATS["misses"]
+    return {**_STATS, "hit_ratio": _STATS["hits"] / lookups if lookups else 0.0}
+
+
+@atexit.register
+def flush_stats(path: str = config.RUN_METRICS):
+    """
+    Writes the hit and miss counts of this process to the run metrics, if
+    there were any lookups.
+    """
+    if _STATS["hits"] + _STATS["misses"]:
+        record_metrics("kpi_cache", cache_stats(), path)
+
+
+def _record(outcome: str):
+    _STATS[outcome] += 1
@@ -0,0 +1,103 @@
+import pandas as pd
+from etl.jobs.utils.data_version import read_data_version
+from etl.jobs.utils.db_connection import get_db_connection
+from etl.kpi.cache import get_cached, put_cached
+
+# Dashboard questions: SQL over the kpi_* views (load_kpi.py) and the default
+# value of each named parameter. A None parameter disables its filter.
+QUERIES = {
+    "bookings_by_country": (
+        """
+        SELECT country, bookings FROM kpi_bookings_by_country
+        ORDER BY bookings DESC, country
+        LIMIT %(limit)s
+        """,
+        {"limit": None},
+    ),
+    "adr_revenue_by_hotel": (
+        "SELECT hotel, revenue, nights, adr FROM kpi_adr_revenue_by_hotel "
+        "ORDER BY hotel",
+        {},
+    ),
+    "booked_nights_by_hotel_month": (
+        """
+        SELECT hotel, arrival_year, arrival_month, nights
+        FROM kpi_booked_nights_by_hotel_month
+        WHERE (%(hotel)s IS NULL OR hotel = %(hotel)s)
+          AND (%(year)s::INT IS NULL OR arrival_year = %(year)s::INT)
+        ORDER BY hotel, arrival_year, arrival_month
+        """,
+        {"hotel": None, "year": None},
+    ),
+    "avg_lead_time_by_country": (
+        """
+        SELECT country, avg_lead_time FROM kpi_lead_time_by_country
+        ORDER BY avg_lead_time DESC, country
+        LIMIT %(limit)s
+        """,
+        {"limit": None},
+    ),
+    "cancellation_rate_by_country": (
+        """
+        SELECT country, bookings, canceled, cancellation_rate
+        FROM kpi_cancellation_rate_by_country
+        WHERE bookings >= %(min_bookings)s
+        ORDER BY cancellation_rate DESC, country
+        LIMIT %(limit)s
+        """,
+        {"min_bookings": 1, "limit": None},
+    ),
+}
+
+
+def run_query(name: str, **params) -> pd.DataFrame:
+    """
+    Runs a dashboard query against PostgreSQL, bypassing the cache.
+
+    Parameters:
+    name (str): Query name, a key of QUERIES.
+    **params: Values for the query parameters.
+
+    Returns:
+    pd.DataFrame: The query result.
+
+    Raises:
+    KeyError: If the query or a parameter is unknown.
+    """
+    sql, defaults = QUERIES[name]
+    unknown = set(params) - set(defaults)
+    if unknown:
+        raise KeyError(f"Unknown parameters for {name}: {sorted(unknown)}")
+
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(sql, {**defaults, **params})
+            columns = [column.name for column in cursor.description]
+            return pd.DataFrame(cursor.fetchall(), columns=columns)
+    finally:
+        conn.close()
+
+
+def query_kpi(name: str, **params) -> pd.DataFrame:
+    """
+    Answers a dashboard query from the on-disk cache, reaching PostgreSQL
+    only on a miss. Entries are keyed by query, parameters and data version,
+    so results cached before the last load are never returned.
+
+    Parameters:
+    name (str): Query name, a key of QUERIES.
+    **params: Values for the query parameters.
+
+    Returns:
+    pd.DataFrame: The query result.
+    """
+    _, defaults = QUERIES[name]
+    params = {**defaults, **params}
+    version = read_data_version()
+
+    result = get_cached(name, params, version)
+    if result is None:
+        result = run_query(name, **params)
+        put_cached(name, params, version, result)
+    return result
@@ -0,0 +1,91 @@
+import pandas as pd
+import psycopg2
+import pytest
+from etl.jobs.load.batch_executor import execute_isolated
+
+
+class RecordingCursor:
+    """
+    Minimal cursor that only records the savepoint statements it receives.
+    """
+
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, query):
+        self.statements.append(query)
+
+
+def test_execute_isolated_bisects_to_bad_rows():
+    """
+    Test that a failing batch is split until only the bad rows are rejected,
+    while every other row is written in order.
+    """
+    df = pd.DataFrame({"value": range(20)})
+    written_rows = []
+
+    def write(cursor, batch):
+        if (batch["value"] % 7 == 3).any():
+            raise psycopg2.DataError(f"bad value in batch of {len(batch)}")
+        written_rows.extend(batch["value"])
+
+    written, rejected = execute_isolated(
+        RecordingCursor(), df, write, batch_size=8, max_reject_ratio=0.5
+    )
+
+    assert written == 17
+    assert written_rows == [v for v in range(20) if v % 7 != 3]
+    assert rejected["value"].tolist() == [3, 10, 17]
+    assert rejected["reject_reasons"].str.startswith("load_error: bad value").all()
+
+
+def test_execute_isolated_isolates_bad_rows_in_both_halves():
+    """
+    Test that two unrelated bad rows in different halves of one batch are
+    each bisected down to the single row, and do not abort a large load.
+    """
+    for rows, bad, options in [
+        (16, [2, 12], {"batch_size": 16, "max_reject_ratio": 0.5}),
+        (10000, [10, 9000], {"batch_size": 10000}),
+    ]:
+
+        def write(cursor, batch):
+            if batch["value"].isin(bad).any():
+                raise psycopg2.DataError("bad value")
+
+        df = pd.DataFrame({"value": range(rows)})
+        written, rejected = execute_isolated(RecordingCursor(), df, write, **options)
+        assert written == rows - 2
+        assert rejected["value"].tolist() == bad
+
+
+class UndefinedColumn(psycopg2.ProgrammingError):
+    pgcode = "42703"
+
+
+def test_execute_isolated_aborts_systematic_errors():
+    """
+    Test that an error no row can cause is raised without bisecting, and
+    that a load where every row fails is aborted after a few rejects once
+    they pass the allowed ratio.
+    """
+    df = pd.DataFrame({"value": range(1024)})
+    attempts = []
+
+    def undefined_column(cursor, batch):
+        attempts.append(len(batch))
+        raise UndefinedColumn('column "guest_id" does not exist')
+
+    with pytest.raises(UndefinedColumn):
+        execute_isolated(RecordingCursor(), df, undefined_column, batch_size=256)
+    assert attempts == [256]
+
+    def duplicate_key(cursor, batch):
+        attempts.append(len(batch))
+        raise psycopg2.IntegrityError("duplicate key value violates unique constraint")
+
+    attempts.clear()
+    with pytest.raises(RuntimeError, match="load aborted"):
+        execute_isolated(RecordingCursor(), df, duplicate_key, batch_size=256)
+    # A few dozen statements, not one per row
+    assert len(attempts) < 64
@@ -0,0 +1,42 @@
+import subprocess
+import sys
+
+PROBE = """
+import sys
+from etl.cli import main
+try:
+    main({argv!r})
+except SystemExit:
+    pass
+print(sorted(m for m in ("pandas", "psycopg2", "dotenv") if m in sys.modules))
+"""
+
+
+def _loaded_modules(argv: list) -> tuple:
+    """
+    Runs the CLI with argv in a fresh interpreter and returns its output and
+    the heavy modules it imported.
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(argv=argv)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    *output, loaded = result.stdout.strip().splitlines()
+    return "\n".join(output), loaded
+
+
+def test_cli_imports_jobs_lazily():
+    """
+    Test that the top-level help lists the jobs without importing pandas,
+    psycopg2 or dotenv, and that options after a subcommand reach the job's
+    own parser, which answers --help before pandas is loaded.
+    """
+    output, loaded = _loaded_modules(["--help"])
+    assert "validate" in output and "load-fact" in output
+    assert loaded == "[]"
+
+    output, loaded = _loaded_modules(["validate", "--help"])
+    assert "--sample" in output
+    assert "pandas" not in loaded
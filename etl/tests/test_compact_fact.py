@@ -0,0 +1,102 @@
+import re
+import pandas as pd
+from etl.config import config
+from etl.jobs.transform.transform_fact_bookings import FACT_COLUMNS, compact_fact
+from etl.jobs.transform.transform_sql import (
+    CREATE_REJECTS_QUERY,
+    fact_insert_sql,
+    fact_rejects_sql,
+)
+from etl.tests.test_fact_rerun import _staged_database
+
+
+def _fact() -> pd.DataFrame:
+    rows = 4
+    fact = pd.DataFrame({column: [1] * rows for column in FACT_COLUMNS})
+    fact.insert(0, "booking_id", range(1, rows + 1))
+    return fact.assign(
+        arrival_month=["July", "Julyy", "May", "August"],
+        lead_time=[10, 20, 40000, 30],
+        adr=[80.0, 90.0, 100.0, 110.0],
+        deposit_type="No Deposit",
+        reservation_status="Check-Out",
+        reservation_status_date="2017-07-01",
+    )
+
+
+def test_compact_fact_quarantines_rows_it_cannot_hold(tmp_path):
+    """
+    Test that an unknown month and a value outside int16 are quarantined
+    with their reason instead of being coded 0 or wrapped around.
+    """
+    rejects_path = tmp_path / "fact_rejects.csv"
+    compact = compact_fact(_fact(), str(rejects_path))
+
+    assert compact["booking_id"].tolist() == [1, 4]
+    assert compact["arrival_month"].tolist() == [7, 8]
+    assert compact["lead_time"].dtype == "int16"
+
+    rejects = pd.read_csv(rejects_path)
+    assert rejects["booking_id"].tolist() == [2, 3]
+    assert rejects["reject_reasons"].tolist() == [
+        "arrival_month_unknown",
+        "lead_time_out_of_range",
+    ]
+
+
+def _postgres_functions(conn):
+    """
+    Registers SQLite versions of the PostgreSQL functions the compact fact
+    statements use.
+    """
+    conn.create_function(
+        "array_position",
+        -1,
+        lambda *args: args.index(args[-1]) + 1 if args[-1] in args[:-1] else None,
+    )
+    conn.create_function(
+        "concat_ws",
+        -1,
+        lambda sep, *args: sep.join(str(arg) for arg in args if arg is not None),
+    )
+
+
+def _sqlite(query: str) -> str:
+    """
+    Turns array literals and casts into forms SQLite accepts.
+    """
+    query = re.sub(r"ARRAY\[([^\]]*)\]", r"\1", query)
+    return re.sub(r"::\w+", "", query)
+
+
+def test_sql_engine_quarantines_rows_it_cannot_hold(monkeypatch):
+    """
+    Test that the SQL engine leaves the rows the compact layout cannot hold
+    out of the fact table and quarantines them with the reasons the pandas
+    engine gives, once across reruns.
+    """
+    monkeypatch.setattr(config, "COMPACT_FACT", True)
+    conn = _staged_database(primary_key=True)
+    _postgres_functions(conn)
+    conn.executescript(
+        """
+        UPDATE staging_hotel_bookings SET arrival_month = 'July';
+        UPDATE staging_hotel_bookings SET lead_time = 40000 WHERE ctid = 1;
+        UPDATE staging_hotel_bookings SET arrival_month = 'Julyy' WHERE ctid = 2;
+        """
+    )
+    conn.execute(CREATE_REJECTS_QUERY)
+    for _ in range(2):
+        conn.execute(_sqlite(fact_rejects_sql()))
+        conn.execute(_sqlite(fact_insert_sql()))
+
+    fact = conn.execute("SELECT booking_id, arrival_month FROM fact_bookings")
+    assert fact.fetchall() == [(3, 7)]
+    rejects = conn.execute(
+        "SELECT booking_id, arrival_month, lead_time, reject_reasons "
+        "FROM fact_rejects ORDER BY booking_id"
+    )
+    assert rejects.fetchall() == [
+        (1, "July", 40000, "lead_time_out_of_range"),
+        (2, "Julyy", 0, "arrival_month_unknown"),
+    ]
@@ -1,16 +1,10 @@
 import psycopg2
 import logging
-import os
 from etl.config import config
+from etl.jobs.utils.logger import configure_logging
 
 # Setup logging
-os.makedirs("logs", exist_ok=True)
-logging.basicConfig(
-    filename="logs/test_connection.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    filemode="w",
-)
+configure_logging("test_connection.log")
 
 
 def test_database_connection():
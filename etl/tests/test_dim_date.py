@@ -0,0 +1,38 @@
+import pandas as pd
+from etl.jobs.load.load_fact_bookings import CREATE_QUERY
+from etl.jobs.transform.rules import PROCESSED_RULES, rule_masks
+from etl.jobs.transform.transform import add_arrival_date
+from etl.jobs.transform.transform_dim_date import extract_dim_date
+
+
+def test_arrival_date_keys_match_date_dimension():
+    """
+    Test that arrival date keys are YYYYMMDD, impossible dates get a null
+    key without breaking a rule, and every valid key exists in the generated
+    date dimension.
+    """
+    df = pd.DataFrame(
+        {
+            "arrival_year": pd.Series([2017, 2016, 2015], dtype="int16"),
+            "arrival_month": pd.Categorical(["December", "February", "February"]),
+            "arrival_day": pd.Series([31, 29, 30], dtype="int8"),
+        }
+    )
+    df = add_arrival_date(df)
+    assert df["arrival_date_key"].tolist()[:2] == [20171231, 20160229]
+    assert df["arrival_date_key"].isna().tolist() == [False, False, True]
+    masks = rule_masks(df, PROCESSED_RULES)
+    assert not any(mask.any() for mask in masks.values())
+
+    dim_date = extract_dim_date(df)
+    assert len(dim_date) == 672
+    assert set(df["arrival_date_key"].dropna()) <= set(dim_date["date_key"])
+    assert dim_date.loc[dim_date["date_key"] == 20171231, "is_weekend"].item()
+
+
+def test_existing_fact_tables_get_the_arrival_date_key():
+    """
+    Test that the fact DDL adds arrival_date_key to a table created before
+    the column existed.
+    """
+    assert "ADD COLUMN IF NOT EXISTS arrival_date_key INT" in CREATE_QUERY
@@ -0,0 +1,114 @@
+import sqlite3
+import pandas as pd
+from etl.jobs.load.load_dimension import DIMENSIONS
+from etl.jobs.load.load_fact_bookings import (
+    booking_id_offset,
+    drop_loaded_rows,
+    loaded_booking_ids,
+    record_booking_span,
+    shift_booking_ids,
+)
+from etl.jobs.transform.transform_fact_bookings import FACT_COLUMNS
+from etl.jobs.transform.transform_sql import fact_insert_sql
+
+
+class SqliteCursor:
+    """
+    Cursor running the load bookkeeping queries on SQLite, with psycopg2
+    placeholders and GREATEST translated.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS fact_loads "
+            "(fingerprint TEXT PRIMARY KEY, id_offset, id_span DEFAULT 0)"
+        )
+
+    def execute(self, query, params=()):
+        query = query.replace("%s", "?").replace("GREATEST", "MAX")
+        self.result = self.conn.execute(query, params).fetchall()
+
+    def fetchone(self):
+        return self.result[0] if self.result else None
+
+    def fetchall(self):
+        return self.result
+
+
+def _load(cursor, fact: pd.DataFrame, fingerprint: str):
+    """
+    Loads fact rows the way the pandas engine does.
+    """
+    offset = booking_id_offset(cursor, fingerprint)
+    record_booking_span(cursor, fingerprint, len(fact))
+    fact = shift_booking_ids(fact, offset)
+    fact = drop_loaded_rows(fact, loaded_booking_ids(cursor, offset))
+    cursor.conn.executemany(
+        "INSERT INTO fact_bookings VALUES (?, ?)",
+        fact[["booking_id", "adr"]].itertuples(index=False),
+    )
+
+
+def test_pandas_engine_rerun_adds_no_rows():
+    """
+    Test that a rerun of the same file loads nothing, while a different file
+    keeps all of its rows under new booking_ids.
+    """
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE fact_bookings (booking_id INTEGER PRIMARY KEY, adr)")
+    cursor = SqliteCursor(conn)
+    first = pd.DataFrame({"booking_id": [1, 2, 3], "adr": [80.0, 95.5, 120.0]})
+    second = pd.DataFrame({"booking_id": [1, 2], "adr": [60.0, 70.0]})
+    for fact, fingerprint in [(first, "a"), (first, "a"), (second, "b")]:
+        _load(cursor, fact, fingerprint)
+
+    rows = conn.execute("SELECT * FROM fact_bookings ORDER BY booking_id").fetchall()
+    assert rows == [(1, 80.0), (2, 95.5), (3, 120.0), (4, 60.0), (5, 70.0)]
+    _load(cursor, second, "b")
+    assert len(conn.execute("SELECT * FROM fact_bookings").fetchall()) == 5
+
+
+def _staged_database(primary_key: bool) -> sqlite3.Connection:
+    """
+    Builds the staging, dimension and fact tables the fact INSERT reads, in
+    SQLite. Staging gets an explicit ctid column for the row order.
+    """
+    conn = sqlite3.connect(":memory:")
+    sources = [spec["source"] for spec in DIMENSIONS.values()]
+    fact_keys = [spec["fact_key"] for spec in DIMENSIONS.values()]
+    values = [c for c in FACT_COLUMNS if c not in fact_keys]
+    conn.execute(
+        f"CREATE TABLE staging_hotel_bookings (ctid, {', '.join(sources + values)})"
+    )
+    for table, spec in DIMENSIONS.items():
+        conn.execute(
+            f"CREATE TABLE {table} "
+            f"({spec['key']}, {spec['natural_key']}, is_current DEFAULT 1)"
+        )
+        conn.execute(f"INSERT INTO {table} VALUES (1, 'a', 1)")
+    key = "booking_id INTEGER PRIMARY KEY" if primary_key else "booking_id"
+    conn.execute(f"CREATE TABLE fact_bookings ({key}, {', '.join(FACT_COLUMNS)})")
+    row = ["'a'"] * len(sources) + ["0"] * len(values)
+    for ctid in (3, 1, 2):
+        conn.execute(
+            f"INSERT INTO staging_hotel_bookings VALUES ({ctid}, {', '.join(row)})"
+        )
+    return conn
+
+
+def test_sql_engine_rerun_adds_no_rows():
+    """
+    Test that the fact INSERT skips booking_ids already loaded, with the
+    primary key in place and with it dropped for a bulk load, and that a
+    different file in staging keeps all of its rows.
+    """
+    for bulk in (False, True):
+        conn = _staged_database(primary_key=not bulk)
+        cursor = SqliteCursor(conn)
+        for fingerprint in ("a", "a", "b"):
+            offset = booking_id_offset(cursor, fingerprint)
+            record_booking_span(cursor, fingerprint, 3)
+            conn.execute(fact_insert_sql(on_conflict=not bulk, offset=offset))
+        ids = conn.execute("SELECT booking_id FROM fact_bookings").fetchall()
+        assert sorted(ids) == [(i,) for i in range(1, 7)]
@@ -0,0 +1,102 @@
+import functools
+import pandas as pd
+from etl.jobs.load.load import create_staging_table
+from etl.jobs.load.load_fact_bookings import CREATE_QUERY
+from etl.jobs.pipeline import transform_chunk
+from etl.jobs.transform import transform
+from etl.jobs.transform.pseudonymize import pseudonymize
+from etl.jobs.transform.transform_dim_guest import resolve_guests
+from etl.jobs.utils.reader import read_csv_chunks
+from etl.jobs.utils.sketches import SeenHashes
+
+
+def test_guests_are_linked_transitively_and_independently_of_order():
+    """
+    Test that bookings sharing any blocking key form one guest, even through
+    a chain of different keys, and that the guest key ignores row order.
+    """
+    df = pd.DataFrame(
+        {
+            "email_token": ["e1", None, None, "e2", None],
+            "phone_token": ["p1", "p1", None, None, None],
+            "name_token": [None, "n1", "n1", "n2", "n1"],
+            "country": ["PRT", "PRT", "PRT", "ESP", "ESP"],
+        }
+    )
+    keys = resolve_guests(df.copy())["guest_key"]
+    assert keys[0] == keys[1] == keys[2]
+    assert len({keys[0], keys[3], keys[4]}) == 3
+
+    reversed_keys = resolve_guests(df.iloc[::-1].reset_index(drop=True))
+    assert reversed_keys["guest_key"][::-1].tolist() == keys.tolist()
+
+
+def test_streamed_chunks_match_the_batch_transform(tmp_path, monkeypatch):
+    """
+    Test that the streaming and out-of-core paths drop duplicates across
+    chunks and link a guest across chunks, giving the batch rows and guest
+    keys.
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(
+        transform, "pseudonymize", functools.partial(pseudonymize, secret="k")
+    )
+    raw = pd.DataFrame(
+        {
+            "hotel": ["City Hotel", "Resort Hotel", "City Hotel", "City Hotel"] * 2,
+            "lead_time": [1, 2, 3, 4, 5, 2, 7, 8],
+            "children": [0, None, 1, 0, 0, None, 2, 0],
+            "country": ["PRT", "ESP", None, "PRT", "FRA", "ESP", "PRT", "PRT"],
+            "agent": [9, None, 9, 9, 9, None, 9, 9],
+            "company": [None] * 8,
+            "arrival_date_year": [2017] * 8,
+            "arrival_date_month": ["July"] * 8,
+            "arrival_date_day_of_month": [1] * 8,
+            "name": ["Ann", "Bob", "Cy", "Di", "Ed", "Bo", "Fay", "Gus"],
+            "email": ["a@x", "b@x", "c@x", "d@x", "a@x", "b@y", "f@x", "g@x"],
+            "phone-number": ["1", "2", "3", "4", "5", "6", "7", "8"],
+            "credit_card": ["c"] * 8,
+        }
+    )
+    path = tmp_path / "raw.csv"
+    raw.to_csv(path, index=False)
+    batch = transform.transform_data(pd.read_csv(path))
+
+    guest_keys = transform.resolve_file_guests(str(path))
+    seen = SeenHashes()
+    streamed = pd.concat(
+        transform.drop_seen_duplicates(transform_chunk(chunk, guest_keys), seen)
+        for chunk in read_csv_chunks(str(path), chunksize=3)
+    )
+
+    assert len(batch) == 7
+    assert streamed["lead_time"].tolist() == batch["lead_time"].tolist()
+    assert streamed["guest_key"].tolist() == batch["guest_key"].tolist()
+    assert streamed["guest_key"].iloc[0] == streamed["guest_key"].iloc[4]
+
+    chunks = read_csv_chunks(str(path), chunksize=3)
+    spilled = pd.concat(transform.transform_chunks(chunks, guest_keys, budget=4096))
+    assert spilled["lead_time"].tolist() == batch["lead_time"].tolist()
+    assert spilled["guest_key"].tolist() == batch["guest_key"].tolist()
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, query):
+        self.statements.append(query)
+
+
+def test_existing_tables_get_the_guest_columns():
+    """
+    Test that fact_bookings and staging created before guest resolution
+    (and the arrival date columns) get the new columns on the next load.
+    """
+    assert "ADD COLUMN IF NOT EXISTS guest_id INT" in CREATE_QUERY
+
+    cursor = RecordingCursor()
+    create_staging_table(cursor)
+    ddl = "".join(cursor.statements)
+    for column in ["guest_key TEXT", "arrival_date DATE", "arrival_date_key INT"]:
+        assert f"ADD COLUMN IF NOT EXISTS {column}" in ddl
@@ -0,0 +1,50 @@
+import sqlite3
+from etl.jobs.load.load_fact_bookings import LOAD_SEQ_COLUMN
+from etl.jobs.load.load_kpi import KPI_VIEWS, merge_sql
+
+
+def _merge(conn: sqlite3.Connection, low: int, high: int):
+    """
+    Runs the kpi_country merge on SQLite, with psycopg2 placeholders translated.
+    """
+    query = merge_sql("kpi_country").replace("%(low)s", ":low")
+    conn.execute(query.replace("%(high)s", ":high"), {"low": low, "high": high})
+
+
+def test_renamed_country_keeps_one_total():
+    """
+    Test that the bookings of a country stay in one row of kpi_country and
+    of the dashboard view, under the current name, once the country gets a
+    second SCD2 version.
+    """
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(
+        f"""
+        CREATE TABLE fact_bookings (
+            country_id, is_canceled, lead_time, {LOAD_SEQ_COLUMN}
+        );
+        CREATE TABLE dim_country (country_id, country_code, country, is_current);
+        CREATE TABLE kpi_country (
+            country_code TEXT PRIMARY KEY, bookings, canceled, lead_time_sum
+        );
+        INSERT INTO dim_country
+        VALUES (1, 'PRT', 'Portugal', 1), (2, 'ESP', 'Spain', 1);
+        INSERT INTO fact_bookings VALUES (1, 0, 10, 1), (1, 1, 20, 2), (2, 0, 5, 3);
+        """
+    )
+    _merge(conn, 0, 3)
+
+    # The rename closes version 1; later bookings reference version 3
+    conn.executescript(
+        """
+        UPDATE dim_country SET is_current = 0 WHERE country_id = 1;
+        INSERT INTO dim_country VALUES (3, 'PRT', 'Portuguese Republic', 1);
+        INSERT INTO fact_bookings VALUES (3, 0, 30, 4);
+        """
+    )
+    _merge(conn, 3, 4)
+
+    totals = conn.execute("SELECT * FROM kpi_country ORDER BY country_code")
+    assert totals.fetchall() == [("ESP", 1, 0, 5), ("PRT", 3, 1, 60)]
+    view = conn.execute(KPI_VIEWS["kpi_bookings_by_country"] + " ORDER BY 1")
+    assert view.fetchall() == [("Portuguese Republic", 3), ("Spain", 1)]
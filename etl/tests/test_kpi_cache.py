@@ -0,0 +1,29 @@
+import json
+import pandas as pd
+from etl.kpi import cache
+from etl.kpi.cache import flush_stats, get_cached, put_cached
+
+
+def test_cache_entries_expire_with_data_version(tmp_path, monkeypatch):
+    """
+    Test that cached results are keyed by parameters and dropped once the
+    data version moves on, and that hits and misses are counted in memory
+    and written to the run metrics only on flush.
+    """
+    monkeypatch.setattr(cache, "_STATS", {"hits": 0, "misses": 0})
+    metrics_path = tmp_path / "run_metrics.json"
+    cache_dir = str(tmp_path / "cache")
+    result = pd.DataFrame({"country": ["Portugal"], "bookings": [10]})
+    put_cached("bookings_by_country", {"limit": 1}, 1, result, cache_dir)
+
+    hit = get_cached("bookings_by_country", {"limit": 1}, 1, cache_dir)
+    assert hit.equals(result)
+    assert get_cached("bookings_by_country", {"limit": 2}, 1, cache_dir) is None
+
+    put_cached("bookings_by_country", {"limit": 2}, 2, result, cache_dir)
+    assert get_cached("bookings_by_country", {"limit": 1}, 1, cache_dir) is None
+
+    assert not metrics_path.exists()
+    flush_stats(str(metrics_path))
+    stats = json.loads(metrics_path.read_text())["kpi_cache"]
+    assert stats == {"hits": 1, "misses": 2, "hit_ratio": 1 / 3}
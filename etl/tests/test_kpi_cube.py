@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+from etl.jobs.transform.transform_kpi_cube import (
+    build_cube,
+    load_cube,
+    query_cube,
+    rollup,
+    save_cube,
+)
+
+
+def test_cube_rollup_matches_fact_groupby(tmp_path):
+    """
+    Test that KPIs rolled up from a saved cube equal the same KPIs computed
+    directly on the fact rows.
+    """
+    fact = pd.DataFrame(
+        {
+            "hotel_id": [1, 1, 2, 2, 1],
+            "country_id": [1, 2, 1, 1, 1],
+            "arrival_year": [2016, 2016, 2016, 2017, 2016],
+            "arrival_month": ["July", "July", "May", "May", "August"],
+            "weekend_nights": [1, 2, 0, 1, 2],
+            "week_nights": [2, 3, 1, 0, 5],
+            "is_canceled": [0, 1, 0, 0, 1],
+            "adr": [100.0, 80.0, 50.0, 70.0, 120.0],
+            "lead_time": [10, 200, 30, 5, 60],
+        }
+    )
+    path = tmp_path / "cube.npz"
+    save_cube(build_cube(fact), str(path))
+    cube = load_cube(str(path))
+
+    by_country = rollup(cube, ["country_id"])
+    assert by_country["bookings"].tolist() == [4, 1]
+    assert by_country["cancellation_rate"].tolist() == [0.25, 1.0]
+    assert by_country["avg_lead_time"].tolist() == [26.25, 200.0]
+
+    by_hotel = rollup(cube, ["hotel_id"], ["nights", "revenue"])
+    assert by_hotel["nights"].tolist() == [3, 2]
+    assert by_hotel["revenue"].tolist() == [300.0, 120.0]
+
+    by_hotel = query_cube("adr_revenue_by_hotel", cube)
+    assert by_hotel.columns.tolist() == ["hotel_id", "revenue", "nights", "adr"]
+    assert by_hotel["adr"].tolist() == [100.0, 60.0]
+
+
+def test_cube_keeps_rows_with_missing_keys(tmp_path):
+    """
+    Test that fact rows with a failed dimension lookup (NaN foreign key)
+    stay in the cube totals and roll up into their own group.
+    """
+    fact = pd.DataFrame(
+        {
+            "hotel_id": [1, 1, np.nan],
+            "country_id": [1, np.nan, 1],
+            "arrival_year": [2016, 2016, 2016],
+            "arrival_month": ["July", "July", "May"],
+            "weekend_nights": [1, 2, 0],
+            "week_nights": [2, 3, 1],
+            "is_canceled": [0, 1, 0],
+            "adr": [100.0, 80.0, 50.0],
+            "lead_time": [10, 200, 30],
+        }
+    )
+    path = tmp_path / "cube.npz"
+    save_cube(build_cube(fact), str(path))
+    cube = load_cube(str(path))
+
+    assert rollup(cube, [], ["bookings", "nights"]).iloc[0].tolist() == [3, 4]
+    by_country = query_cube("bookings_by_country", cube)
+    assert by_country["bookings"].tolist() == [2, 1]
+    assert by_country["country_id"].isna().tolist() == [False, True]
@@ -0,0 +1,30 @@
+import json
+from etl.jobs.utils import logger as etl_logger
+
+
+def test_queued_json_logs_rate_limit_repeated_records(tmp_path, monkeypatch):
+    """
+    Test that records reach the log file as JSON lines through the queue
+    listener, with extra= fields, and that a warning repeated in a loop is
+    cut after the burst and summarized with the suppressed count.
+    """
+    monkeypatch.chdir(tmp_path)
+    logger = etl_logger.setup_logger("test_rate_limit", "rate_limit.log")
+    logger.handlers[0].rate_limit.burst = 3
+
+    logger.info("Loaded batch", extra={"rows": 500, "table": "fact_bookings"})
+    for row in range(100):
+        logger.warning(f"Rejected row {row}")
+    handler = logger.handlers[0]
+    logger.removeHandler(handler)
+    etl_logger.stop_listener(handler)
+
+    records = [json.loads(line) for line in open("logs/rate_limit.log")]
+    assert records[0]["message"] == "Loaded batch"
+    assert records[0]["rows"] == 500 and records[0]["table"] == "fact_bookings"
+    warnings = [r for r in records if r["message"].startswith("Rejected row")]
+    assert [r["message"] for r in warnings] == [f"Rejected row {i}" for i in range(3)]
+    assert records[-1]["suppressed"] == 97
+    assert records[-1]["level"] == "WARNING"
+    assert handler not in [entry[0] for entry in etl_logger._listeners]
+    assert all(listener._thread for _, listener in etl_logger._listeners)
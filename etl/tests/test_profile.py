@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+from etl.jobs.extract.profile import build_profile
+from etl.jobs.utils.sketches import HyperLogLog
+
+
+def test_hyperloglog_estimate():
+    """
+    Test that the HyperLogLog estimate stays close to the exact distinct count.
+    """
+    sketch = HyperLogLog()
+    sketch.add(pd.Series(np.arange(50_000) % 20_000))
+    assert abs(sketch.estimate() - 20_000) < 20_000 * 0.05
+
+
+def test_build_profile_matches_full_scans():
+    """
+    Test that a chunked single-pass profile matches isnull() and duplicated().
+    """
+    df = pd.DataFrame(
+        {
+            "hotel": ["City Hotel", "Resort Hotel", None, "City Hotel"] * 50,
+            "adr": [10.0, np.nan, 30.0, 10.0] * 50,
+        }
+    )
+    chunks = [df.iloc[i : i + 37] for i in range(0, len(df), 37)]
+    profile = build_profile(chunks)
+
+    assert profile["rows"] == len(df)
+    assert profile["duplicate_rows"] == df.duplicated().sum()
+    assert profile["columns"]["adr"]["nulls"] == df["adr"].isnull().sum()
+    assert profile["columns"]["adr"]["min"] == 10.0
+    assert profile["columns"]["adr"]["max"] == 30.0
+    assert profile["columns"]["hotel"]["top_values"][0] == ["City Hotel", 100]
@@ -0,0 +1,69 @@
+import pandas as pd
+from etl.jobs.load.load import create_staging_table
+from etl.jobs.transform.pseudonymize import PII_COLUMNS, pseudonymize
+from etl.jobs.transform.transform import remove_duplicates
+
+
+def test_pseudonyms_are_keyed_normalized_and_pool_safe():
+    """
+    Test that PII columns are replaced by keyed tokens that link normalized
+    duplicates, keep nulls, change with the key and match across workers.
+    """
+    df = pd.DataFrame(
+        {
+            "adr": [10.0, 20.0, 30.0, 40.0],
+            "email": ["Ann@Example.com ", "ann@example.com", None, "bob@example.com"],
+            "phone_number": ["822-953-306", "822953306", "1", "2"],
+        }
+    )
+    tokens = pseudonymize(df, secret="key-1", workers=1)
+
+    assert list(tokens.columns) == ["adr", "email_token", "phone_token"]
+    assert tokens["email_token"][0] == tokens["email_token"][1]
+    assert tokens["email_token"][0] != tokens["email_token"][3]
+    assert tokens["email_token"].isna().tolist() == [False, False, True, False]
+    assert tokens["phone_token"][0] == tokens["phone_token"][1]
+
+    other_key = pseudonymize(df, secret="key-2", workers=1)
+    assert not (other_key["phone_token"] == tokens["phone_token"]).any()
+    assert pseudonymize(df, secret="key-1", workers=2).equals(tokens)
+    assert pseudonymize(df, secret=None)["email_token"].isna().all()
+
+
+def test_bookings_differing_only_in_pii_are_duplicates():
+    """
+    Test that the dedupe ignores the PII tokens and the guest key, so two
+    bookings that differ only in guest PII are still one booking.
+    """
+    df = pd.DataFrame(
+        {
+            "adr": [10.0, 10.0, 20.0],
+            "email": ["ann@example.com", "bob@example.com", "ann@example.com"],
+        }
+    )
+    tokens = pseudonymize(df, secret="key-1", workers=1)
+    tokens["guest_key"] = tokens["email_token"]
+    distinct = remove_duplicates(tokens)
+
+    assert distinct["adr"].tolist() == [10.0, 20.0]
+    assert distinct["email_token"].tolist() == tokens["email_token"][[0, 2]].tolist()
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, query):
+        self.statements.append(query)
+
+
+def test_existing_staging_tables_get_the_token_columns():
+    """
+    Test that creating staging adds the token columns to a table created
+    before they existed.
+    """
+    cursor = RecordingCursor()
+    create_staging_table(cursor)
+    ddl = "".join(cursor.statements)
+    for token in PII_COLUMNS.values():
+        assert f"ADD COLUMN IF NOT EXISTS {token} TEXT" in ddl
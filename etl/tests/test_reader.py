@@ -0,0 +1,28 @@
+import pandas as pd
+from etl.jobs.utils import reader
+
+
+def test_chunk_plan_fits_the_budget(tmp_path, monkeypatch):
+    """
+    Test that the planned chunks of all workers, with the transform's
+    working copies, fit in the memory budget, and that workers are dropped
+    before chunks shrink below the minimum.
+    """
+    path = tmp_path / "bookings.csv"
+    pd.DataFrame({"hotel": ["City Hotel"] * 5000, "adr": range(5000)}).to_csv(
+        path, index=False
+    )
+    recorded = {}
+    monkeypatch.setattr(
+        reader, "record_metrics", lambda section, values: recorded.update(values)
+    )
+
+    plan = reader.plan_chunks(str(path), budget=64 * 2**20, workers=4)
+    working_set = plan["chunk_size"] * plan["row_bytes"] * reader.WORKING_SET_FACTOR
+    assert plan["workers"] == 4
+    assert working_set * plan["workers"] <= 64 * 2**20
+    assert recorded["chunk_size"] == plan["chunk_size"]
+
+    small = reader.plan_chunks(str(path), budget=2**20, workers=4)
+    assert small["workers"] < 4
+    assert small["chunk_size"] >= reader.MIN_CHUNK_ROWS
@@ -0,0 +1,81 @@
+import re
+import pandas as pd
+from etl.jobs.load.reconcile import frame_codes, frame_summary, reconcile, row_hashes
+
+COLUMN_TYPES = {
+    "booking_id": "BIGINT PRIMARY KEY",
+    "arrival_date_key": "INT",
+    "arrival_month": "TEXT",
+    "adr": "FLOAT",
+    "reservation_status_date": "DATE",
+}
+
+
+class TableCursor:
+    """
+    Cursor answering the reconciliation queries from a DataFrame standing in
+    for the table, with the frame-side functions the queries mirror.
+    """
+
+    def __init__(self, table: pd.DataFrame):
+        self.table = table
+        self.queries = []
+
+    def execute(self, query):
+        self.queries.append(query)
+        if "GROUP BY part" in query:
+            summary = frame_summary(self.table, COLUMN_TYPES).reset_index()
+            self.description = [(name,) for name in summary.columns]
+            self.rows = list(summary.itertuples(index=False))
+        else:
+            part = int(re.search(r"/ 100, 0\) = (\d+)", query).group(1))
+            rows = self.table[self.table["arrival_date_key"] // 100 == part]
+            codes = frame_codes(rows, COLUMN_TYPES)
+            self.rows = list(zip(codes["booking_id"], row_hashes(codes)))
+
+    def fetchall(self):
+        return self.rows
+
+
+def _bookings() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "booking_id": range(1, 9),
+            "arrival_date_key": [20170301, 20170315, 20170402, 20170410] * 2,
+            "arrival_month": ["March", "March", "April", "April"] * 2,
+            "adr": [74.5, 120.0, None, 88.25, 60.0, 95.1, 101.0, 0.0],
+            "reservation_status_date": ["2017-02-01", "2017-03-20"] * 4,
+        }
+    )
+
+
+def test_reconcile_finds_only_the_changed_partitions():
+    """
+    Test that a table holding the same rows in another order reconciles with
+    one summary query, and that missing, unexpected, changed and swapped
+    values are drilled into in their partition only.
+    """
+    df = _bookings()
+    cursor = TableCursor(df.sample(frac=1, random_state=0))
+    report = reconcile(cursor, df, "fact_bookings", COLUMN_TYPES)
+    assert report["mismatches"] == {}
+    assert len(cursor.queries) == 1
+
+    table = df.copy()
+    table.loc[table["booking_id"] == 3, "adr"] = 80.0
+    table = table[table["booking_id"] != 4]
+    extra = df[df["booking_id"] == 1].assign(booking_id=99)
+    report = reconcile(
+        TableCursor(pd.concat([table, extra])), df, "fact_bookings", COLUMN_TYPES
+    )
+    assert set(report["mismatches"]) == {201703, 201704}
+    assert report["mismatches"][201703]["unexpected"] == [99]
+    assert report["mismatches"][201704]["missing"] == [4]
+    assert report["mismatches"][201704]["changed"] == [3]
+
+    # Values swapped between two rows keep every column sum unchanged
+    swapped = df.copy()
+    swapped.loc[[0, 4], "adr"] = swapped.loc[[4, 0], "adr"].to_numpy()
+    report = reconcile(TableCursor(swapped), df, "fact_bookings", COLUMN_TYPES)
+    assert report["mismatches"][201703]["changed"] == [1, 5]
+    assert report["mismatches"][201703]["aggregates"] == ["hash_sum"]
@@ -0,0 +1,67 @@
+import pandas as pd
+from etl.jobs.transform.quarantine import split_valid_rows
+from etl.jobs.transform.rules import validate_chunks, validate_frame
+
+RULES = [
+    {"name": "required_columns", "check": "columns", "columns": ["hotel", "adr"]},
+    {"name": "dtype", "check": "dtype", "types": {"adr": "float", "day": "datetime"}},
+    {"name": "not_null", "check": "not_null", "columns": ["hotel"]},
+    {"name": "adr_non_negative", "check": "range", "column": "adr", "min": 0},
+    {
+        "name": "hotel_allowed",
+        "check": "allowed",
+        "column": "hotel",
+        "values": ["City Hotel", "Resort Hotel"],
+    },
+    {"name": "unique_rows", "check": "unique"},
+]
+
+
+def test_validate_frame_reports_every_failure():
+    """
+    Test that all failing rules are reported at once with their row counts.
+    """
+    df = pd.DataFrame(
+        {
+            "hotel": ["City Hotel", None, "Motel", "City Hotel"],
+            "adr": ["10.5", "abc", "-3", "10.5"],
+            "day": ["2015-07-01", "2015-07-02", "July", "2015-07-01"],
+        }
+    )
+    report = validate_frame(df, RULES)
+
+    assert not report["passed"]
+    assert report["violations"] == {
+        "dtype:adr": 1,
+        "dtype:day": 1,
+        "not_null:hotel": 1,
+        "adr_non_negative": 1,
+        "hotel_allowed": 1,
+        "unique_rows": 1,
+    }
+
+
+def test_validate_chunks_finds_duplicates_across_chunks():
+    """
+    Test that streaming validation catches missing columns and duplicates
+    split across chunk boundaries.
+    """
+    df = pd.DataFrame({"hotel": ["City Hotel", "Resort Hotel"] * 3})
+    report = validate_chunks([df.iloc[:2], df.iloc[2:4], df.iloc[4:]], RULES)
+
+    assert report["rows"] == 6
+    assert report["missing_columns"] == ["adr"]
+    assert report["violations"] == {"unique_rows": 4}
+
+
+def test_split_valid_rows_tags_rejects_with_reasons():
+    """
+    Test that invalid rows are quarantined with every rule they broke.
+    """
+    df = pd.DataFrame(
+        {"hotel": ["City Hotel", "Motel", "City Hotel"], "adr": [10.0, -1.0, 20.0]}
+    )
+    valid, rejected = split_valid_rows(df, RULES)
+
+    assert valid["adr"].tolist() == [10.0, 20.0]
+    assert rejected["reject_reasons"].tolist() == ["adr_non_negative;hotel_allowed"]
@@ -0,0 +1,79 @@
+import sqlite3
+import pandas as pd
+from etl.jobs.load import load_dimension
+from etl.jobs.load.load_dimension import merge_scd2
+
+
+class SqliteCursor:
+    """
+    Cursor running the merge statements on SQLite, with the PostgreSQL-only
+    clauses of the temporary staging table translated.
+    """
+
+    def __init__(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.create_function("now", 0, lambda: "2026-10-19")
+        self.conn.execute(
+            """
+            CREATE TABLE dim_country (
+                country_id INTEGER PRIMARY KEY,
+                country_code TEXT NOT NULL,
+                country TEXT NOT NULL,
+                attr_hash INT NOT NULL,
+                valid_from TEXT NOT NULL DEFAULT '2026-01-01',
+                valid_to TEXT,
+                is_current BOOLEAN NOT NULL DEFAULT TRUE
+            )
+            """
+        )
+
+    def execute(self, query):
+        query = query.replace("ON COMMIT DROP", "").replace("TRUNCATE", "DELETE FROM")
+        before = self.conn.total_changes
+        self.conn.executescript(query)
+        self.rowcount = self.conn.total_changes - before
+
+    def executemany(self, query, rows):
+        self.conn.executemany(query, rows)
+
+    def versions(self) -> list:
+        return self.conn.execute(
+            "SELECT country_id, country_code, country, valid_to IS NULL, is_current "
+            "FROM dim_country ORDER BY country_id"
+        ).fetchall()
+
+
+def _insert_values(cursor, sql, rows, page_size):
+    placeholders = "(" + ", ".join(["?"] * len(rows[0])) + ")"
+    cursor.executemany(sql.replace("%s", placeholders), rows)
+
+
+def test_merge_scd2_versions_only_changed_members(monkeypatch):
+    """
+    Test that a second merge leaves unchanged members alone, closes the
+    current version of a changed member and opens a new one, and adds new
+    members, in order of first appearance.
+    """
+    monkeypatch.setattr(load_dimension, "execute_values", _insert_values)
+    cursor = SqliteCursor()
+    first = pd.DataFrame(
+        {"country_code": ["PRT", "ESP"], "country": ["Portugal", "Spain"]}
+    )
+    assert merge_scd2(cursor, "dim_country", first) == 2
+
+    second = pd.DataFrame(
+        {
+            "country_code": ["PRT", "ESP", "FRA", "PRT"],
+            "country": ["Portugal", "España", "France", "Portugal"],
+        }
+    )
+    assert merge_scd2(cursor, "dim_country", second) == 2
+    assert cursor.versions() == [
+        (1, "PRT", "Portugal", 1, 1),
+        (2, "ESP", "Spain", 0, 0),
+        (3, "ESP", "España", 1, 1),
+        (4, "FRA", "France", 1, 1),
+    ]
+
+    assert merge_scd2(cursor, "dim_country", second) == 0
+    assert len(cursor.versions()) == 4
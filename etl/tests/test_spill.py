@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+from etl.jobs.transform.transform_dim_country import extract_unique_countries
+from etl.jobs.transform.transform_dim_customer import extract_unique_customer_types
+from etl.jobs.transform.transform_dim_guest import extract_unique_guests
+from etl.jobs.transform.transform_dim_hotel import extract_unique_hotels
+from etl.jobs.transform.transform_dim_meal import extract_unique_meal_plans
+from etl.jobs.transform.transform_fact_bookings import (
+    FACT_COLUMNS,
+    build_fact,
+    build_fact_chunks,
+)
+from etl.jobs.utils.spill import (
+    ROW_COLUMN,
+    _write_result,
+    block_bytes,
+    external_drop_duplicates,
+    external_merge,
+    iter_shard,
+    parse_size,
+)
+
+# Foreign key of each dimension in the fact, and its builder
+FOREIGN_KEYS = {
+    "hotel_id": extract_unique_hotels,
+    "country_id": extract_unique_countries,
+    "meal_plan_id": extract_unique_meal_plans,
+    "customer_id": extract_unique_customer_types,
+    "guest_id": extract_unique_guests,
+}
+
+
+def test_spilled_dedupe_and_join_match_in_memory(tmp_path):
+    """
+    Test that deduplicating and joining through on-disk shards, with shards
+    re-partitioned to fit a tiny budget, gives the in-memory results in the
+    input order.
+    """
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {"key": rng.integers(0, 50, 2000), "value": rng.integers(0, 3, 2000)}
+    )
+    chunks = [df.iloc[start : start + 300] for start in range(0, len(df), 300)]
+    options = {"budget": 4096, "partitions": 4, "directory": str(tmp_path)}
+
+    deduped = pd.concat(external_drop_duplicates(chunks, **options))
+    assert deduped.equals(df.drop_duplicates().reset_index(drop=True))
+
+    right = pd.DataFrame(
+        {"key": range(0, 50, 2), "label": list("abcdefghijklmnopqrstuvwxy")}
+    )
+    joined = pd.concat(external_merge(chunks, right, on=["key"], **options))
+    assert joined.reset_index(drop=True).equals(df.merge(right, on="key", how="left"))
+    assert list(tmp_path.iterdir()) == []
+
+    assert parse_size("2GB") == 2**31
+    assert parse_size("512 kb") == 512 * 1024
+
+
+def test_result_blocks_are_sized_from_the_budget(tmp_path):
+    """
+    Test that shard results are written in blocks sized so that one block
+    per shard, plus the merged rows, fits the budget.
+    """
+    frame = pd.DataFrame({ROW_COLUMN: np.arange(1000), "value": np.arange(1000)})
+    path = str(tmp_path / "shard.out")
+    max_bytes = block_bytes(64 * 1024, 15)
+    _write_result(frame, path, max_bytes)
+
+    blocks = list(iter_shard(path))
+    assert len(blocks) > 1 and blocks[-1][1]
+    sizes = [block.memory_usage(index=False).sum() for block, _ in blocks]
+    assert max(sizes) <= max_bytes
+    assert pd.concat(block for block, _ in blocks).equals(frame)
+
+
+def test_fact_chunks_match_build_fact(tmp_path):
+    """
+    Test that building the fact chunk by chunk, with dim_guest joined
+    through the spill layer, gives the rows and booking_ids of build_fact().
+    """
+    rng = np.random.default_rng(1)
+    rows = 500
+    df = pd.DataFrame({column: rng.integers(0, 5, rows) for column in FACT_COLUMNS})
+    df = df.drop(columns=list(FOREIGN_KEYS)).assign(
+        hotel=rng.choice(["City Hotel", "Resort Hotel"], rows),
+        country=rng.choice(["PRT", "ESP", "FRA"], rows),
+        meal_plan=rng.choice(["BB", "HB"], rows),
+        customer_type=rng.choice(["Transient", "Group"], rows),
+        guest_key=rng.choice([f"email:{i}" for i in range(40)] + [None], rows),
+    )
+    dims = [extract(df) for extract in FOREIGN_KEYS.values()]
+    chunks = [df.iloc[start : start + 120] for start in range(0, rows, 120)]
+
+    options = {"budget": 4096, "partitions": 4, "directory": str(tmp_path)}
+    chunked = pd.concat(build_fact_chunks(chunks, *dims, compact=False, **options))
+    expected = build_fact(df, *dims, compact=False)
+    assert chunked.reset_index(drop=True).equals(expected)
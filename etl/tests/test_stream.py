@@ -0,0 +1,59 @@
+import threading
+import time
+import pytest
+from etl.jobs.utils.stream import StageClock, map_ordered, read_ahead
+
+
+def test_stages_overlap_in_order_with_bounded_queues():
+    """
+    Test that results come out in input order, that the producer never
+    runs more than the queue bounds ahead of a slow consumer, and that the
+    stages overlap so the wall time stays well below the sum of stage times.
+    """
+    produced = []
+    in_flight = []
+    clock = StageClock()
+
+    def source():
+        for i in range(12):
+            time.sleep(0.02)
+            produced.append(i)
+            yield i
+
+    def work(item):
+        time.sleep(0.02)
+        return item * 10
+
+    start = time.perf_counter()
+    results = []
+    items = read_ahead(source(), depth=2, clock=clock)
+    for result in map_ordered(clock.timed("transform", work), items, workers=2):
+        # Read-ahead queue, its in-hand item and the workers' window
+        in_flight.append(len(produced) - len(results))
+        time.sleep(0.02)
+        results.append(result)
+    elapsed = time.perf_counter() - start
+
+    assert results == [i * 10 for i in range(12)]
+    assert max(in_flight) <= 2 + 1 + 2 + 2
+    assert elapsed < 0.6 * 12 * 0.06
+    assert set(clock.result()) == {"read_seconds", "transform_seconds"}
+
+
+def test_read_ahead_raises_producer_errors_and_stops_on_early_exit():
+    """
+    Test that a failing producer raises in the consumer, and that leaving
+    the loop early stops the producer thread.
+    """
+
+    def failing():
+        yield 1
+        raise ValueError("bad chunk")
+
+    with pytest.raises(ValueError, match="bad chunk"):
+        list(read_ahead(failing()))
+
+    threads = threading.active_count()
+    for item in read_ahead(iter(range(1000)), depth=1):
+        break
+    assert threading.active_count() == threads
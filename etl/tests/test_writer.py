@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+from etl.config import config
+from etl.jobs.utils.writer import write_csv
+
+
+def test_write_csv_matches_to_csv(tmp_path, monkeypatch):
+    """
+    Test that the column-wise writer produces the bytes of
+    DataFrame.to_csv(index=False), across row blocks and worker processes,
+    for floats, nullable ints, categoricals, quoted strings, mixed objects
+    and date/datetime columns whose format depends on the whole column.
+    """
+    df = pd.DataFrame(
+        {
+            "adr": [0.1, 1e20, np.nan, -0.0, 1 / 3, 0.0, 75.5],
+            "children": pd.array([1, None, 3, 0, 0, 2, 1], dtype="Int32"),
+            "hotel": pd.Categorical(["City", "Resort, A", None] + ["City"] * 4),
+            "name": ['a,b', 'q"x', None, "", "line\nbreak", " sp", "ok"],
+            "agent": [1, "a", 2.5, None, "x", 3, True],
+            "status_date": pd.to_datetime(["2020-01-01"] * 6 + [None]),
+            "booked_at": pd.to_datetime(
+                ["2020-01-01 00:00"] * 6 + ["2020-01-01 10:30"]
+            ),
+            "canceled": [True, False] * 3 + [True],
+        }
+    )
+    expected = tmp_path / "expected.csv"
+    df.to_csv(expected, index=False)
+
+    # Blocks of 3 rows: the last one holds the only non-midnight timestamp
+    monkeypatch.setattr(config, "CHUNK_SIZE", 3)
+    for workers in (1, 2):
+        output = tmp_path / f"written_{workers}.csv"
+        write_csv(df, str(output), workers=workers)
+        assert output.read_bytes() == expected.read_bytes()
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_write_csv_streams_chunks(tmp_path, monkeypatch):
+    """
+    Test that a stream of chunks is written like appending each chunk with
+    to_csv(mode="a"): one header, the chunks in order, and the output only
+    replaced once the last chunk is written.
+    """
+    chunks = [
+        pd.DataFrame({"id": [1, 2], "adr": [0.5, np.nan], "hotel": ["a,b", "c"]}),
+        pd.DataFrame({"id": [3], "adr": [1 / 3], "hotel": ['q"x']}),
+    ]
+    expected = tmp_path / "expected.csv"
+    for position, chunk in enumerate(chunks):
+        chunk.to_csv(expected, mode="a", header=position == 0, index=False)
+
+    monkeypatch.setattr(config, "CHUNK_SIZE", 1)
+    output = tmp_path / "written.csv"
+    output.write_bytes(b"previous run\n")
+
+    def stream():
+        for chunk in chunks:
+            # Loaders still see the previous artifact while chunks arrive
+            assert output.read_bytes() == b"previous run\n"
+            yield chunk
+
+    assert write_csv(stream(), str(output), workers=2) == 3
+    assert output.read_bytes() == expected.read_bytes()
+    assert not list(tmp_path.glob("*.tmp"))